@@ -22,6 +22,37 @@ def get_db():
         db.close()
 
 
+def _index_names(inspector, table: str) -> set[str]:
+    names = {ix["name"] for ix in inspector.get_indexes(table)}
+    names |= {uc["name"] for uc in inspector.get_unique_constraints(table)}
+    return names
+
+
+def _ensure_index(inspector, table: str, name: str, columns: list[str], unique: bool = False):
+    """Create an index on an existing table if no index/constraint with that name exists."""
+    if name in _index_names(inspector, table):
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    cols = ", ".join(f"`{c}`" for c in columns)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE `{table}` ADD {kind} {name} ({cols})"))
+    except Exception as e:
+        # e.g. legacy duplicate rows block a unique index; keep starting up
+        print(f"[ensure_schema] Could not add index {name} on {table}:", e)
+
+
+def _drop_index(inspector, table: str, name: str):
+    """Drop an index that a newer one replaced, if an older DB still has it."""
+    if name not in _index_names(inspector, table):
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE `{table}` DROP INDEX {name}"))
+    except Exception as e:
+        print(f"[ensure_schema] Could not drop index {name} on {table}:", e)
+
+
 def ensure_schema():
     """
     Lightweight runtime migration guard.
@@ -45,6 +76,42 @@ def ensure_schema():
                 with engine.begin() as conn:
                     conn.execute(text("ALTER TABLE attendances ADD COLUMN approved_by VARCHAR(30) NULL"))
 
+            # One attendance row per employee per day (check-in/check-out depend on it)
+            _ensure_index(inspector, "attendances", "uq_attendance_eid_date", ["eid", "date"], unique=True)
+
+        # Delta sync: (company_id, updated_at) indexes. Older rows only got
+        # updated_at on their first edit, so backfill it once from created_at.
+        for table in ("attendances", "leave_requests", "payrolls"):
+            index_name = f"ix_{table}_company_updated"
+            if table in tables and index_name not in _index_names(inspector, table):
+                with engine.begin() as conn:
+                    conn.execute(text(f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL"))
+                _ensure_index(inspector, table, index_name, ["company_id", "updated_at"])
+
+        if "leave_requests" in tables:
+            _ensure_index(inspector, "leave_requests", "ix_leave_requests_eid_range", ["eid", "start_date", "end_date"])
+
+        # Optimistic concurrency version for approval state changes
+        for table in ("leave_requests", "payrolls"):
+            if table in tables and "version" not in {col["name"] for col in inspector.get_columns(table)}:
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN version INT NOT NULL DEFAULT 1"))
+
+        # Approval inbox: pending/unapproved rows per company
+        for table, index_name, columns in (
+            ("leave_requests", "ix_leave_requests_company_status", ["company_id", "status"]),
+            ("attendances", "ix_attendances_company_approved", ["company_id", "approved"]),
+            ("payrolls", "ix_payrolls_company_status", ["company_id", "status"]),
+        ):
+            if table in tables:
+                _ensure_index(inspector, table, index_name, columns)
+        # Superseded by ix_user_company_join_period (created above, so the company_id FK keeps an index)
+        if "user" in tables:
+            _drop_index(inspector, "user", "ix_user_company_joined")
+
+        if "audit_logs" in tables:
+            _ensure_index(inspector, "audit_logs", "ix_audit_logs_company_entity_created", ["company_id", "entity", "created_at"])
+
         # User table: add missing columns used by the ORM model
         if "user" in tables:
             ucols = {col["name"] for col in inspector.get_columns("user")}
@@ -71,6 +138,30 @@ def ensure_schema():
                 add_col("ALTER TABLE `user` ADD COLUMN bank_account VARCHAR(50) NULL")
             if "manager_id" not in ucols:
                 add_col("ALTER TABLE `user` ADD COLUMN manager_id VARCHAR(30) NULL")
+            if "join_year" not in ucols:
+                add_col("ALTER TABLE `user` ADD COLUMN join_year INT GENERATED ALWAYS AS (YEAR(date_of_joining)) STORED")
+            if "join_period" not in ucols:
+                add_col(
+                    "ALTER TABLE `user` ADD COLUMN join_period INT "
+                    "GENERATED ALWAYS AS (YEAR(date_of_joining) * 100 + MONTH(date_of_joining)) STORED"
+                )
+
+        # Tenant-leading indexes for the company-scoped list/dashboard queries
+        # (scripts/explain_check.py fails when one of them falls back to a scan)
+        for table, index_name, columns in (
+            ("attendances", "ix_attendances_company_date", ["company_id", "date"]),
+            ("leave_requests", "ix_leave_requests_company_start", ["company_id", "start_date"]),
+            ("payrolls", "ix_payrolls_company_period", ["company_id", "year", "month"]),
+            ("user", "ix_user_company_join_period", ["company_id", "join_period"]),
+            ("user", "ix_user_join_year", ["join_year"]),
+            ("user", "ix_user_company_manager", ["company_id", "manager_id"]),
+            ("user", "ix_user_company_bank", ["company_id", "bank_account"]),
+        ):
+            if table in tables:
+                _ensure_index(inspector, table, index_name, columns)
+        # Superseded by ix_user_company_join_period (created above, so the company_id FK keeps an index)
+        if "user" in tables:
+            _drop_index(inspector, "user", "ix_user_company_joined")
     except Exception as e:
         # Don't block app startup if migration check fails; just log to console
         print("[ensure_schema] Skipped with error:", e)
@@ -0,0 +1,218 @@
+import json
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from fastapi import HTTPException
+from sqlalchemy import select, delete, insert, func, or_
+from sqlalchemy.orm import Session
+from models.audit_model import AuditLog
+from models.company_model import Company
+from models.headcount_model import HeadcountSnapshot
+from models.user_model import User
+
+MAX_TREND_DAYS = 3660  # ten years of daily snapshots
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+# 🚪 Departures of the day, per department, from the audit trail
+def _departures(db: Session, company_id: int, day: date) -> Counter:
+    """Deactivations (status Active -> anything else) and deletions of active users.
+
+    Deleted rows are gone from `user`, so this reads the before-image the
+    audit trail keeps for every committed user edit/delete.
+    """
+    start, end = _day_bounds(day)
+    rows = db.execute(
+        select(AuditLog.entity_id, AuditLog.action, AuditLog.changes)
+        .where(
+            AuditLog.company_id == company_id,
+            AuditLog.entity == "user",
+            AuditLog.created_at >= start,
+            AuditLog.created_at < end,
+            or_(AuditLog.action == "delete", AuditLog.changes.like('%"status"%')),
+        )
+        .order_by(AuditLog.audit_id)
+    ).all()
+
+    left: dict[str, str | None] = {}  # eid -> department (None = look up the current one)
+    for eid, action, raw in rows:
+        changes = json.loads(raw)
+        status = changes.get("status") or {}
+        if status.get("before") != "Active" or status.get("after") == "Active":
+            continue
+        department = changes.get("department")
+        left[eid] = department["before"] if department else None
+
+    unknown = [eid for eid, department in left.items() if department is None]
+    if unknown:
+        current = dict(db.execute(select(User.eid, User.department).where(User.eid.in_(unknown))).all())
+        for eid in unknown:
+            left[eid] = current.get(eid)
+    return Counter(department or "" for department in left.values())
+
+
+# 📸 Write one company's snapshot rows for a day (re-running replaces them)
+def take_headcount_snapshot(db: Session, company_id: int, day: date) -> dict:
+    start, end = _day_bounds(day)
+    department = func.coalesce(User.department, "")
+    active = Counter(dict(db.execute(
+        select(department, func.count())
+        .where(
+            User.company_id == company_id,
+            User.status == "Active",
+            or_(User.date_of_joining.is_(None), User.date_of_joining < end),
+        )
+        .group_by(department)
+    ).all()))
+    joined = Counter(dict(db.execute(
+        select(department, func.count())
+        .where(
+            User.company_id == company_id,
+            User.date_of_joining >= start,
+            User.date_of_joining < end,
+        )
+        .group_by(department)
+    ).all()))
+    left = _departures(db, company_id, day)
+
+    rows = [
+        {
+            "company_id": company_id,
+            "day": day,
+            "department": name,
+            "active": active[name],
+            "joined": joined[name],
+            "left_count": left[name],
+        }
+        for name in sorted(set(active) | set(joined) | set(left))
+    ]
+    db.execute(delete(HeadcountSnapshot).where(
+        HeadcountSnapshot.company_id == company_id,
+        HeadcountSnapshot.day == day,
+    ))
+    if rows:
+        db.execute(insert(HeadcountSnapshot), rows)
+    db.commit()
+    return {
+        "company_id": company_id,
+        "date": str(day),
+        "departments": len(rows),
+        "active": sum(active.values()),
+        "joined": sum(joined.values()),
+        "left": sum(left.values()),
+    }
+
+
+# 🌙 Nightly job: snapshot every company (default: yesterday)
+def run_headcount_snapshots(db: Session, day: date | None = None, company_ids: list[int] | None = None) -> dict:
+    day = day or date.today() - timedelta(days=1)
+    if company_ids is None:
+        company_ids = db.execute(select(Company.company_id)).scalars().all()
+    return {
+        "date": str(day),
+        "companies": [take_headcount_snapshot(db, company_id, day) for company_id in company_ids],
+    }
+
+
+def _check_range(start: date, end: date):
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days >= MAX_TREND_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_TREND_DAYS} days")
+
+
+# 📈 Headcount trend from the snapshots (daily or monthly points)
+def get_headcount_trend(
+    db: Session,
+    company_id: int,
+    start: date,
+    end: date,
+    department: str | None = None,
+    interval: str = "month",
+) -> dict:
+    if interval not in ("day", "month"):
+        raise HTTPException(status_code=400, detail="interval must be 'day' or 'month'")
+    _check_range(start, end)
+
+    query = (
+        select(
+            HeadcountSnapshot.day,
+            func.sum(HeadcountSnapshot.active),
+            func.sum(HeadcountSnapshot.joined),
+            func.sum(HeadcountSnapshot.left_count),
+        )
+        .where(
+            HeadcountSnapshot.company_id == company_id,
+            HeadcountSnapshot.day >= start,
+            HeadcountSnapshot.day <= end,
+        )
+        .group_by(HeadcountSnapshot.day)
+        .order_by(HeadcountSnapshot.day)
+    )
+    if department is not None:
+        query = query.where(HeadcountSnapshot.department == department)
+
+    points: dict[str, dict] = {}
+    for day, active, joined, left in db.execute(query):
+        period = day.isoformat() if interval == "day" else day.strftime("%Y-%m")
+        point = points.setdefault(period, {"period": period, "active": 0, "joined": 0, "left": 0})
+        point["active"] = int(active)  # end-of-period headcount: the last snapshot wins
+        point["joined"] += int(joined)
+        point["left"] += int(left)
+
+    return {
+        "company_id": company_id,
+        "start": start,
+        "end": end,
+        "interval": interval,
+        "department": department,
+        "points": list(points.values()),
+    }
+
+
+# 📉 Attrition per department over a range
+def get_attrition(db: Session, company_id: int, start: date, end: date) -> dict:
+    _check_range(start, end)
+    in_range = (
+        HeadcountSnapshot.company_id == company_id,
+        HeadcountSnapshot.day >= start,
+        HeadcountSnapshot.day <= end,
+    )
+    # A department without a row on a snapshot day had nobody active that day
+    days = db.execute(select(func.count(func.distinct(HeadcountSnapshot.day))).where(*in_range)).scalar() or 0
+    rows = db.execute(
+        select(
+            HeadcountSnapshot.department,
+            func.sum(HeadcountSnapshot.left_count),
+            func.sum(HeadcountSnapshot.joined),
+            func.sum(HeadcountSnapshot.active),
+        )
+        .where(*in_range)
+        .group_by(HeadcountSnapshot.department)
+        .order_by(HeadcountSnapshot.department)
+    ).all()
+
+    def entry(department, left, joined, active_days):
+        average_active = int(active_days) / days if days else 0.0
+        return {
+            "department": department or None,
+            "left": int(left),
+            "joined": int(joined),
+            "average_active": round(average_active, 2),
+            # Departures as a share of the average headcount over the range
+            "attrition_rate": round(100 * int(left) / average_active, 2) if average_active else 0.0,
+        }
+
+    departments = [entry(*row) for row in rows]
+    total = entry("", *(sum(int(row[i]) for row in rows) for i in (1, 2, 3)))
+    return {
+        "company_id": company_id,
+        "start": start,
+        "end": end,
+        "snapshot_days": days,
+        "departments": departments,
+        "total": total,
+    }
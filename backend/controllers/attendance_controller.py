@@ -1,20 +1,68 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, func, bindparam
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from models.attendance_model import Attendance
 from models.user_model import User
-from schemas.attendance_schema import AttendanceCreate, AttendanceUpdate
+from schemas.attendance_schema import AttendanceCreate, AttendanceUpdate, AttendanceOut
+from utils.checkin_buffer import checkin_buffer, CHECKIN_BUFFER_ENABLED
+from utils.sync import start_sync, deleted_since
+from utils.events import event_bus
+from utils.audit import set_audit_actor
+from utils.shift_engine import get_policy, invalidate_month, day_overtime
+from utils.hierarchy import in_org
+from utils.unit_of_work import unit_of_work
+from utils.fast_json import projection, as_dicts, stream_rows
 from datetime import datetime , date, time
 
+DUPLICATE_KEY_ERROR = 1062  # MySQL ER_DUP_ENTRY
+
+# Check-in/check-out statements, built once. They run on the session's
+# connection (Core, no ORM execution layer) and each call only binds values,
+# so the compiled form is reused instead of rebuilt per request.
+CHECK_IN_STATEMENT = insert(Attendance).values(status="Present", approved=True)
+OPEN_DAY_QUERY = (
+    select(Attendance.company_id, Attendance.check_in, Attendance.check_out, User.name)
+    .outerjoin(User, User.eid == Attendance.eid)
+    .where(Attendance.eid == bindparam("eid"), Attendance.date == bindparam("day"))
+)
+# Compare-and-set: only an open record is closed, so concurrent check-outs can't both win.
+# (UPDATE reserves column names for SET parameters, hence the b_ prefix.)
+CLOSE_DAY_STATEMENT = (
+    update(Attendance)
+    .where(
+        Attendance.eid == bindparam("b_eid"),
+        Attendance.date == bindparam("b_day"),
+        Attendance.check_out.is_(None),
+    )
+    .values(check_out=bindparam("b_check_out"), worked_hours=bindparam("b_worked_hours"), status="Completed")
+)
+
+
+def is_duplicate_key(error: IntegrityError) -> bool:
+    """True when an IntegrityError was raised by a unique key (e.g. uq_attendance_eid_date)."""
+    args = getattr(error.orig, "args", ())
+    if args and args[0] == DUPLICATE_KEY_ERROR:
+        return True
+    return "UNIQUE constraint failed" in str(error.orig)
+
+
+def calculate_worked_hours(day: date, check_in_time: time, check_out_time: time) -> float:
+    """Hours between check-in and check-out on the same day, rounded to 2 decimals."""
+    checkin_dt = datetime.combine(day, check_in_time)
+    checkout_dt = datetime.combine(day, check_out_time)
+    duration = (checkout_dt - checkin_dt).total_seconds() / 3600  # Convert seconds to hours
+    return round(duration, 2)
+
+
+def worked_hours_sql(check_in_col, check_out_col):
+    """SQL twin of calculate_worked_hours for set-based statements (MySQL TIME columns)."""
+    return func.round((func.time_to_sec(check_out_col) - func.time_to_sec(check_in_col)) / 3600, 2)
+
+
 # ✅ Create or mark attendance
 def create_attendance(db: Session, data: AttendanceCreate):
-    # Prevent duplicate attendance for same date
-    existing = db.query(Attendance).filter(
-        Attendance.eid == data.eid,
-        Attendance.date == data.date
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Attendance already marked for this date")
-
+    # Duplicates for the same date are rejected by uq_attendance_eid_date
     new_attendance = Attendance(
         eid=data.eid,
         company_id=data.company_id,
@@ -26,20 +74,51 @@ def create_attendance(db: Session, data: AttendanceCreate):
         approved_by=data.approved_by
     )
 
-    db.add(new_attendance)
-    db.commit()
-    db.refresh(new_attendance)
+    try:
+        with unit_of_work(db):
+            db.add(new_attendance)
+    except IntegrityError as e:
+        if is_duplicate_key(e):
+            raise HTTPException(status_code=400, detail="Attendance already marked for this date")
+        raise HTTPException(status_code=400, detail="Invalid employee or company")
     return new_attendance
 
 
 # 👀 View all attendance (Admin)
-def get_all_attendance(db: Session, company_id: int):
-    records = db.query(Attendance).filter(Attendance.company_id == company_id).all()
+def get_all_attendance(
+    db: Session,
+    company_id: int,
+    manager_id: str | None = None,
+    fields: tuple[str, ...] | None = None,
+    stream: bool = False,
+):
+    # Plain dicts of just the AttendanceOut columns (or the requested subset); the route encodes them with orjson
+    query = (
+        select(*projection(Attendance, AttendanceOut, fields=fields))
+        .select_from(Attendance)
+        .where(Attendance.company_id == company_id)
+    )
+    if manager_id:
+        query = query.where(in_org(Attendance.eid, manager_id))  # manager's whole org
+    if stream:
+        return stream_rows(query)  # NDJSON lines from a server-side cursor; an empty result is an empty body
+    records = as_dicts(db.execute(query))
     if not records:
         raise HTTPException(status_code=404, detail="No attendance records found")
     return records
 
 
+# 🔄 Delta sync: rows changed since the client's last sync token
+def get_attendance_changes(db: Session, company_id: int, updated_since: datetime | None = None):
+    sync_token, since = start_sync(db, updated_since)
+    query = db.query(Attendance).filter(Attendance.company_id == company_id)
+    deleted = []
+    if since is not None:
+        query = query.filter(Attendance.updated_at >= since)
+        deleted = deleted_since(db, "attendance", company_id, since)
+    return {"items": query.all(), "deleted": deleted, "full": since is None, "sync_token": sync_token}
+
+
 # 👁️ View employee attendance
 def get_attendance_by_eid(db: Session, eid: str):
     records = db.query(Attendance).filter(Attendance.eid == eid).all()
@@ -49,46 +128,48 @@ def get_attendance_by_eid(db: Session, eid: str):
 
 
 # ✏️ Update / Approve attendance
-def update_attendance(db: Session, attendance_id: int, data: AttendanceUpdate):
+def update_attendance(db: Session, attendance_id: int, data: AttendanceUpdate, actor: str | None = None):
     record = db.query(Attendance).filter(Attendance.attendance_id == attendance_id).first()
     if not record:
         raise HTTPException(status_code=404, detail="Attendance record not found")
 
-    update_data = data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(record, key, value)
-
-    db.commit()
-    db.refresh(record)
+    with unit_of_work(db):
+        update_data = data.model_dump(exclude_unset=True)
+        for key, value in update_data.items():
+            setattr(record, key, value)
+        set_audit_actor(db, actor)
+    invalidate_month(record.company_id, record.date)
     return record
 
 
 def check_in(db: Session, eid: str, company_id: int):
-    today = date.today()  # ✅ Pure date object (no time)
-
-    # Check if already checked in today
-    existing = db.query(Attendance).filter(
-        Attendance.eid == eid,
-        Attendance.date == today
-    ).first()
-
-    if existing:
-        raise HTTPException(status_code=400, detail="Already checked in today")
+    # Opt-in coalescing mode: acknowledge from memory, insert in multi-row batches
+    if CHECKIN_BUFFER_ENABLED:
+        result = checkin_buffer.check_in(eid, company_id)
+        event_bus.publish(company_id, "attendance.check_in", {"eid": eid, "date": result["date"], "check_in": result["check_in_time"]})
+        return result
 
+    today = date.today()  # ✅ Pure date object (no time)
     now = datetime.now().time()  # current time only
 
-    new_attendance = Attendance(
-        eid=eid,
-        company_id=company_id,
-        date=today,               # ✅ matches Date column type
-        check_in=now,
-        status="Present",
-        approved=True
-    )
-
-    db.add(new_attendance)
-    db.commit()
-    db.refresh(new_attendance)
+    # Single INSERT; uq_attendance_eid_date rejects a second check-in for today,
+    # even when two requests race each other.
+    try:
+        db.connection().execute(CHECK_IN_STATEMENT, {
+            "eid": eid,
+            "company_id": company_id,
+            "date": today,               # ✅ matches Date column type
+            "check_in": now,
+        })
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if is_duplicate_key(e):
+            raise HTTPException(status_code=400, detail="Already checked in today")
+        raise HTTPException(status_code=400, detail="Invalid employee or company")
+    invalidate_month(company_id, today)
+
+    event_bus.publish(company_id, "attendance.check_in", {"eid": eid, "date": str(today), "check_in": str(now)})
 
     return {
         "message": "Check-in recorded successfully",
@@ -101,11 +182,8 @@ def check_in(db: Session, eid: str, company_id: int):
 def check_out(db: Session, eid: str):
     today = date.today()
 
-    # ✅ Find today's attendance record
-    record = db.query(Attendance).filter(
-        Attendance.eid == eid,
-        Attendance.date == today
-    ).first()
+    # ✅ Today's check-in and the employee name in one round trip
+    record = db.connection().execute(OPEN_DAY_QUERY, {"eid": eid, "day": today}).first()
 
     if not record:
         raise HTTPException(status_code=404, detail="No check-in found for today")
@@ -113,36 +191,46 @@ def check_out(db: Session, eid: str):
     if record.check_out:
         raise HTTPException(status_code=400, detail="Already checked out today")
 
-    now = datetime.now().time()
+    if record.check_in is None:
+        raise HTTPException(status_code=400, detail="No check-in time recorded for today")
 
-    # ✅ Calculate worked hours
-    checkin_dt = datetime.combine(today, record.check_in)
-    checkout_dt = datetime.combine(today, now)
-    duration = (checkout_dt - checkin_dt).total_seconds() / 3600  # Convert seconds to hours
-
-    worked_hours = round(duration, 2)
-    record.check_out = now
-    record.worked_hours = worked_hours
-    record.status = "Completed"
-
-    # ✅ Calculate extra hours (if any)
-    extra_hours = 0
-    if worked_hours > 8:
-        extra_hours = round(worked_hours - 8, 2)
+    now = datetime.now().time()
 
-    # ✅ Fetch employee name
-    user = db.query(User).filter(User.eid == eid).first()
-    employee_name = user.name if user else "Unknown"
+    # ✅ Calculate worked and extra hours (extra = overtime by the shift policy, net of the break)
+    worked_hours = calculate_worked_hours(today, record.check_in, now)
+    extra_hours = day_overtime(get_policy(db, record.company_id), today, worked_hours)
 
+    result = db.connection().execute(
+        CLOSE_DAY_STATEMENT,
+        {"b_eid": eid, "b_day": today, "b_check_out": now, "b_worked_hours": worked_hours},
+    )
+    if result.rowcount == 0:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Already checked out today")
     db.commit()
-    db.refresh(record)
+    invalidate_month(record.company_id, today)
+
+    event_bus.publish(record.company_id, "attendance.check_out", {
+        "eid": eid,
+        "date": str(today),
+        "check_out": str(now),
+        "worked_hours": worked_hours
+    })
 
     return {
         "message": "Check-out recorded successfully",
-        "employee_name": employee_name,
-        "date": str(record.date),
+        "employee_name": record.name or "Unknown",
+        "date": str(today),
         "check_in": str(record.check_in),
-        "check_out": str(record.check_out),
+        "check_out": str(now),
         "worked_hours": worked_hours,
         "extra_hours": extra_hours
     }
+
+
+# 📊 Check-in buffer flush metrics
+def get_checkin_buffer_metrics():
+    data = checkin_buffer.metrics()
+    data["enabled"] = CHECKIN_BUFFER_ENABLED
+    data["durability"] = checkin_buffer.durability
+    return data
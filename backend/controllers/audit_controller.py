@@ -0,0 +1,51 @@
+import json
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from models.audit_model import AuditLog
+from utils.audit import AUDITED_MODELS
+
+AUDIT_ENTITIES = {entity for entity, _ in AUDITED_MODELS.values()}
+MAX_PAGE_SIZE = 200
+
+
+def _page(query, limit: int, before_id: int | None):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if before_id is not None:
+        query = query.filter(AuditLog.audit_id < before_id)
+    rows = query.order_by(AuditLog.audit_id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [
+        {
+            "audit_id": r.audit_id,
+            "entity": r.entity,
+            "entity_id": r.entity_id,
+            "company_id": r.company_id,
+            "action": r.action,
+            "actor": r.actor,
+            "changes": json.loads(r.changes),
+            "created_at": r.created_at,
+        }
+        for r in rows
+    ]
+    return {"items": items, "next_before_id": rows[-1].audit_id if has_more else None}
+
+
+# 📜 History of one record
+def get_entity_history(db: Session, company_id: int, entity: str, entity_id: str, limit: int = 50, before_id: int | None = None):
+    if entity not in AUDIT_ENTITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown entity. Use one of: {', '.join(sorted(AUDIT_ENTITIES))}")
+    query = db.query(AuditLog).filter(
+        AuditLog.entity == entity,
+        AuditLog.entity_id == entity_id,
+        AuditLog.company_id == company_id
+    )
+    return _page(query, limit, before_id)
+
+
+# 📜 All audited changes in a company
+def get_company_audit(db: Session, company_id: int, entity: str | None = None, limit: int = 50, before_id: int | None = None):
+    query = db.query(AuditLog).filter(AuditLog.company_id == company_id)
+    if entity:
+        query = query.filter(AuditLog.entity == entity)
+    return _page(query, limit, before_id)
@@ -0,0 +1,237 @@
+from datetime import date
+from sqlalchemy import select, update, false
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from models.attendance_model import Attendance
+from models.leave_model import LeaveRequest
+from models.payroll_model import Payroll
+from models.user_model import User
+from schemas.bulk_schema import BulkLeaveDecision, BulkAttendanceApproval, BulkPayrollDecision
+from controllers.leave_balance_controller import try_apply_leave_delta, leave_days
+from utils.audit import set_audit_actor, record_change
+from utils.availability import invalidate_availability
+from utils.events import event_bus
+from utils.shift_engine import invalidate_month
+from utils.concurrency import LEAVE_TRANSITIONS, PAYROLL_TRANSITIONS, can_transition, compare_and_set
+
+BULK_CHUNK_SIZE = 500     # ids per UPDATE ... WHERE id IN (...)
+BULK_MAX_ITEMS = 5000     # per request
+LEAVE_DECISIONS = ("Approved", "Rejected")
+PAYROLL_DECISIONS = ("Approved", "Rejected", "Paid")
+
+# NOTE: Every bulk call is a single transaction: the approver is validated once,
+# rows are read and updated chunk by chunk, and the commit happens at the end.
+# Leave and payroll decisions are compare-and-set on (id, version), without row
+# locks: if another approver changed any row in between, the call returns 409
+# and nothing is kept.
+
+
+def _chunks(ids: list[int]):
+    for i in range(0, len(ids), BULK_CHUNK_SIZE):
+        yield ids[i:i + BULK_CHUNK_SIZE]
+
+
+def _approver(db: Session, current_user, approved_by: str | None, company_id: int) -> str:
+    eid = approved_by or current_user.eid
+    approver = db.execute(select(User.eid, User.company_id).where(User.eid == eid)).first()
+    if not approver:
+        raise HTTPException(status_code=404, detail="Approver user not found")
+    if approver.company_id != company_id or current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot approve another company's records")
+    # The audit actor is the authenticated caller, not the (client-chosen) approver
+    set_audit_actor(db, current_user.eid)
+    return eid
+
+
+def _target_ids(db: Session, ids: list[int] | None, filter_query) -> list[int]:
+    if ids is None:
+        ids = db.execute(filter_query.limit(BULK_MAX_ITEMS + 1)).scalars().all()
+    ids = list(dict.fromkeys(ids))  # de-duplicate, keep order
+    if not ids:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    if len(ids) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} records per request")
+    return ids
+
+
+def _invalid(current: str | None, status: str) -> dict:
+    return {"outcome": "invalid_transition", "detail": f"Cannot change {current or 'Pending'} to {status}"}
+
+
+def _result(ids: list[int], outcomes: dict) -> dict:
+    results = [{"id": i, **outcomes.get(i, {"outcome": "not_found"})} for i in ids]
+    return {
+        "requested": len(ids),
+        "updated": sum(1 for r in results if r["outcome"] == "updated"),
+        "results": results,
+    }
+
+
+# ✅ Approve / reject many leave requests
+def bulk_decide_leaves(db: Session, data: BulkLeaveDecision, current_user) -> dict:
+    if data.status not in LEAVE_DECISIONS:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(LEAVE_DECISIONS)}")
+    approver = _approver(db, current_user, data.approved_by, data.company_id)
+
+    pending = select(LeaveRequest.leave_id).where(
+        LeaveRequest.company_id == data.company_id,
+        LeaveRequest.status == "Pending",
+    )
+    if data.start_from:
+        pending = pending.where(LeaveRequest.start_date >= data.start_from)
+    if data.start_to:
+        pending = pending.where(LeaveRequest.start_date <= data.start_to)
+    ids = _target_ids(db, data.leave_ids, pending.order_by(LeaveRequest.leave_id))
+
+    outcomes = {}
+    for chunk in _chunks(ids):
+        leaves = db.execute(
+            select(
+                LeaveRequest.leave_id,
+                LeaveRequest.eid,
+                LeaveRequest.company_id,
+                LeaveRequest.leave_type,
+                LeaveRequest.start_date,
+                LeaveRequest.end_date,
+                LeaveRequest.total_days,
+                LeaveRequest.status,
+                LeaveRequest.approved_by,
+                LeaveRequest.version,
+            ).where(LeaveRequest.leave_id.in_(chunk), LeaveRequest.company_id == data.company_id)
+        ).all()
+
+        to_update = {}  # leave_id -> version read
+        for leave in leaves:
+            if leave.status == data.status:
+                outcomes[leave.leave_id] = {"outcome": "unchanged"}
+                continue
+            if not can_transition(LEAVE_TRANSITIONS, leave.status, data.status):
+                outcomes[leave.leave_id] = _invalid(leave.status, data.status)
+                continue
+            # Balance ledger moves in the same transaction as the status change
+            if data.status == "Approved":
+                if not try_apply_leave_delta(db, leave, -leave_days(leave), "debit"):
+                    outcomes[leave.leave_id] = {
+                        "outcome": "insufficient_balance",
+                        "detail": f"Insufficient {leave.leave_type} balance",
+                    }
+                    continue
+            elif leave.status == "Approved":
+                try_apply_leave_delta(db, leave, leave_days(leave), "credit")
+            to_update[leave.leave_id] = leave.version
+            outcomes[leave.leave_id] = {"outcome": "updated"}
+            record_change(db, "leave", leave.leave_id, data.company_id, {
+                "status": {"before": leave.status, "after": data.status},
+                "approved_by": {"before": leave.approved_by, "after": approver},
+            })
+
+        compare_and_set(db, LeaveRequest, to_update, LEAVE_TRANSITIONS, status=data.status, approved_by=approver)
+
+    db.commit()
+    updated = [i for i in ids if outcomes.get(i, {}).get("outcome") == "updated"]
+    if updated:
+        invalidate_availability(data.company_id)
+        event_bus.publish(data.company_id, "leave.bulk_decided", {
+            "leave_ids": updated,
+            "status": data.status,
+            "approved_by": approver,
+        })
+    return _result(ids, outcomes)
+
+
+# ✅ Approve (or un-approve) many attendance rows
+def bulk_approve_attendance(db: Session, data: BulkAttendanceApproval, current_user) -> dict:
+    approver = _approver(db, current_user, data.approved_by, data.company_id)
+
+    unapproved = select(Attendance.attendance_id).where(
+        Attendance.company_id == data.company_id,
+        Attendance.approved == false(),
+    )
+    if data.date_from:
+        unapproved = unapproved.where(Attendance.date >= data.date_from)
+    if data.date_to:
+        unapproved = unapproved.where(Attendance.date <= data.date_to)
+    ids = _target_ids(db, data.attendance_ids, unapproved.order_by(Attendance.attendance_id))
+
+    outcomes = {}
+    months: set[tuple[int, int]] = set()
+    for chunk in _chunks(ids):
+        rows = db.execute(
+            select(Attendance.attendance_id, Attendance.date, Attendance.approved, Attendance.approved_by)
+            .where(Attendance.attendance_id.in_(chunk), Attendance.company_id == data.company_id)
+        ).all()
+        to_update = []
+        for row in rows:
+            if row.approved == data.approved:
+                outcomes[row.attendance_id] = {"outcome": "unchanged"}
+                continue
+            to_update.append(row.attendance_id)
+            months.add((row.date.year, row.date.month))
+            outcomes[row.attendance_id] = {"outcome": "updated"}
+            record_change(db, "attendance", row.attendance_id, data.company_id, {
+                "approved": {"before": row.approved, "after": data.approved},
+                "approved_by": {"before": row.approved_by, "after": approver},
+            })
+        if to_update:
+            db.execute(
+                update(Attendance)
+                .where(Attendance.attendance_id.in_(to_update))
+                .values(approved=data.approved, approved_by=approver)
+                .execution_options(synchronize_session=False)
+            )
+
+    db.commit()
+    for year, month in months:
+        invalidate_month(data.company_id, date(year, month, 1))
+    updated = [i for i in ids if outcomes.get(i, {}).get("outcome") == "updated"]
+    if updated:
+        invalidate_availability(data.company_id)
+        event_bus.publish(data.company_id, "attendance.bulk_approved", {
+            "attendance_ids": updated,
+            "approved": data.approved,
+            "approved_by": approver,
+        })
+    return _result(ids, outcomes)
+
+
+# ✅ Approve / reject / mark paid many payrolls
+def bulk_decide_payrolls(db: Session, data: BulkPayrollDecision, current_user) -> dict:
+    if data.status not in PAYROLL_DECISIONS:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(PAYROLL_DECISIONS)}")
+    approver = _approver(db, current_user, data.approved_by, data.company_id)
+
+    # Without ids: every payroll awaiting this decision (Approved ones when marking Paid)
+    pending = select(Payroll.payroll_id).where(
+        Payroll.company_id == data.company_id,
+        Payroll.status == ("Approved" if data.status == "Paid" else "Pending"),
+    )
+    if data.month:
+        pending = pending.where(Payroll.month == data.month)
+    if data.year:
+        pending = pending.where(Payroll.year == data.year)
+    ids = _target_ids(db, data.payroll_ids, pending.order_by(Payroll.payroll_id))
+
+    outcomes = {}
+    for chunk in _chunks(ids):
+        rows = db.execute(
+            select(Payroll.payroll_id, Payroll.status, Payroll.approved_by, Payroll.version)
+            .where(Payroll.payroll_id.in_(chunk), Payroll.company_id == data.company_id)
+        ).all()
+        to_update = {}  # payroll_id -> version read
+        for row in rows:
+            if row.status == data.status:
+                outcomes[row.payroll_id] = {"outcome": "unchanged"}
+                continue
+            if not can_transition(PAYROLL_TRANSITIONS, row.status, data.status):
+                outcomes[row.payroll_id] = _invalid(row.status, data.status)
+                continue
+            to_update[row.payroll_id] = row.version
+            outcomes[row.payroll_id] = {"outcome": "updated"}
+            record_change(db, "payroll", row.payroll_id, data.company_id, {
+                "status": {"before": row.status, "after": data.status},
+                "approved_by": {"before": row.approved_by, "after": approver},
+            })
+        compare_and_set(db, Payroll, to_update, PAYROLL_TRANSITIONS, status=data.status, approved_by=approver)
+
+    db.commit()
+    return _result(ids, outcomes)
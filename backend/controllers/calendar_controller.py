@@ -0,0 +1,67 @@
+from datetime import date
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from models.calendar_model import CompanyCalendar
+from schemas.calendar_schema import HolidayIn
+from utils.shift_engine import get_policy
+from utils.work_calendar import build_calendar, load_calendar, check_calendar_years
+
+# 📅 Working days and holidays of a year
+def get_calendar(db: Session, company_id: int, year: int, holidays_only: bool = False):
+    check_calendar_years(year, year)
+    load_calendar(db, company_id, date(year, 1, 1), date(year, 12, 31))  # builds the year if missing
+    db.commit()
+    query = select(CompanyCalendar).where(
+        CompanyCalendar.company_id == company_id,
+        CompanyCalendar.day >= date(year, 1, 1),
+        CompanyCalendar.day <= date(year, 12, 31),
+    )
+    if holidays_only:
+        query = query.where(CompanyCalendar.holiday_name.is_not(None))
+    return db.execute(query.order_by(CompanyCalendar.day)).scalars().all()
+
+
+# 🎉 Mark days as holidays
+def set_holidays(db: Session, company_id: int, holidays: list[HolidayIn]):
+    if not holidays:
+        raise HTTPException(status_code=400, detail="No holidays given")
+    days = [h.day for h in holidays]
+    load_calendar(db, company_id, min(days), max(days))
+    for holiday in holidays:
+        db.execute(
+            update(CompanyCalendar)
+            .where(CompanyCalendar.company_id == company_id, CompanyCalendar.day == holiday.day)
+            .values(is_working=False, holiday_name=holiday.name)
+        )
+    db.commit()
+    return db.execute(
+        select(CompanyCalendar)
+        .where(CompanyCalendar.company_id == company_id, CompanyCalendar.day.in_(days))
+        .order_by(CompanyCalendar.day)
+    ).scalars().all()
+
+
+# 🗑️ Turn a holiday back into a regular day
+def remove_holiday(db: Session, company_id: int, day: date):
+    result = db.execute(
+        update(CompanyCalendar)
+        .where(
+            CompanyCalendar.company_id == company_id,
+            CompanyCalendar.day == day,
+            CompanyCalendar.holiday_name.is_not(None),
+        )
+        .values(is_working=day.weekday() in get_policy(db, company_id)["working_days"], holiday_name=None)
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Holiday not found")
+    db.commit()
+    return {"message": "Holiday removed", "day": str(day)}
+
+
+# 🔄 Regenerate a year from the shift policy (holidays are kept)
+def regenerate_calendar(db: Session, company_id: int, year: int):
+    check_calendar_years(year, year)
+    days = build_calendar(db, company_id, year)
+    db.commit()
+    return {"company_id": company_id, "year": year, "days_written": days}
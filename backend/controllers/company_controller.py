@@ -1,7 +1,9 @@
+from sqlalchemy import select, or_
 from sqlalchemy.orm import Session
 from models.company_model import Company
 from schemas.company_schema import CompanyCreate
 from fastapi import HTTPException
+from utils.unit_of_work import unit_of_work
 
 def generate_company_code(name: str):
     words = name.split()
@@ -10,20 +12,20 @@ def generate_company_code(name: str):
 
 
 def create_company(db: Session, data: CompanyCreate):
-    # ✅ Check if company already exists
-    exists = db.query(Company).filter(Company.name == data.name).first()
-    if exists:
+    # ✅ Generate company code
+    company_code = generate_company_code(data.name)
+
+    # ✅ Check name and code clashes in one round trip
+    clashes = db.execute(
+        select(Company.name, Company.company_code)
+        .where(or_(Company.name == data.name, Company.company_code == company_code))
+    ).all()
+    if any(name == data.name for name, _ in clashes):
         raise HTTPException(
             status_code=400,
             detail="Company with this name already exists"
         )
-
-    # ✅ Generate company code
-    company_code = generate_company_code(data.name)
-
-    # ✅ Check if company code already exists
-    code_exists = db.query(Company).filter(Company.company_code == company_code).first()
-    if code_exists:
+    if clashes:
         raise HTTPException(
             status_code=400,
             detail="Company code already exists. Choose a different name."
@@ -39,9 +41,8 @@ def create_company(db: Session, data: CompanyCreate):
         established_year=data.established_year
     )
 
-    db.add(new_company)
-    db.commit()
-    db.refresh(new_company)
+    with unit_of_work(db):
+        db.add(new_company)
     return new_company
 
 def get_companies(db: Session):
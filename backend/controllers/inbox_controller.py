@@ -0,0 +1,65 @@
+from sqlalchemy import select, union_all, literal, func, false, String
+from sqlalchemy.orm import Session
+from models.attendance_model import Attendance
+from models.leave_model import LeaveRequest
+from models.payroll_model import Payroll
+from models.user_model import User
+from utils.hierarchy import in_org
+from utils.permissions import has_role, PAYROLL_ALLOWED_ROLES
+
+COMPANY_WIDE_ROLES = ["admin", "hr_officer"]   # see every pending item of the company
+INBOX_PAGE_SIZE = 50
+
+
+def _pending_conditions(user) -> dict:
+    """category -> (model, WHERE conditions) for what `user` may approve.
+
+    Admin/HR see the whole company; everyone else sees their direct and
+    indirect reports. Payrolls only appear for roles with payroll access.
+    """
+    def scope(model):
+        conditions = [model.company_id == user.company_id]
+        if not has_role(user, COMPANY_WIDE_ROLES):
+            conditions.append(in_org(model.eid, user.eid))
+        return conditions
+
+    categories = {
+        "leaves": (LeaveRequest, scope(LeaveRequest) + [LeaveRequest.status == "Pending"]),
+        "attendance": (Attendance, scope(Attendance) + [Attendance.approved == false()]),
+    }
+    if has_role(user, PAYROLL_ALLOWED_ROLES):
+        categories["payrolls"] = (Payroll, [Payroll.company_id == user.company_id, Payroll.status == "Pending"])
+    return categories
+
+
+# 🔔 Pending counts per category (one UNION ALL query; cheap enough to poll)
+def get_inbox_counts(db: Session, user) -> dict:
+    categories = _pending_conditions(user)
+    query = union_all(*(
+        select(literal(name, String).label("category"), func.count().label("pending"))
+        .select_from(model)
+        .where(*conditions)
+        for name, (model, conditions) in categories.items()
+    ))
+    counts = {name: 0 for name in categories}
+    counts.update({name: pending for name, pending in db.execute(query)})
+    return {"eid": user.eid, "counts": counts, "total": sum(counts.values())}
+
+
+# 📥 Pending items, oldest first (what has waited longest comes first)
+def get_inbox(db: Session, user, limit: int = INBOX_PAGE_SIZE) -> dict:
+    limit = max(1, min(limit, 200))
+    categories = _pending_conditions(user)
+    inbox = get_inbox_counts(db, user)
+
+    items = {}
+    for name, (model, conditions) in categories.items():
+        rows = db.execute(
+            select(model, User.name)
+            .join(User, User.eid == model.eid)
+            .where(*conditions)
+            .order_by(model.created_at)
+            .limit(limit)
+        ).all()
+        items[name] = [{**record.__dict__, "employee_name": employee_name} for record, employee_name in rows]
+    return {**inbox, "leaves": [], "attendance": [], "payrolls": [], **items}
@@ -0,0 +1,341 @@
+from datetime import date
+from sqlalchemy import select, insert, update, delete, exists, func, literal, Integer, Float, String
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from models.leave_balance_model import LeavePolicy, LeaveBalance, LeaveLedger
+from models.leave_model import LeaveRequest
+from models.user_model import User
+from schemas.leave_balance_schema import LeavePolicyIn
+
+ACCRUAL_MODES = ("monthly", "annual")
+
+# NOTE: leave_balances is a running total of leave_ledger. Approvals touch one
+# balance row with a conditional UPDATE (no read-modify-write); the accrual job
+# and the rebuild tool are set-based and recompute balances from the ledger.
+
+
+def leave_days(leave) -> int:
+    """Days charged for a leave (total_days, else the inclusive date range)."""
+    if leave.total_days:
+        return leave.total_days
+    return (leave.end_date - leave.start_date).days + 1
+
+
+# ➕➖ Move `days` for one leave (negative = debit) and append the ledger entry
+def try_apply_leave_delta(db: Session, leave, days: float, kind: str) -> bool:
+    """Adjust the balance row for the leave's (eid, leave_type, year) in the caller's transaction.
+
+    Debits only succeed while `balance >= days`; a leave type without a policy is
+    not limited, its usage is simply tracked. Returns False (and changes
+    nothing) when the balance is too low. Nothing is committed here.
+    """
+    year = leave.start_date.year  # a leave spanning New Year is charged to the year it starts
+    key = (
+        LeaveBalance.eid == leave.eid,
+        LeaveBalance.leave_type == leave.leave_type,
+        LeaveBalance.year == year,
+    )
+    stmt = update(LeaveBalance).where(*key).values(
+        used=LeaveBalance.used - days,
+        balance=LeaveBalance.balance + days,
+    )
+    if days < 0:
+        stmt = stmt.where(LeaveBalance.balance >= -days)
+
+    if db.execute(stmt).rowcount == 0:
+        has_row = db.execute(select(LeaveBalance.balance_id).where(*key)).first() is not None
+        limited = has_row or db.execute(
+            select(LeavePolicy.policy_id).where(
+                LeavePolicy.company_id == leave.company_id,
+                LeavePolicy.leave_type == leave.leave_type,
+            )
+        ).first() is not None
+        if days < 0 and limited:
+            return False
+        try:
+            with db.begin_nested():
+                db.execute(insert(LeaveBalance).values(
+                    eid=leave.eid,
+                    company_id=leave.company_id,
+                    leave_type=leave.leave_type,
+                    year=year,
+                    entitlement=0,
+                    accrued=0,
+                    used=-days,
+                    balance=days,
+                ))
+        except IntegrityError:
+            # Another request created the row first; apply the delta to it
+            db.execute(update(LeaveBalance).where(*key).values(
+                used=LeaveBalance.used - days,
+                balance=LeaveBalance.balance + days,
+            ))
+
+    db.execute(insert(LeaveLedger).values(
+        eid=leave.eid,
+        company_id=leave.company_id,
+        leave_type=leave.leave_type,
+        year=year,
+        kind=kind,
+        days=days,
+        leave_id=leave.leave_id,
+    ))
+    return True
+
+
+def apply_leave_delta(db: Session, leave, days: float, kind: str):
+    if not try_apply_leave_delta(db, leave, days, kind):
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Insufficient {leave.leave_type} balance")
+
+
+def debit_leave(db: Session, leave):
+    apply_leave_delta(db, leave, -leave_days(leave), "debit")
+
+
+def credit_leave(db: Session, leave):
+    apply_leave_delta(db, leave, leave_days(leave), "credit")
+
+
+# 👁️ Balances of one employee for a year
+def get_leave_balances(db: Session, eid: str, year: int | None = None):
+    year = year or date.today().year
+    return db.execute(
+        select(LeaveBalance)
+        .where(LeaveBalance.eid == eid, LeaveBalance.year == year)
+        .order_by(LeaveBalance.leave_type)
+    ).scalars().all()
+
+
+# 📜 Leave policies of a company
+def get_leave_policies(db: Session, company_id: int):
+    return db.execute(
+        select(LeavePolicy).where(LeavePolicy.company_id == company_id).order_by(LeavePolicy.leave_type)
+    ).scalars().all()
+
+
+def upsert_leave_policies(db: Session, company_id: int, data: list[LeavePolicyIn]):
+    existing = {p.leave_type: p for p in get_leave_policies(db, company_id)}
+    for item in data:
+        if item.accrual not in ACCRUAL_MODES:
+            raise HTTPException(status_code=400, detail=f"accrual must be one of {', '.join(ACCRUAL_MODES)}")
+        if item.annual_days < 0:
+            raise HTTPException(status_code=400, detail="annual_days cannot be negative")
+        policy = existing.get(item.leave_type)
+        if policy is None:
+            policy = LeavePolicy(company_id=company_id, leave_type=item.leave_type)
+            db.add(policy)
+        policy.annual_days = item.annual_days
+        policy.accrual = item.accrual
+    db.commit()
+    return get_leave_policies(db, company_id)
+
+
+def _ledger_sum(kinds: tuple[str, ...]):
+    """Correlated SUM(days) over the ledger entries of the outer balance row."""
+    return (
+        select(func.coalesce(func.sum(LeaveLedger.days), 0.0))
+        .where(
+            LeaveLedger.eid == LeaveBalance.eid,
+            LeaveLedger.leave_type == LeaveBalance.leave_type,
+            LeaveLedger.year == LeaveBalance.year,
+            LeaveLedger.kind.in_(kinds),
+        )
+        .scalar_subquery()
+    )
+
+
+def _refresh_balances(db: Session, company_id: int, year: int) -> int:
+    """Recompute entitlement/accrued/used/balance of every balance row from the ledger."""
+    entitlement = (
+        select(LeavePolicy.annual_days)
+        .where(LeavePolicy.company_id == LeaveBalance.company_id, LeavePolicy.leave_type == LeaveBalance.leave_type)
+        .scalar_subquery()
+    )
+    accrued = _ledger_sum(("accrual", "adjust"))
+    used = -_ledger_sum(("debit", "credit"))
+    stmt = (
+        update(LeaveBalance)
+        .where(LeaveBalance.company_id == company_id, LeaveBalance.year == year)
+        .values(
+            entitlement=func.coalesce(entitlement, 0.0),
+            accrued=accrued,
+            used=used,
+            balance=accrued - used,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).rowcount
+
+
+def _ensure_balance_rows(db: Session, company_id: int, year: int) -> int:
+    """One balance row per active employee and policy leave type."""
+    has_row = exists().where(
+        LeaveBalance.eid == User.eid,
+        LeaveBalance.leave_type == LeavePolicy.leave_type,
+        LeaveBalance.year == year,
+    )
+    missing = (
+        select(
+            User.eid,
+            User.company_id,
+            LeavePolicy.leave_type,
+            literal(year, Integer),
+            LeavePolicy.annual_days,
+            literal(0.0, Float),
+            literal(0.0, Float),
+            literal(0.0, Float),
+            func.now(),
+        )
+        .join(LeavePolicy, LeavePolicy.company_id == User.company_id)
+        .where(User.company_id == company_id, User.status == "Active", ~has_row)
+    )
+    stmt = (
+        insert(LeaveBalance)
+        .from_select(
+            ["eid", "company_id", "leave_type", "year", "entitlement", "accrued", "used", "balance", "updated_at"],
+            missing,
+        )
+        .prefix_with("IGNORE", dialect="mysql")
+    )
+    return db.execute(stmt).rowcount
+
+
+# 📅 Monthly accrual (idempotent per period)
+def accrue_leave(db: Session, company_id: int, year: int, month: int) -> dict:
+    """Credit every active employee for `year`-`month` with set-based statements.
+
+    Monthly policies accrue annual_days / 12 per month, annual ones the full
+    entitlement once per year. A (eid, leave_type, period) that already has an
+    accrual entry is skipped, so re-running a month changes nothing.
+    """
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="month must be between 1 and 12")
+    created = _ensure_balance_rows(db, company_id, year)
+
+    accrued = 0
+    for mode, period, amount in (
+        ("monthly", f"{year}-{month:02d}", LeavePolicy.annual_days / 12.0),
+        ("annual", str(year), LeavePolicy.annual_days),
+    ):
+        already = exists().where(
+            LeaveLedger.eid == User.eid,
+            LeaveLedger.leave_type == LeavePolicy.leave_type,
+            LeaveLedger.kind == "accrual",
+            LeaveLedger.period == period,
+        )
+        entries = (
+            select(
+                User.eid,
+                User.company_id,
+                LeavePolicy.leave_type,
+                literal(year, Integer),
+                literal("accrual", String),
+                func.round(amount, 2),
+                literal(period, String),
+                func.now(),
+            )
+            .join(LeavePolicy, LeavePolicy.company_id == User.company_id)
+            .where(
+                User.company_id == company_id,
+                User.status == "Active",
+                LeavePolicy.accrual == mode,
+                LeavePolicy.annual_days > 0,
+                ~already,
+            )
+        )
+        accrued += db.execute(
+            insert(LeaveLedger).from_select(
+                ["eid", "company_id", "leave_type", "year", "kind", "days", "period", "created_at"],
+                entries,
+            )
+        ).rowcount
+
+    refreshed = _refresh_balances(db, company_id, year) if accrued else 0
+    db.commit()
+    return {
+        "company_id": company_id,
+        "period": f"{year}-{month:02d}",
+        "balances_created": created,
+        "accrual_entries": accrued,
+        "balances_refreshed": refreshed,
+    }
+
+
+# 🔧 Rebuild debits from approved leaves and recompute every balance
+def rebuild_leave_balances(db: Session, company_id: int, year: int) -> dict:
+    """Repair tool: replace the year's debit/credit entries with one debit per
+    approved leave, then recompute all balances from the ledger. Accruals and
+    adjustments are kept as they are.
+    """
+    first, last = date(year, 1, 1), date(year, 12, 31)
+    removed = db.execute(
+        delete(LeaveLedger).where(
+            LeaveLedger.company_id == company_id,
+            LeaveLedger.year == year,
+            LeaveLedger.kind.in_(("debit", "credit")),
+        )
+    ).rowcount
+
+    days = func.coalesce(
+        func.nullif(LeaveRequest.total_days, 0),
+        func.datediff(LeaveRequest.end_date, LeaveRequest.start_date) + 1,
+    )
+    approved = (
+        LeaveRequest.company_id == company_id,
+        LeaveRequest.status == "Approved",
+        LeaveRequest.start_date >= first,
+        LeaveRequest.start_date <= last,
+    )
+    debits = db.execute(
+        insert(LeaveLedger).from_select(
+            ["eid", "company_id", "leave_type", "year", "kind", "days", "leave_id", "created_at"],
+            select(
+                LeaveRequest.eid,
+                LeaveRequest.company_id,
+                LeaveRequest.leave_type,
+                literal(year, Integer),
+                literal("debit", String),
+                -days,
+                LeaveRequest.leave_id,
+                func.now(),
+            ).where(*approved),
+        )
+    ).rowcount
+
+    # Leave types without a policy still need a row to carry their usage
+    has_row = exists().where(
+        LeaveBalance.eid == LeaveRequest.eid,
+        LeaveBalance.leave_type == LeaveRequest.leave_type,
+        LeaveBalance.year == year,
+    )
+    db.execute(
+        insert(LeaveBalance)
+        .from_select(
+            ["eid", "company_id", "leave_type", "year", "entitlement", "accrued", "used", "balance", "updated_at"],
+            select(
+                LeaveRequest.eid,
+                LeaveRequest.company_id,
+                LeaveRequest.leave_type,
+                literal(year, Integer),
+                literal(0.0, Float),
+                literal(0.0, Float),
+                literal(0.0, Float),
+                literal(0.0, Float),
+                func.now(),
+            ).where(*approved, ~has_row).distinct(),
+        )
+        .prefix_with("IGNORE", dialect="mysql")
+    )
+    created = _ensure_balance_rows(db, company_id, year)
+    refreshed = _refresh_balances(db, company_id, year)
+    db.commit()
+    return {
+        "company_id": company_id,
+        "year": year,
+        "ledger_entries_removed": removed,
+        "debits_written": debits,
+        "balances_created": created,
+        "balances_refreshed": refreshed,
+    }
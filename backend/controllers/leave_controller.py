@@ -1,40 +1,243 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, func
+from sqlalchemy.orm import Session, aliased
 from fastapi import HTTPException
 from models.leave_model import LeaveRequest
 from models.user_model import User
-from schemas.leave_schema import LeaveCreate, LeaveUpdate
-from datetime import datetime
+from schemas.leave_schema import LeaveCreate, LeaveUpdate, LeaveOut
+from datetime import datetime, timedelta
+from utils.sync import start_sync, deleted_since
+from utils.events import event_bus
+from utils.audit import set_audit_actor
+from controllers.leave_balance_controller import debit_leave, credit_leave
+from utils.work_calendar import count_working_days, load_calendar, calendar_years
+from utils.availability import invalidate_availability
+from utils.hierarchy import in_org
+from utils.fast_json import projection, as_dicts, stream_rows, wants
+from utils.unit_of_work import unit_of_work
+from utils.concurrency import LEAVE_TRANSITIONS, check_transition, check_version, detect_conflicts
+
+ACTIVE_LEAVE_STATUSES = ("Pending", "Approved")  # rejected/cancelled requests don't block new ones
+IMPORT_BATCH_SIZE = 500
+MAX_LEAVE_DAYS = 366  # longest range a single request may cover (calendar days)
+
+
+def employee_and_overlap(db: Session, eid: str, start_date, end_date):
+    """(company_id, id of an active leave overlapping [start_date, end_date]) for `eid`, in one round trip.
+
+    None for an unknown eid. The overlap is a subquery on ix_leave_requests_eid_range.
+    """
+    overlap = (
+        select(LeaveRequest.leave_id)
+        .where(
+            LeaveRequest.eid == eid,
+            LeaveRequest.start_date <= end_date,
+            LeaveRequest.end_date >= start_date,
+            LeaveRequest.status.in_(ACTIVE_LEAVE_STATUSES),
+        )
+        .limit(1)
+        .scalar_subquery()
+    )
+    return db.execute(select(User.company_id, overlap).where(User.eid == eid)).first()
 
 # ✅ Apply for leave
 def create_leave(db: Session, data: LeaveCreate):
+    if data.end_date < data.start_date:
+        raise HTTPException(status_code=400, detail="end_date cannot be before start_date")
+    if (data.end_date - data.start_date).days >= MAX_LEAVE_DAYS:
+        raise HTTPException(status_code=400, detail=f"A leave cannot span more than {MAX_LEAVE_DAYS} days")
+    employee = employee_and_overlap(db, data.eid, data.start_date, data.end_date)
+    if employee is None or employee[0] != data.company_id:
+        raise HTTPException(status_code=400, detail="Invalid employee or company")
+    if employee[1] is not None:
+        raise HTTPException(status_code=400, detail="Leave overlaps an existing request")
+
+    # total_days is computed from the calendar (weekends and holidays excluded), not taken from the client
+    total_days = count_working_days(db, data.company_id, data.start_date, data.end_date)
+    if total_days == 0:
+        raise HTTPException(status_code=400, detail="No working days in the selected range")
+
     new_leave = LeaveRequest(
         eid=data.eid,
         company_id=data.company_id,
         leave_type=data.leave_type,
         start_date=data.start_date,
         end_date=data.end_date,
-        total_days=data.total_days,
+        total_days=total_days,
         reason=data.reason
     )
 
-    db.add(new_leave)
-    db.commit()
-    db.refresh(new_leave)
+    with unit_of_work(db):
+        db.add(new_leave)
+
+    event_bus.publish(new_leave.company_id, "leave.created", {
+        "leave_id": new_leave.leave_id,
+        "eid": new_leave.eid,
+        "leave_type": new_leave.leave_type,
+        "start_date": new_leave.start_date,
+        "end_date": new_leave.end_date,
+        "status": new_leave.status
+    })
     return new_leave
 
 
+# 📥 Bulk import leave requests (validated in batches)
+def import_leaves(
+    db: Session,
+    items: list[LeaveCreate],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    company_id: int | None = None,
+):
+    """Insert valid rows and report the rest; each batch costs a handful of queries.
+
+    Per batch: one lookup of the employees, one of their overlapping active
+    leaves and one calendar range per company, then a single multi-row INSERT.
+    Rows are also checked against earlier rows of the same import. With
+    `company_id`, rows of any other company are rejected.
+    """
+    report = {"received": len(items), "imported": 0, "rejected": []}
+    accepted_ranges: dict[str, list[tuple]] = {}
+    imported_by_company: dict[int, int] = {}
+    years = calendar_years()
+
+    for offset in range(0, len(items), batch_size):
+        batch = items[offset:offset + batch_size]
+        eids = {item.eid for item in batch}
+        employees = dict(db.execute(select(User.eid, User.company_id).where(User.eid.in_(eids))).all())
+
+        # Row checks that need no calendar; only rows passing them widen the
+        # ranges loaded below (bounded by MAX_LEAVE_DAYS and the calendar window)
+        errors = {}
+        for index, item in enumerate(batch, start=offset):
+            if company_id is not None and item.company_id != company_id:
+                errors[index] = "Row belongs to another company"
+            elif employees.get(item.eid) != item.company_id:
+                errors[index] = "Invalid employee or company"
+            elif item.end_date < item.start_date:
+                errors[index] = "end_date cannot be before start_date"
+            elif (item.end_date - item.start_date).days >= MAX_LEAVE_DAYS:
+                errors[index] = f"A leave cannot span more than {MAX_LEAVE_DAYS} days"
+            elif item.start_date.year not in years or item.end_date.year not in years:
+                errors[index] = f"Dates must fall between {years[0]} and {years[-1]}"
+        valid = [item for index, item in enumerate(batch, start=offset) if index not in errors]
+        calendars = {}
+        if valid:
+            start = min(item.start_date for item in valid)
+            end = max(item.end_date for item in valid)
+            for eid, leave_start, leave_end in db.execute(
+                select(LeaveRequest.eid, LeaveRequest.start_date, LeaveRequest.end_date).where(
+                    LeaveRequest.eid.in_({item.eid for item in valid}),
+                    LeaveRequest.start_date <= end,
+                    LeaveRequest.end_date >= start,
+                    LeaveRequest.status.in_(ACTIVE_LEAVE_STATUSES),
+                )
+            ):
+                accepted_ranges.setdefault(eid, []).append((leave_start, leave_end))
+            for company in {item.company_id for item in valid}:
+                company_rows = [item for item in valid if item.company_id == company]
+                calendars[company] = load_calendar(
+                    db,
+                    company,
+                    min(item.start_date for item in company_rows),
+                    max(item.end_date for item in company_rows),
+                )
+
+        rows = []
+        for index, item in enumerate(batch, start=offset):
+            error = errors.get(index)
+            if error is None and any(
+                s <= item.end_date and e >= item.start_date for s, e in accepted_ranges.get(item.eid, ())
+            ):
+                error = "Leave overlaps an existing request"
+            if error is None:
+                calendar = calendars[item.company_id]
+                total_days = sum(
+                    1 for offset_days in range((item.end_date - item.start_date).days + 1)
+                    if calendar[item.start_date + timedelta(days=offset_days)]
+                )
+                if total_days == 0:
+                    error = "No working days in the selected range"
+            if error:
+                report["rejected"].append({"index": index, "eid": item.eid, "detail": error})
+                continue
+
+            accepted_ranges.setdefault(item.eid, []).append((item.start_date, item.end_date))
+            imported_by_company[item.company_id] = imported_by_company.get(item.company_id, 0) + 1
+            rows.append({
+                "eid": item.eid,
+                "company_id": item.company_id,
+                "leave_type": item.leave_type,
+                "start_date": item.start_date,
+                "end_date": item.end_date,
+                "total_days": total_days,
+                "reason": item.reason,
+                "status": "Pending",
+                # created_at/updated_at come from the column defaults (DB clock,
+                # which delta sync tokens are issued from)
+            })
+
+        if rows:
+            db.execute(insert(LeaveRequest), rows)
+        db.commit()
+        report["imported"] += len(rows)
+
+    for company_id, imported in imported_by_company.items():
+        event_bus.publish(company_id, "leave.imported", {"imported": imported})
+    return report
+
+
 # 👀 Get all leaves for a company (Admin)
-def get_all_leaves(db: Session, company_id: int):
-    leaves = db.query(LeaveRequest).filter(LeaveRequest.company_id == company_id).all()
+def get_all_leaves(
+    db: Session,
+    company_id: int,
+    manager_id: str | None = None,
+    fields: tuple[str, ...] | None = None,
+    stream: bool = False,
+):
+    # Employee and approver names come from the same query (no per-row lookups),
+    # joined only when the fieldset asks for them
+    query = (
+        select(*projection(LeaveRequest, LeaveOut, fields=fields))
+        .select_from(LeaveRequest)
+        .where(LeaveRequest.company_id == company_id)
+    )
+    if wants(fields, "employee_name"):
+        employee = aliased(User)
+        query = query.add_columns(func.coalesce(employee.name, "Unknown").label("employee_name")).outerjoin(
+            employee, employee.eid == LeaveRequest.eid
+        )
+    if wants(fields, "approver_name"):
+        approver = aliased(User)
+        query = query.add_columns(approver.name.label("approver_name")).outerjoin(
+            approver, approver.eid == LeaveRequest.approved_by
+        )
+    if manager_id:
+        query = query.where(in_org(LeaveRequest.eid, manager_id))  # manager's whole org
+    if stream:
+        return stream_rows(query)  # NDJSON lines from a server-side cursor; an empty result is an empty body
+    leaves = as_dicts(db.execute(query))
     if not leaves:
         raise HTTPException(status_code=404, detail="No leave records found")
-    result = []
-    for leave in leaves:
-        user = db.query(User).filter(User.eid == leave.eid).first()
+    return leaves
+
+
+# 🔄 Delta sync: leaves changed since the client's last sync token
+def get_leave_changes(db: Session, company_id: int, updated_since: datetime | None = None):
+    sync_token, since = start_sync(db, updated_since)
+    query = (
+        db.query(LeaveRequest, User.name)
+        .outerjoin(User, User.eid == LeaveRequest.eid)
+        .filter(LeaveRequest.company_id == company_id)
+    )
+    deleted = []
+    if since is not None:
+        query = query.filter(LeaveRequest.updated_at >= since)
+        deleted = deleted_since(db, "leave", company_id, since)
+    items = []
+    for leave, employee_name in query.all():
         leave_dict = leave.__dict__.copy()
-        leave_dict["employee_name"] = user.name if user else "Unknown"
-        result.append(leave_dict)
-    return result
+        leave_dict["employee_name"] = employee_name or "Unknown"
+        items.append(leave_dict)
+    return {"items": items, "deleted": deleted, "full": since is None, "sync_token": sync_token}
 
 
 # 👁️ Get leave by employee
@@ -46,38 +249,66 @@ def get_leave_by_eid(db: Session, eid: str):
 
 
 # ✏️ Approve or reject leave
-def update_leave(db: Session, leave_id: int, data: LeaveUpdate):
+def update_leave(db: Session, leave_id: int, data: LeaveUpdate, actor: str | None = None):
     leave = db.query(LeaveRequest).filter(LeaveRequest.leave_id == leave_id).first()
     if not leave:
         raise HTTPException(status_code=404, detail="Leave request not found")
 
-    update_data = data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(leave, key, value)
+    check_version(leave, data.version)
+    update_data = data.model_dump(exclude_unset=True, exclude={"version"})
+    # Same -> same is not a transition: a second "Approved" is a conflict, not a no-op
+    if "status" in update_data:
+        check_transition(LEAVE_TRANSITIONS, leave.status, update_data["status"], "Leave request")
+
+    # Keep the balance ledger in the same transaction as the status change;
+    # the versioned UPDATE turns a concurrent change into 409 (and rolls it back)
+    with detect_conflicts(), unit_of_work(db):
+        was_approved = leave.status == "Approved"
+        for key, value in update_data.items():
+            setattr(leave, key, value)
+        set_audit_actor(db, actor)
 
-    db.commit()
-    db.refresh(leave)
+        if was_approved and leave.status != "Approved":
+            credit_leave(db, leave)
+        elif not was_approved and leave.status == "Approved":
+            debit_leave(db, leave)
+    invalidate_availability(leave.company_id)
     return leave
 
-def approve_or_reject_leave(db: Session, leave_id: int, data: LeaveUpdate):
+def approve_or_reject_leave(db: Session, leave_id: int, data: LeaveUpdate, actor: str | None = None):
     leave = db.query(LeaveRequest).filter(LeaveRequest.leave_id == leave_id).first()
     if not leave:
         raise HTTPException(status_code=404, detail="Leave request not found")
 
-    # Validate approver
-    approver = db.query(User).filter(User.eid == data.approved_by).first()
-    if not approver:
+    # Validate approver; the employee's name comes back in the same query
+    names = dict(db.execute(select(User.eid, User.name).where(User.eid.in_([data.approved_by, leave.eid]))).all())
+    if data.approved_by not in names:
         raise HTTPException(status_code=404, detail="Approver user not found")
+    employee_name = names.get(leave.eid, "Unknown")
 
-    # Update leave
-    leave.status = data.status
-    leave.approved_by = data.approved_by
-    db.commit()
-    db.refresh(leave)
+    # A second approver acting on a stale copy gets 409 instead of overwriting
+    check_version(leave, data.version)
+    check_transition(LEAVE_TRANSITIONS, leave.status, data.status, "Leave request")
 
-    # Get employee and approver names
-    employee = db.query(User).filter(User.eid == leave.eid).first()
-    employee_name = employee.name if employee else "Unknown"
+    # Update leave (and its balance, in the same transaction). The flush is
+    # `UPDATE ... WHERE leave_id = ? AND version = ?`, so of two concurrent
+    # decisions only the first commits; the other is rolled back with its debit.
+    with detect_conflicts(), unit_of_work(db):
+        if leave.status == "Approved" and data.status != "Approved":
+            credit_leave(db, leave)
+        elif leave.status != "Approved" and data.status == "Approved":
+            debit_leave(db, leave)
+        leave.status = data.status
+        leave.approved_by = data.approved_by
+        set_audit_actor(db, actor)
+    invalidate_availability(leave.company_id)
+
+    event_bus.publish(leave.company_id, "leave.decided", {
+        "leave_id": leave.leave_id,
+        "eid": leave.eid,
+        "status": leave.status,
+        "approved_by": data.approved_by
+    })
 
     return {
         "message": f"Leave {data.status.lower()} successfully",
@@ -86,8 +317,9 @@ def approve_or_reject_leave(db: Session, leave_id: int, data: LeaveUpdate):
         "leave_type": leave.leave_type,
         "status": leave.status,
         "approved_by": data.approved_by,
-        "approver_name": approver.name,
+        "approver_name": names[data.approved_by],
         "start_date": str(leave.start_date),
         "end_date": str(leave.end_date),
-        "total_days": leave.total_days
+        "total_days": leave.total_days,
+        "version": leave.version
     }
\ No newline at end of file
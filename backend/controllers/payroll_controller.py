@@ -1,10 +1,16 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from models.payroll_model import Payroll
-from schemas.payroll_schema import PayrollCreate, PayrollUpdate
+from schemas.payroll_schema import PayrollCreate, PayrollUpdate, PayrollOut
 from models.user_model import User
-from sqlalchemy import func, extract
+from sqlalchemy import select, func
 from datetime import datetime
+from utils.sync import start_sync, deleted_since
+from utils.audit import set_audit_actor
+from utils.hierarchy import in_org
+from utils.fast_json import projection, as_dicts, stream_rows
+from utils.unit_of_work import unit_of_work
+from utils.concurrency import PAYROLL_TRANSITIONS, check_transition, check_version, detect_conflicts
 
 # ✅ Generate payroll entry
 def create_payroll(db: Session, data: PayrollCreate):
@@ -20,21 +26,46 @@ def create_payroll(db: Session, data: PayrollCreate):
         approved_by=None   # ✅ Don’t set yet
     )
 
-    db.add(new_payroll)
-    db.commit()
-    db.refresh(new_payroll)
+    with unit_of_work(db):
+        db.add(new_payroll)
     return new_payroll
 
 
 
 # 👀 View all payrolls (Admin)
-def get_all_payrolls(db: Session, company_id: int):
-    payrolls = db.query(Payroll).filter(Payroll.company_id == company_id).all()
+def get_all_payrolls(
+    db: Session,
+    company_id: int,
+    manager_id: str | None = None,
+    fields: tuple[str, ...] | None = None,
+    stream: bool = False,
+):
+    query = (
+        select(*projection(Payroll, PayrollOut, fields=fields))
+        .select_from(Payroll)
+        .where(Payroll.company_id == company_id)
+    )
+    if manager_id:
+        query = query.where(in_org(Payroll.eid, manager_id))  # manager's whole org
+    if stream:
+        return stream_rows(query)  # NDJSON lines from a server-side cursor; an empty result is an empty body
+    payrolls = as_dicts(db.execute(query))
     if not payrolls:
         raise HTTPException(status_code=404, detail="No payroll records found")
     return payrolls
 
 
+# 🔄 Delta sync: payrolls changed since the client's last sync token
+def get_payroll_changes(db: Session, company_id: int, updated_since: datetime | None = None):
+    sync_token, since = start_sync(db, updated_since)
+    query = db.query(Payroll).filter(Payroll.company_id == company_id)
+    deleted = []
+    if since is not None:
+        query = query.filter(Payroll.updated_at >= since)
+        deleted = deleted_since(db, "payroll", company_id, since)
+    return {"items": query.all(), "deleted": deleted, "full": since is None, "sync_token": sync_token}
+
+
 # 👁️ Get payroll by employee
 def get_payroll_by_eid(db: Session, eid: str):
     payrolls = db.query(Payroll).filter(Payroll.eid == eid).all()
@@ -44,17 +75,23 @@ def get_payroll_by_eid(db: Session, eid: str):
 
 
 # ✏️ Update payroll (approve/payout)
-def update_payroll(db: Session, payroll_id: int, data: PayrollUpdate):
+def update_payroll(db: Session, payroll_id: int, data: PayrollUpdate, actor: str | None = None):
     record = db.query(Payroll).filter(Payroll.payroll_id == payroll_id).first()
     if not record:
         raise HTTPException(status_code=404, detail="Payroll record not found")
 
-    update_data = data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(record, key, value)
-
-    db.commit()
-    db.refresh(record)
+    check_version(record, data.version)
+    update_data = data.model_dump(exclude_unset=True, exclude={"version"})
+    # Same -> same is not a transition: a second "Approved" is a conflict, not a no-op
+    if "status" in update_data:
+        check_transition(PAYROLL_TRANSITIONS, record.status, update_data["status"], "Payroll")
+
+    # The flush is `UPDATE ... WHERE payroll_id = ? AND version = ?`: a concurrent
+    # change since the read above makes it miss, which surfaces as 409
+    with detect_conflicts(), unit_of_work(db):
+        for key, value in update_data.items():
+            setattr(record, key, value)
+        set_audit_actor(db, actor)
     return record
 
 
@@ -114,28 +151,23 @@ def get_employer_cost(db: Session, company_id: int, view: str = "monthly"):
 
 # ---------- EMPLOYEE COUNT ----------
 def get_employee_count(db: Session, company_id: int, view: str = "monthly"):
+    # join_period (YYYYMM) is a stored column indexed with company_id, so this never reads the table rows
     if view == "monthly":
         counts = (
-            db.query(
-                extract("month", User.date_of_joining).label("month"),
-                extract("year", User.date_of_joining).label("year"),
-                func.count(User.eid).label("count")
-            )
-            .filter(User.company_id == company_id)
-            .group_by("month", "year")
-            .order_by("year", "month")
+            db.query(User.join_period, func.count().label("count"))
+            .filter(User.company_id == company_id, User.join_period.is_not(None))
+            .group_by(User.join_period)
+            .order_by(User.join_period)
             .all()
         )
-        return [{"month": int(c.month), "year": int(c.year), "count": c.count} for c in counts]
+        return [{"month": c.join_period % 100, "year": c.join_period // 100, "count": c.count} for c in counts]
     else:
+        year = User.join_period // 100
         counts = (
-            db.query(
-                extract("year", User.date_of_joining).label("year"),
-                func.count(User.eid).label("count")
-            )
-            .filter(User.company_id == company_id)
-            .group_by("year")
-            .order_by("year")
+            db.query(year.label("year"), func.count().label("count"))
+            .filter(User.company_id == company_id, User.join_period.is_not(None))
+            .group_by(year)
+            .order_by(year)
             .all()
         )
         return [{"year": int(c.year), "count": c.count} for c in counts]
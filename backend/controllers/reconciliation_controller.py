@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+from sqlalchemy import select, insert, update, exists, case, literal, func, or_, Date, Boolean, Float
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from models.attendance_model import Attendance
+from models.company_model import Company
+from models.leave_model import LeaveRequest
+from models.user_model import User
+from controllers.attendance_controller import worked_hours_sql
+from utils.shift_engine import get_policy, invalidate_month
+from utils.sync import purge_tombstones
+from utils.work_calendar import is_working_day
+
+# NOTE: Set-based statements only (one INSERT ... SELECT and one UPDATE per
+# company per day); nothing here loops over employees.
+
+
+# 🚫 Insert "Absent" / "On Leave" rows for active employees with no row for the day
+def mark_absentees(db: Session, company_id: int, day: date) -> int:
+    on_leave = exists().where(
+        LeaveRequest.eid == User.eid,
+        LeaveRequest.status == "Approved",
+        LeaveRequest.start_date <= day,
+        LeaveRequest.end_date >= day,
+    )
+    has_attendance = exists().where(Attendance.eid == User.eid, Attendance.date == day)
+
+    missing = select(
+        User.eid,
+        User.company_id,
+        literal(day, Date),
+        case((on_leave, "On Leave"), else_="Absent"),
+        literal(True, Boolean),
+        literal(0.0, Float),
+        func.now(),
+        func.now(),
+    ).where(
+        User.company_id == company_id,
+        User.status == "Active",
+        or_(User.date_of_joining.is_(None), User.date_of_joining < day + timedelta(days=1)),
+        ~has_attendance,
+    )
+
+    stmt = (
+        insert(Attendance)
+        .from_select(
+            ["eid", "company_id", "date", "status", "approved", "worked_hours", "created_at", "updated_at"],
+            missing,
+        )
+        # A late check-in racing the job keeps its own row
+        .prefix_with("IGNORE", dialect="mysql")
+    )
+    return db.execute(stmt).rowcount
+
+
+# ⏹️ Close check-ins that were never checked out, at the policy's shift end
+def close_open_checkins(db: Session, company_id: int, day: date) -> int:
+    shift_end = get_policy(db, company_id)["shift_end"]
+    close_at = case((Attendance.check_in < shift_end, shift_end), else_=Attendance.check_in)
+    stmt = (
+        update(Attendance)
+        .where(
+            Attendance.company_id == company_id,
+            Attendance.date == day,
+            Attendance.check_in.is_not(None),
+            Attendance.check_out.is_(None),
+        )
+        .values(
+            check_out=close_at,
+            worked_hours=worked_hours_sql(Attendance.check_in, close_at),
+            status="Completed",
+            approved=False,  # flag for review; the employee never checked out
+        )
+    )
+    return db.execute(stmt).rowcount
+
+
+# 🌙 Reconcile one day for one company
+def reconcile_company_day(db: Session, company_id: int, day: date) -> dict:
+    # Today's open check-ins would be force-closed and the Absent rows would block late check-ins
+    if day >= date.today():
+        raise HTTPException(status_code=400, detail="Only past days can be reconciled")
+    closed = close_open_checkins(db, company_id, day)
+    # Nobody is "Absent" on a weekend or holiday
+    marked = mark_absentees(db, company_id, day) if is_working_day(db, company_id, day) else 0
+    db.commit()
+    invalidate_month(company_id, day)
+    return {"company_id": company_id, "date": str(day), "auto_closed": closed, "absent_or_on_leave": marked}
+
+
+# 🌙 Nightly job: reconcile every company (default: yesterday)
+def run_nightly_reconciliation(db: Session, day: date | None = None, company_ids: list[int] | None = None) -> dict:
+    day = day or date.today() - timedelta(days=1)
+    if company_ids is None:
+        company_ids = db.execute(select(Company.company_id)).scalars().all()
+    results = [reconcile_company_day(db, company_id, day) for company_id in company_ids]
+    return {
+        "date": str(day),
+        "companies": results,
+        "tombstones_purged": purge_tombstones(db),
+    }
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from models.role_model import Role
+from utils.unit_of_work import unit_of_work
 import re
 
 def _normalize(role_name: str) -> str:
@@ -18,9 +19,8 @@ def create_role(role_name: str, db: Session):
         return existing  # return existing to avoid silent None confusion
 
     new_role = Role(name=norm)
-    db.add(new_role)
-    db.commit()
-    db.refresh(new_role)
+    with unit_of_work(db):
+        db.add(new_role)
     return new_role
 
 def get_all_roles(db: Session):
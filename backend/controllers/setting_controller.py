@@ -3,6 +3,7 @@ from fastapi import HTTPException
 from models.user_model import User
 from models.role_model import Role
 from schemas.setting_schema import UpdateRoleRequest, UpdateEmailRequest
+from utils.unit_of_work import unit_of_work
 
 # NOTE: This controller is tailored for the admin Settings page UI.
 # It purposely returns lightweight dictionaries instead of ORM objects so the
@@ -64,9 +65,8 @@ def update_user_role(db: Session, eid: str, data: UpdateRoleRequest):
             }
         }
 
-    user.role_id = data.role_id
-    db.commit()
-    db.refresh(user)
+    with unit_of_work(db):
+        user.role_id = data.role_id
 
     return {
         "message": f"Role updated successfully for {user.name}",
@@ -84,13 +84,11 @@ def update_user_email(db: Session, eid: str, data: UpdateEmailRequest):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if data.company_email is not None:
-        user.company_email = data.company_email
-    if data.personal_email is not None:
-        user.personal_email = data.personal_email
-
-    db.commit()
-    db.refresh(user)
+    with unit_of_work(db):
+        if data.company_email is not None:
+            user.company_email = data.company_email
+        if data.personal_email is not None:
+            user.personal_email = data.personal_email
     return {
         "message": f"Email updated successfully for {user.name}",
         "user": {
@@ -0,0 +1,45 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from models.shift_policy_model import ShiftPolicy
+from schemas.shift_policy_schema import ShiftPolicyIn
+from utils.shift_engine import get_policy, invalidate_policy, get_month_summary
+from utils.work_calendar import rebuild_calendars
+from utils.unit_of_work import unit_of_work
+
+# 🕘 Get a company's shift policy (defaults if not configured)
+def get_shift_policy(db: Session, company_id: int):
+    return {**get_policy(db, company_id), "company_id": company_id}
+
+
+# ✏️ Create or replace a company's shift policy
+def upsert_shift_policy(db: Session, company_id: int, data: ShiftPolicyIn):
+    if data.shift_end <= data.shift_start:
+        raise HTTPException(status_code=400, detail="shift_end must be after shift_start")
+    if not data.working_days or any(d < 0 or d > 6 for d in data.working_days):
+        raise HTTPException(status_code=400, detail="working_days must be weekday numbers 0 (Mon) to 6 (Sun)")
+
+    with unit_of_work(db):
+        policy = db.query(ShiftPolicy).filter(ShiftPolicy.company_id == company_id).first()
+        if not policy:
+            policy = ShiftPolicy(company_id=company_id)
+            db.add(policy)
+
+        values = data.model_dump()
+        values["working_days"] = ",".join(str(d) for d in sorted(set(data.working_days)))
+        for key, value in values.items():
+            setattr(policy, key, value)
+
+        db.flush()
+        invalidate_policy(company_id)
+        # Working days may have changed; regenerate the calendar years already built
+        rebuild_calendars(db, company_id)
+    # The rebuild cached the policy before commit; drop it in case the commit failed
+    invalidate_policy(company_id)
+    return get_shift_policy(db, company_id)
+
+
+# 📊 Overtime / lateness / short days for every employee in a month
+def get_shift_summary(db: Session, company_id: int, year: int, month: int):
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="month must be between 1 and 12")
+    return get_month_summary(db, company_id, year, month)
@@ -3,9 +3,15 @@ from fastapi import HTTPException
 from models.user_model import User
 from models.company_model import Company
 from models.role_model import Role
-from schemas.user_schema import UserCreate
+from schemas.user_schema import UserCreate, UserOut
 from utils.auth import hash_password, verify_password, create_access_token
 from utils.eid_generator import generate_eid
+from utils.rate_limit import login_ip_limiter, login_eid_limiter
+from utils.hierarchy import add_to_hierarchy, validate_manager, move_subtree
+from models.hierarchy_model import UserHierarchy
+from sqlalchemy import select
+from utils.fast_json import projection, as_dicts
+from utils.unit_of_work import unit_of_work
 from datetime import datetime
 
 # ✅ Create User
@@ -15,6 +21,9 @@ def create_user(db: Session, data: UserCreate):
     if db.query(User).filter(User.personal_email == data.personal_email).first():
         raise HTTPException(status_code=400, detail="Personal email already exists")
 
+    if data.manager_id:
+        validate_manager(db, None, data.company_id, data.manager_id)
+
     # Generate EID
     eid = generate_eid(
         db=db,
@@ -33,12 +42,14 @@ def create_user(db: Session, data: UserCreate):
         password_hash=hash_password(data.password),
         department=data.department,
         position=data.position,
-        date_of_joining=data.date_of_joining
+        date_of_joining=data.date_of_joining,
+        manager_id=data.manager_id
     )
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    with unit_of_work(db):
+        db.add(new_user)
+        db.flush()
+        add_to_hierarchy(db, eid, data.company_id, data.manager_id)
 
     return {
         "eid": new_user.eid,
@@ -61,33 +72,27 @@ def create_user(db: Session, data: UserCreate):
 
 # ✅ Fetch All Users
 def get_all_users(db: Session):
-    users = db.query(User).all()
-
-    output = []
-    for user in users:
-        output.append({
-            "eid": user.eid,
-            "company_id": user.company_id,
-            "role_id": user.role_id,
-            "name": user.name,
-            "personal_email": user.personal_email,
-            "company_email": user.company_email,
-            "department": user.department,
-            "position": user.position,
-            "date_of_joining": user.date_of_joining,
-            "status": user.status,
-            "is_first_login": user.is_first_login,
-            "created_at": user.created_at,
-            "updated_at": user.updated_at,
-            "company_name": user.company.name,
-            "role_name": user.role.name
-        })
-    
-    return output
+    # One joined query for the names; password_hash is never selected
+    query = (
+        select(
+            *projection(User, UserOut),
+            Company.name.label("company_name"),
+            Role.name.label("role_name"),
+        )
+        .join(Company, Company.company_id == User.company_id)
+        .join(Role, Role.rid == User.role_id)
+    )
+    return as_dicts(db.execute(query))
 
 
 # ✅ Login User
-def login_user(db: Session, eid: str, password: str):
+def login_user(db: Session, eid: str, password: str, client_ip: str | None = None):
+
+    # ✅ Throttle before any DB or bcrypt work. The EID bucket is only charged
+    # by wrong passwords, so nobody can lock an account out by just sending its EID.
+    if client_ip:
+        login_ip_limiter.check(client_ip)
+    login_eid_limiter.peek(eid)
 
     # ✅ Find user using EID
     user = db.query(User).filter(User.eid == eid).first()
@@ -97,6 +102,7 @@ def login_user(db: Session, eid: str, password: str):
 
     # ✅ Verify password
     if not verify_password(password, user.password_hash):
+        login_eid_limiter.charge(eid)
         raise HTTPException(status_code=400, detail="Wrong password")
 
     # ✅ Generate token
@@ -133,6 +139,9 @@ def admin_register(db: Session, data):
             status_code=400,
             detail="Company already exists. You cannot register as admin."
         )
+
+    if db.query(User).filter(User.personal_email == data.email).first():
+        raise HTTPException(status_code=400, detail="Personal email already exists")
     
     # ✅ Create new company
     company_code = "".join(w[0] for w in data.company_name.split()).upper()
@@ -146,44 +155,47 @@ def admin_register(db: Session, data):
         website=None,
         established_year=datetime.now().year
     )
-    db.add(new_company)
-    db.commit()
-    db.refresh(new_company)
-
-    # ✅ Create role "admin" if not exists
-    admin_role = db.query(Role).filter(Role.name == "admin").first()
-    if not admin_role:
-        admin_role = Role(name="admin")
-        db.add(admin_role)
-        db.commit()
-        db.refresh(admin_role)
-
-    # ✅ Generate EID for Admin
-    eid = generate_eid(
-        db=db,
-        company_id=new_company.company_id,
-        full_name=data.full_name,
-        date_of_joining=datetime.now()
-    )
+    # bcrypt before the transaction: no row locks held while it runs
+    password_hash = hash_password(data.password)
+
+    # Company, role and admin are created in one transaction: a failure
+    # part-way (e.g. duplicate e-mail) leaves no orphan company behind
+    with unit_of_work(db):
+        db.add(new_company)
+
+        # ✅ Create role "admin" if not exists
+        admin_role = db.query(Role).filter(Role.name == "admin").first()
+        if not admin_role:
+            admin_role = Role(name="admin")
+            db.add(admin_role)
+        db.flush()  # company_id / rid for the user row
+
+        # ✅ Generate EID for Admin
+        eid = generate_eid(
+            db=db,
+            company_id=new_company.company_id,
+            full_name=data.full_name,
+            date_of_joining=datetime.now()
+        )
 
-    # ✅ Create new Admin user
-    new_user = User(
-        eid=eid,
-        name=data.full_name,
-        personal_email=data.email,
-        company_email=None,
-        password_hash=hash_password(data.password),
-        company_id=new_company.company_id,
-        role_id=admin_role.rid,
-        department="Admin",
-        position="Administrator",
-        date_of_joining=datetime.now(),
-        status="Active"
-    )
+        # ✅ Create new Admin user
+        new_user = User(
+            eid=eid,
+            name=data.full_name,
+            personal_email=data.email,
+            company_email=None,
+            password_hash=password_hash,
+            company_id=new_company.company_id,
+            role_id=admin_role.rid,
+            department="Admin",
+            position="Administrator",
+            date_of_joining=datetime.now(),
+            status="Active"
+        )
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+        db.add(new_user)
+        db.flush()
+        add_to_hierarchy(db, eid, new_company.company_id, None)
 
     return {
         "message": "Company and Admin created successfully",
@@ -211,22 +223,55 @@ def update_user_controller(db: Session, eid: str, data: dict):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    for key, value in data.items():
-        if hasattr(user, key):
-            setattr(user, key, value)
-
-    db.commit()
-    db.refresh(user)
+    # Reporting line change: validate and move the whole subtree in the same transaction
+    with unit_of_work(db):
+        new_manager = data.get("manager_id", user.manager_id) or None
+        if "manager_id" in data:
+            data["manager_id"] = new_manager
+        if new_manager != user.manager_id:
+            if new_manager:
+                validate_manager(db, eid, user.company_id, new_manager)
+            move_subtree(db, eid, user.company_id, new_manager)
+
+        for key, value in data.items():
+            if hasattr(user, key):
+                setattr(user, key, value)
     return user
 
+
+# 🌳 Everyone under a manager (all levels), nearest first
+def get_org_subtree(db: Session, eid: str, max_depth: int | None = None):
+    view_user_controller(db, eid)
+    query = (
+        select(User.eid, User.name, User.department, User.position, User.manager_id, UserHierarchy.depth)
+        .join(UserHierarchy, UserHierarchy.descendant == User.eid)
+        .where(UserHierarchy.ancestor == eid, UserHierarchy.depth > 0)
+        .order_by(UserHierarchy.depth, User.name)
+    )
+    if max_depth is not None:
+        query = query.where(UserHierarchy.depth <= max_depth)
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+# 🧭 Reporting chain above an employee, direct manager first
+def get_org_chain(db: Session, eid: str):
+    view_user_controller(db, eid)
+    query = (
+        select(User.eid, User.name, User.department, User.position, User.manager_id, UserHierarchy.depth)
+        .join(UserHierarchy, UserHierarchy.ancestor == User.eid)
+        .where(UserHierarchy.descendant == eid, UserHierarchy.depth > 0)
+        .order_by(UserHierarchy.depth)
+    )
+    return [dict(row._mapping) for row in db.execute(query)]
+
 # ❌ Delete user
 def delete_user_controller(db: Session, eid: str):
     user = db.query(User).filter(User.eid == eid).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(user)
-    db.commit()
+    with unit_of_work(db):
+        db.delete(user)
     return {"message": f"User {eid} deleted successfully"}
 
 def create_employee(db: Session, data: UserCreate):
@@ -239,6 +284,9 @@ def create_employee(db: Session, data: UserCreate):
     if user_exists:
         raise HTTPException(status_code=400, detail="Personal email already exists")
 
+    if data.manager_id:
+        validate_manager(db, None, data.company_id, data.manager_id)
+
     # generate EID
     eid = generate_eid(
         db=db,
@@ -258,11 +306,13 @@ def create_employee(db: Session, data: UserCreate):
         department=data.department,
         position=data.position,
         date_of_joining=data.date_of_joining,
+        manager_id=data.manager_id
     )
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    with unit_of_work(db):
+        db.add(new_user)
+        db.flush()
+        add_to_hierarchy(db, eid, data.company_id, data.manager_id)
 
     return new_user
 
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config.database import Base, engine, ensure_schema
@@ -8,8 +9,32 @@ from routes.attendance_route import router as attendance_router
 from routes.leave_route import router as leave_router
 from routes.payroll_route import router as payroll_router
 from routes.setting_route import router as settings_router
+from routes.event_route import router as events_router
+from routes.audit_route import router as audit_router
+from routes.shift_policy_route import router as shift_policy_router
+from routes.calendar_route import router as calendar_router
+from routes.inbox_route import router as inbox_router
+from routes.analytics_route import router as analytics_router
+from utils.checkin_buffer import checkin_buffer, CHECKIN_BUFFER_ENABLED
+from utils.events import event_bus
+from utils.audit import audit_writer
+from utils.compression import add_compression
+import models.sync_model  # noqa: F401  (registers sync_tombstones + delete listeners)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	if CHECKIN_BUFFER_ENABLED:
+		checkin_buffer.replay_wal()  # punches acknowledged before the last shutdown
+		checkin_buffer.start()
+	yield
+	# Drain buffered writes before the worker exits
+	checkin_buffer.stop()
+	audit_writer.stop()
+	event_bus.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Explicit CORS origins to support Vite dev server with credentials and custom headers
 ALLOWED_ORIGINS = [
@@ -32,6 +57,8 @@ app.add_middleware(
 	expose_headers=["Authorization"],
 )
 
+add_compression(app)  # gzip (or brotli) above COMPRESSION_MIN_BYTES; skips the SSE feed
+
 
 Base.metadata.create_all(bind=engine)
 ensure_schema()  # run lightweight column checks/migrations
@@ -43,6 +70,12 @@ app.include_router(attendance_router)  # Include attendance router\
 app.include_router(leave_router)  # Include attendance router
 app.include_router(payroll_router)  # Include payroll router
 app.include_router(settings_router)  # Settings (admin)
+app.include_router(events_router)  # Live SSE feed
+app.include_router(audit_router)  # Audit trail
+app.include_router(shift_policy_router)  # Shift policy / overtime
+app.include_router(calendar_router)  # Working days / holidays
+app.include_router(inbox_router)  # Approval inbox
+app.include_router(analytics_router)  # Headcount / attrition trends
 
 # Simple health probe to verify backend availability
 @app.get("/health")
@@ -1,12 +1,21 @@
 # models/attendance_model.py
 
-from sqlalchemy import Column, Integer, String, Date, Time, Boolean, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, String, Date, Time, Boolean, ForeignKey, DateTime, Float, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from config.database import Base
 
 class Attendance(Base):
     __tablename__ = "attendances"
+    __table_args__ = (
+        # One row per employee per day; check-in relies on this to stay race-free
+        UniqueConstraint("eid", "date", name="uq_attendance_eid_date"),
+        Index("ix_attendances_company_updated", "company_id", "updated_at"),
+        # Approval inbox: unapproved rows per company
+        Index("ix_attendances_company_approved", "company_id", "approved"),
+        # Company views by day (list, month summary, availability)
+        Index("ix_attendances_company_date", "company_id", "date"),
+    )
 
     attendance_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     eid = Column(String(30), ForeignKey("user.eid"), nullable=False)
@@ -21,7 +30,8 @@ class Attendance(Base):
     approved_by = Column(String(30), ForeignKey("user.eid"), nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set on insert too, so delta sync can filter on updated_at alone
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
    
     # ✅ Relationships
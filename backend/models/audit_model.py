@@ -0,0 +1,28 @@
+# models/audit_model.py
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from sqlalchemy.sql import func
+from config.database import Base
+
+class AuditLog(Base):
+    """Append-only before/after record of an edit to an audited row."""
+    __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_entity", "entity", "entity_id", "audit_id"),
+        Index("ix_audit_logs_company", "company_id", "audit_id"),
+        # Nightly headcount snapshot: a company's user changes of one day
+        Index("ix_audit_logs_company_entity_created", "company_id", "entity", "created_at"),
+    )
+
+    audit_id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(30), nullable=False)       # attendance, leave, payroll, user
+    entity_id = Column(String(30), nullable=False)    # primary key of the row (eid for users)
+    company_id = Column(Integer, nullable=True)
+    action = Column(String(20), nullable=False)       # update, delete
+    actor = Column(String(30), nullable=True)         # eid of whoever made the change, if known
+    changes = Column(Text, nullable=False)            # JSON: {field: {"before": x, "after": y}}
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<AuditLog(entity={self.entity}, id={self.entity_id}, action={self.action})>"
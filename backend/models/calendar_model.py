@@ -0,0 +1,20 @@
+# models/calendar_model.py
+
+from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey
+from config.database import Base
+
+class CompanyCalendar(Base):
+    """One row per company per day: working day or not (weekend/holiday).
+
+    Built a year at a time from the shift policy's working days; holidays are
+    rows with is_working = False and a holiday_name.
+    """
+    __tablename__ = "company_calendar"
+
+    company_id = Column(Integer, ForeignKey("companies.company_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    is_working = Column(Boolean, nullable=False, default=True)
+    holiday_name = Column(String(100), nullable=True)
+
+    def __repr__(self):
+        return f"<CompanyCalendar(company_id={self.company_id}, day={self.day}, working={self.is_working})>"
@@ -0,0 +1,23 @@
+# models/headcount_model.py
+
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from config.database import Base
+
+class HeadcountSnapshot(Base):
+    """Daily per-department headcount, written by the nightly snapshot job.
+
+    `active` is the headcount at the end of the day; `joined` / `left_count`
+    are the hires and departures (deactivations or deletions) during it.
+    Employees without a department are stored under department "".
+    """
+    __tablename__ = "headcount_snapshots"
+
+    company_id = Column(Integer, ForeignKey("companies.company_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    department = Column(String(100), primary_key=True, default="")
+    active = Column(Integer, nullable=False, default=0)
+    joined = Column(Integer, nullable=False, default=0)
+    left_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<HeadcountSnapshot(company_id={self.company_id}, day={self.day}, department={self.department!r}, active={self.active})>"
@@ -0,0 +1,23 @@
+# models/hierarchy_model.py
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from config.database import Base
+
+class UserHierarchy(Base):
+    """Closure table over user.manager_id: one row per (ancestor, descendant) pair.
+
+    Every user has a depth-0 row to itself; depth 1 is a direct report,
+    depth 2 a report's report, and so on.
+    """
+    __tablename__ = "user_hierarchy"
+    __table_args__ = (
+        Index("ix_user_hierarchy_descendant", "descendant", "depth"),
+    )
+
+    ancestor = Column(String(30), ForeignKey("user.eid", ondelete="CASCADE"), primary_key=True)
+    descendant = Column(String(30), ForeignKey("user.eid", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.company_id"), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<UserHierarchy({self.ancestor} -> {self.descendant}, depth={self.depth})>"
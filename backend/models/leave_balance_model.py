@@ -0,0 +1,71 @@
+# models/leave_balance_model.py
+
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from config.database import Base
+
+class LeavePolicy(Base):
+    """Annual entitlement for one leave type in a company."""
+    __tablename__ = "leave_policies"
+    __table_args__ = (
+        UniqueConstraint("company_id", "leave_type", name="uq_leave_policy_type"),
+    )
+
+    policy_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    company_id = Column(Integer, ForeignKey("companies.company_id"), nullable=False)
+    leave_type = Column(String(50), nullable=False)
+    annual_days = Column(Float, nullable=False, default=0)
+    accrual = Column(String(20), nullable=False, default="monthly")  # monthly (annual/12 each month) or annual
+
+    def __repr__(self):
+        return f"<LeavePolicy(company={self.company_id}, type={self.leave_type}, days={self.annual_days})>"
+
+
+class LeaveBalance(Base):
+    """Running balance per (eid, leave_type, year), kept in step with leave_ledger."""
+    __tablename__ = "leave_balances"
+    __table_args__ = (
+        UniqueConstraint("eid", "leave_type", "year", name="uq_leave_balance"),
+        Index("ix_leave_balances_company_year", "company_id", "year"),
+    )
+
+    balance_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    eid = Column(String(30), ForeignKey("user.eid"), nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.company_id"), nullable=False)
+    leave_type = Column(String(50), nullable=False)
+    year = Column(Integer, nullable=False)
+
+    entitlement = Column(Float, nullable=False, default=0)  # annual days from the policy
+    accrued = Column(Float, nullable=False, default=0)
+    used = Column(Float, nullable=False, default=0)
+    balance = Column(Float, nullable=False, default=0)      # accrued - used
+
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<LeaveBalance(eid={self.eid}, type={self.leave_type}, year={self.year}, balance={self.balance})>"
+
+
+class LeaveLedger(Base):
+    """Append-only accruals (+), debits (-), credits (+) and adjustments (±)."""
+    __tablename__ = "leave_ledger"
+    __table_args__ = (
+        Index("ix_leave_ledger_balance", "eid", "leave_type", "year", "kind"),
+        Index("ix_leave_ledger_company_year", "company_id", "year"),
+    )
+
+    entry_id = Column(Integer, primary_key=True, autoincrement=True)
+    eid = Column(String(30), ForeignKey("user.eid"), nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.company_id"), nullable=False)
+    leave_type = Column(String(50), nullable=False)
+    year = Column(Integer, nullable=False)
+
+    kind = Column(String(20), nullable=False)      # accrual, debit, credit, adjust
+    days = Column(Float, nullable=False)           # signed
+    period = Column(String(7), nullable=True)      # accrual period: "2025-01" (monthly) or "2025" (annual)
+    leave_id = Column(Integer, ForeignKey("leave_requests.leave_id"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=func.now())
+
+    def __repr__(self):
+        return f"<LeaveLedger(eid={self.eid}, kind={self.kind}, days={self.days})>"
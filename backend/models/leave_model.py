@@ -1,12 +1,21 @@
 # models/leave_model.py
 
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from config.database import Base
 
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
+    __table_args__ = (
+        Index("ix_leave_requests_company_updated", "company_id", "updated_at"),
+        # Overlap check: eid = ? AND start_date <= ? AND end_date >= ?
+        Index("ix_leave_requests_eid_range", "eid", "start_date", "end_date"),
+        # Approval inbox: pending requests per company
+        Index("ix_leave_requests_company_status", "company_id", "status"),
+        # Company views by date range (list, availability)
+        Index("ix_leave_requests_company_start", "company_id", "start_date"),
+    )
 
     leave_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     eid = Column(String(30), ForeignKey("user.eid"), nullable=False)
@@ -15,18 +24,23 @@ class LeaveRequest(Base):
     leave_type = Column(String(50), nullable=False)  # Sick Leave, Casual Leave, Earned Leave
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
-    total_days = Column(Integer, nullable=True)
+    total_days = Column(Integer, nullable=True)  # working days, computed from the company calendar
     reason = Column(String(255), nullable=True)
     status = Column(String(20), default="Pending")  # Pending, Approved, Rejected
     approved_by = Column(String(30), ForeignKey("user.eid"), nullable=True)
+    # Optimistic concurrency: every UPDATE is `WHERE <id> = ? AND version = ?` and bumps it
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set on insert too, so delta sync can filter on updated_at alone
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
     user = relationship("User", foreign_keys=[eid], back_populates="leaves")
 
     # The admin/HR who approved or rejected
     approved_user = relationship("User", foreign_keys=[approved_by])
 
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<LeaveRequest(eid={self.eid}, type={self.leave_type}, status={self.status})>"
@@ -1,12 +1,19 @@
 # models/payroll_model.py
 
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from config.database import Base
 
 class Payroll(Base):
     __tablename__ = "payrolls"
+    __table_args__ = (
+        Index("ix_payrolls_company_updated", "company_id", "updated_at"),
+        # Approval inbox: pending payrolls per company
+        Index("ix_payrolls_company_status", "company_id", "status"),
+        # Payruns / employer cost grouped by period
+        Index("ix_payrolls_company_period", "company_id", "year", "month"),
+    )
 
     payroll_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     eid = Column(String(30), ForeignKey("user.eid"), nullable=False)
@@ -19,13 +26,17 @@ class Payroll(Base):
     net_pay = Column(Float, nullable=False)
     status = Column(String(20), default="Pending")  # Pending, Approved, Paid
     approved_by = Column(String(30), ForeignKey("user.eid"), nullable=True)
+    # Optimistic concurrency: every UPDATE is `WHERE <id> = ? AND version = ?` and bumps it
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set on insert too, so delta sync can filter on updated_at alone
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
     user = relationship("User", foreign_keys=[eid], back_populates="payrolls")          # employee who gets salary
     approved_user = relationship("User", foreign_keys=[approved_by])                    # admin/payroll officer who approved it
 
+    __mapper_args__ = {"version_id_col": version}
 
     def __repr__(self):
         return f"<Payroll(eid={self.eid}, month={self.month}, status={self.status})>"
@@ -0,0 +1,26 @@
+# models/shift_policy_model.py
+
+from datetime import time
+from sqlalchemy import Column, Integer, String, Time, Float, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from config.database import Base
+
+class ShiftPolicy(Base):
+    __tablename__ = "shift_policies"
+
+    policy_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    company_id = Column(Integer, ForeignKey("companies.company_id"), unique=True, nullable=False)
+
+    shift_start = Column(Time, nullable=False, default=time(9, 0))
+    shift_end = Column(Time, nullable=False, default=time(18, 0))
+    grace_minutes = Column(Integer, nullable=False, default=10)        # late only after start + grace
+    break_minutes = Column(Integer, nullable=False, default=60)        # deducted from worked hours
+    overtime_after_hours = Column(Float, nullable=False, default=8.0)  # net hours per working day
+    short_day_hours = Column(Float, nullable=False, default=6.0)       # net hours below this = short day
+    working_days = Column(String(20), nullable=False, default="0,1,2,3,4")  # weekday numbers, Monday = 0
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ShiftPolicy(company_id={self.company_id}, {self.shift_start}-{self.shift_end})>"
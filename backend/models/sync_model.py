@@ -0,0 +1,49 @@
+# models/sync_model.py
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, event, insert
+from sqlalchemy.sql import func
+from config.database import Base
+from models.attendance_model import Attendance
+from models.leave_model import LeaveRequest
+from models.payroll_model import Payroll
+
+class SyncTombstone(Base):
+    """A deleted attendance/leave/payroll row, so delta sync can tell clients to drop it."""
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_company_deleted", "company_id", "entity", "deleted_at"),
+    )
+
+    tombstone_id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(30), nullable=False)  # attendance, leave, payroll
+    entity_id = Column(Integer, nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.company_id"), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<SyncTombstone(entity={self.entity}, id={self.entity_id})>"
+
+
+SYNC_ENTITIES = {
+    "attendance": (Attendance, "attendance_id"),
+    "leave": (LeaveRequest, "leave_id"),
+    "payroll": (Payroll, "payroll_id"),
+}
+
+
+def _tombstone_listener(entity: str, pk_attr: str):
+    def after_delete(mapper, connection, target):
+        # Same connection/transaction as the DELETE, so both commit or neither does.
+        # Note: bulk query.delete() bypasses mapper events and must write tombstones itself.
+        connection.execute(
+            insert(SyncTombstone).values(
+                entity=entity,
+                entity_id=getattr(target, pk_attr),
+                company_id=target.company_id,
+            )
+        )
+    return after_delete
+
+
+for _entity, (_model, _pk) in SYNC_ENTITIES.items():
+    event.listen(_model, "after_delete", _tombstone_listener(_entity, _pk))
@@ -1,10 +1,17 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Boolean, Index, Computed
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from config.database import Base
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (
+        # Headcount by join month (GROUP BY join_period stays inside the index) and EID serials by year
+        Index("ix_user_company_join_period", "company_id", "join_period"),
+        Index("ix_user_join_year", "join_year"),
+        Index("ix_user_company_manager", "company_id", "manager_id"),
+        Index("ix_user_company_bank", "company_id", "bank_account"),
+    )
 
     eid = Column(String(30), primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.company_id"), nullable=False)
@@ -18,6 +25,9 @@ class User(Base):
     department = Column(String(100), nullable=True)
     position = Column(String(100), nullable=True)
     date_of_joining = Column(DateTime, nullable=True)
+    # Stored generated buckets of date_of_joining, so filters/grouping can use an index
+    join_year = Column(Integer, Computed("YEAR(date_of_joining)", persisted=True))
+    join_period = Column(Integer, Computed("YEAR(date_of_joining) * 100 + MONTH(date_of_joining)", persisted=True))  # YYYYMM
     status = Column(String(20), default="Active")
 
     is_first_login = Column(Boolean, default=True)
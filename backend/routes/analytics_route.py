@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from config.database import get_db
+from schemas.analytics_schema import HeadcountTrendOut, AttritionOut
+from controllers.analytics_controller import get_headcount_trend, get_attrition, take_headcount_snapshot
+from utils.permissions import role_required
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+# 📈 Headcount trend (interval=day|month, optional department; "" = no department)
+@router.get("/headcount/{company_id}", response_model=HeadcountTrendOut)
+def headcount_trend(
+    company_id: int,
+    start: date,
+    end: date,
+    interval: str = "month",
+    department: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin", "hr_officer"])),
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot read another company's analytics")
+    return get_headcount_trend(db, company_id, start, end, department, interval)
+
+# 📉 Attrition per department
+@router.get("/attrition/{company_id}", response_model=AttritionOut)
+def attrition(
+    company_id: int,
+    start: date,
+    end: date,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin", "hr_officer"])),
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot read another company's analytics")
+    return get_attrition(db, company_id, start, end)
+
+# 📸 Take (or retake) one day's snapshot (Admin; default yesterday, like the nightly job)
+@router.post("/headcount/{company_id}/snapshot")
+def snapshot(
+    company_id: int,
+    day: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin"])),
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot snapshot another company's headcount")
+    # Today is still in progress; a snapshot of it would miss the rest of the day's changes
+    return take_headcount_snapshot(db, company_id, day or date.today() - timedelta(days=1))
@@ -1,27 +1,90 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from config.database import get_db
-from schemas.attendance_schema import AttendanceCreate, AttendanceOut, AttendanceUpdate
+from datetime import datetime, date
+from schemas.attendance_schema import AttendanceCreate, AttendanceOut, AttendanceUpdate, AttendanceSync, AvailabilityOut
 from controllers.attendance_controller import (
     create_attendance,
     get_all_attendance,
     get_attendance_by_eid,
     update_attendance,
     check_in,
-    check_out
+    check_out,
+    get_checkin_buffer_metrics,
+    get_attendance_changes
 )
+from controllers.reconciliation_controller import reconcile_company_day
+from utils.permissions import role_required
+from utils.auth import get_optional_user
+from utils.availability import get_availability
+from schemas.bulk_schema import BulkAttendanceApproval, BulkResult
+from controllers.bulk_controller import bulk_approve_attendance
+from utils.fast_json import FastJSONResponse, NDJSONResponse, parse_fields, wants_ndjson
 
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 
+# 📊 Check-in buffer metrics (Admin)
+@router.get("/checkin-buffer/metrics", dependencies=[Depends(role_required(["admin"]))])
+def checkin_buffer_metrics():
+    return get_checkin_buffer_metrics()
+
+# 🌙 Run the absentee / missing check-out reconciliation for one day (Admin)
+@router.post("/reconcile/{company_id}")
+def reconcile_attendance(
+    company_id: int,
+    day: date,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin"]))
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot reconcile another company's attendance")
+    return reconcile_company_day(db, company_id, day)
+
+# 🗓️ Team availability: who is present / absent / on leave per day (max one quarter)
+@router.get("/availability/{company_id}", response_model=AvailabilityOut)
+def team_availability(
+    company_id: int,
+    start: date,
+    end: date,
+    department: str | None = None,
+    manager_id: str | None = None,
+    db: Session = Depends(get_db)
+):
+    return get_availability(db, company_id, start, end, department, manager_id)
+
+# ✅ Bulk approve (ids, or all unapproved rows in a date range)
+@router.post("/bulk-approve", response_model=BulkResult)
+def bulk_approve(
+    data: BulkAttendanceApproval,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin", "hr_officer"]))
+):
+    return bulk_approve_attendance(db, data, current_user)
+
 # ✅ Add / mark attendance
 @router.post("/", response_model=AttendanceOut)
 def add_attendance(data: AttendanceCreate, db: Session = Depends(get_db)):
     return create_attendance(db, data)
 
 # 👀 Get all attendance (Admin)
-@router.get("/{company_id}", response_model=list[AttendanceOut])
-def get_attendance_list(company_id: int, db: Session = Depends(get_db)):
-    return get_all_attendance(db, company_id)
+@router.get("/{company_id}", response_model=list[AttendanceOut], response_class=FastJSONResponse)
+def get_attendance_list(
+    request: Request,
+    company_id: int,
+    manager_id: str | None = None,
+    fields: str | None = None,
+    db: Session = Depends(get_db),
+):
+    # ?fields=a,b,c returns (and selects) only those columns
+    fields = parse_fields(fields, AttendanceOut)
+    if wants_ndjson(request):  # Accept: application/x-ndjson streams one row per line
+        return NDJSONResponse(get_all_attendance(db, company_id, manager_id, fields, stream=True))
+    return FastJSONResponse(get_all_attendance(db, company_id, manager_id, fields))
+
+# 🔄 Delta sync (only rows changed since updated_since, plus deleted ids)
+@router.get("/sync/{company_id}", response_model=AttendanceSync)
+def sync_attendance(company_id: int, updated_since: datetime | None = None, db: Session = Depends(get_db)):
+    return get_attendance_changes(db, company_id, updated_since)
 
 # 👁️ Get attendance by employee EID
 @router.get("/eid/{eid}", response_model=list[AttendanceOut])
@@ -30,8 +93,14 @@ def get_employee_attendance(eid: str, db: Session = Depends(get_db)):
 
 # ✏️ Update / approve attendance
 @router.put("/{attendance_id}", response_model=AttendanceOut)
-def edit_attendance(attendance_id: int, data: AttendanceUpdate, db: Session = Depends(get_db)):
-    return update_attendance(db, attendance_id, data)
+def edit_attendance(
+    attendance_id: int,
+    data: AttendanceUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_optional_user)
+):
+    # Audit actor: the authenticated caller only, never the client-supplied approved_by
+    return update_attendance(db, attendance_id, data, current_user.eid if current_user else None)
 
 @router.post("/checkin/{eid}/{company_id}")
 def attendance_checkin(eid: str, company_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from config.database import get_db
+from schemas.audit_schema import AuditPage
+from controllers.audit_controller import get_entity_history, get_company_audit
+from utils.permissions import role_required
+
+AUDIT_ALLOWED_ROLES = ["admin", "hr_officer"]
+
+router = APIRouter(prefix="/audit", tags=["Audit"])
+
+# 📜 Company-wide audit trail (newest first)
+@router.get("/company/{company_id}", response_model=AuditPage)
+def company_audit(
+    company_id: int,
+    entity: str | None = None,
+    limit: int = 50,
+    before_id: int | None = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(AUDIT_ALLOWED_ROLES))
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot view another company's audit log")
+    return get_company_audit(db, company_id, entity, limit, before_id)
+
+
+# 📜 History of a single attendance / leave / payroll / user record
+@router.get("/{entity}/{entity_id}", response_model=AuditPage)
+def entity_history(
+    entity: str,
+    entity_id: str,
+    limit: int = 50,
+    before_id: int | None = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(AUDIT_ALLOWED_ROLES))
+):
+    return get_entity_history(db, current_user.company_id, entity, entity_id, limit, before_id)
@@ -0,0 +1,59 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from config.database import get_db
+from schemas.calendar_schema import HolidayIn, CalendarDayOut
+from controllers.calendar_controller import get_calendar, set_holidays, remove_holiday, regenerate_calendar
+from utils.permissions import role_required
+from utils.auth import get_current_user
+
+router = APIRouter(prefix="/calendar", tags=["Company Calendar"])
+
+# 📅 Calendar of a year (?holidays_only=true for just the holidays)
+@router.get("/{company_id}/{year}", response_model=list[CalendarDayOut])
+def read_calendar(
+    company_id: int,
+    year: int,
+    holidays_only: bool = False,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot read another company's calendar")
+    return get_calendar(db, company_id, year, holidays_only)
+
+# 🎉 Add / rename holidays (Admin)
+@router.put("/{company_id}/holidays", response_model=list[CalendarDayOut])
+def save_holidays(
+    company_id: int,
+    data: list[HolidayIn],
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin"]))
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot change another company's calendar")
+    return set_holidays(db, company_id, data)
+
+# 🗑️ Remove a holiday (Admin)
+@router.delete("/{company_id}/holidays/{day}")
+def delete_holiday(
+    company_id: int,
+    day: date,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin"]))
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot change another company's calendar")
+    return remove_holiday(db, company_id, day)
+
+# 🔄 Rebuild a year from the shift policy (Admin)
+@router.post("/{company_id}/{year}/build")
+def build_year(
+    company_id: int,
+    year: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin"]))
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot change another company's calendar")
+    return regenerate_calendar(db, company_id, year)
@@ -0,0 +1,38 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from utils.events import event_bus
+from utils.auth import get_stream_user
+
+HEARTBEAT_SECONDS = 15  # keeps proxies from closing idle streams
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+# 📡 Live attendance/leave changes for a company (Server-Sent Events)
+# EventSource can't send headers: pass the token as ?token=... (or the access_token cookie)
+@router.get("/{company_id}")
+async def company_events(company_id: int, request: Request, current_user = Depends(get_stream_user)):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot follow another company's events")
+    queue = event_bus.subscribe(company_id)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+        finally:
+            event_bus.unsubscribe(company_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
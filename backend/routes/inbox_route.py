@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from config.database import get_db
+from schemas.inbox_schema import InboxCountsOut, InboxOut
+from controllers.inbox_controller import get_inbox_counts, get_inbox
+from utils.auth import get_current_user
+
+router = APIRouter(prefix="/inbox", tags=["Approval Inbox"])
+
+# 🔔 Badge: pending counts for the current user
+@router.get("/counts", response_model=InboxCountsOut)
+def inbox_counts(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    return get_inbox_counts(db, current_user)
+
+# 📥 Pending leaves / attendance / payrolls waiting for the current user
+@router.get("/", response_model=InboxOut)
+def inbox(limit: int = 50, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    return get_inbox(db, current_user, limit)
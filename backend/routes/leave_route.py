@@ -1,14 +1,30 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from config.database import get_db
-from schemas.leave_schema import LeaveCreate, LeaveOut, LeaveUpdate
+from datetime import datetime
+from schemas.leave_schema import LeaveCreate, LeaveOut, LeaveUpdate, LeaveSync
+from schemas.leave_balance_schema import LeavePolicyIn, LeavePolicyOut, LeaveBalanceOut
 from controllers.leave_controller import (
     create_leave,
+    import_leaves,
     get_all_leaves,
     get_leave_by_eid,
     update_leave,
-    approve_or_reject_leave
+    approve_or_reject_leave,
+    get_leave_changes
 )
+from controllers.leave_balance_controller import (
+    get_leave_balances,
+    get_leave_policies,
+    upsert_leave_policies,
+    accrue_leave,
+    rebuild_leave_balances
+)
+from utils.permissions import role_required
+from utils.auth import get_optional_user
+from schemas.bulk_schema import BulkLeaveDecision, BulkResult
+from controllers.bulk_controller import bulk_decide_leaves
+from utils.fast_json import FastJSONResponse, NDJSONResponse, parse_fields, wants_ndjson
 
 router = APIRouter(prefix="/leaves", tags=["Leave Requests"])
 
@@ -17,10 +33,89 @@ router = APIRouter(prefix="/leaves", tags=["Leave Requests"])
 def apply_leave(data: LeaveCreate, db: Session = Depends(get_db)):
     return create_leave(db, data)
 
+# 📥 Bulk import leave requests (Admin; rows of other companies are rejected)
+@router.post("/bulk")
+def bulk_import_leaves(
+    data: list[LeaveCreate],
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin"]))
+):
+    return import_leaves(db, data, company_id=current_user.company_id)
+
+# ✅ Bulk approve / reject (ids, or all Pending leaves starting in a period)
+@router.post("/bulk-decision", response_model=BulkResult)
+def bulk_decision(
+    data: BulkLeaveDecision,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin", "hr_officer"]))
+):
+    return bulk_decide_leaves(db, data, current_user)
+
 # 👀 Get all leaves (Admin)
-@router.get("/{company_id}", response_model=list[LeaveOut])
-def get_leaves(company_id: int, db: Session = Depends(get_db)):
-    return get_all_leaves(db, company_id)
+@router.get("/{company_id}", response_model=list[LeaveOut], response_class=FastJSONResponse)
+def get_leaves(
+    request: Request,
+    company_id: int,
+    manager_id: str | None = None,
+    fields: str | None = None,
+    db: Session = Depends(get_db),
+):
+    # ?fields=a,b,c returns (and selects) only those columns
+    fields = parse_fields(fields, LeaveOut)
+    if wants_ndjson(request):  # Accept: application/x-ndjson streams one row per line
+        return NDJSONResponse(get_all_leaves(db, company_id, manager_id, fields, stream=True))
+    return FastJSONResponse(get_all_leaves(db, company_id, manager_id, fields))
+
+# 🔄 Delta sync (only rows changed since updated_since, plus deleted ids)
+@router.get("/sync/{company_id}", response_model=LeaveSync)
+def sync_leaves(company_id: int, updated_since: datetime | None = None, db: Session = Depends(get_db)):
+    return get_leave_changes(db, company_id, updated_since)
+
+# 💼 Leave balances of an employee (default: current year)
+@router.get("/balance/{eid}", response_model=list[LeaveBalanceOut])
+def get_employee_balances(eid: str, year: int | None = None, db: Session = Depends(get_db)):
+    return get_leave_balances(db, eid, year)
+
+# 🔧 Rebuild a year's balances from approved leaves (Admin)
+@router.post("/balance/rebuild/{company_id}")
+def rebuild_balances(
+    company_id: int,
+    year: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin"]))
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot rebuild another company's balances")
+    return rebuild_leave_balances(db, company_id, year)
+
+# 📜 Leave policies (entitlement per leave type)
+@router.get("/policy/{company_id}", response_model=list[LeavePolicyOut])
+def get_policies(company_id: int, db: Session = Depends(get_db)):
+    return get_leave_policies(db, company_id)
+
+@router.put("/policy/{company_id}", response_model=list[LeavePolicyOut])
+def save_policies(
+    company_id: int,
+    data: list[LeavePolicyIn],
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin"]))
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot change another company's policy")
+    return upsert_leave_policies(db, company_id, data)
+
+# 📅 Run the monthly accrual for one company (Admin)
+@router.post("/accrue/{company_id}")
+def accrue_balances(
+    company_id: int,
+    year: int,
+    month: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin"]))
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot accrue another company's balances")
+    return accrue_leave(db, company_id, year, month)
 
 # 👁️ Get employee leaves
 @router.get("/eid/{eid}", response_model=list[LeaveOut])
@@ -29,9 +124,21 @@ def get_employee_leaves(eid: str, db: Session = Depends(get_db)):
 
 # ✏️ Approve/Reject leave
 @router.put("/{leave_id}", response_model=LeaveOut)
-def approve_leave(leave_id: int, data: LeaveUpdate, db: Session = Depends(get_db)):
-    return update_leave(db, leave_id, data)
+def approve_leave(
+    leave_id: int,
+    data: LeaveUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_optional_user)
+):
+    # Audit actor: the authenticated caller only, never the client-supplied approved_by
+    return update_leave(db, leave_id, data, current_user.eid if current_user else None)
 
 @router.put("/approve/{leave_id}")
-def approve_leave(leave_id: int, data: LeaveUpdate, db: Session = Depends(get_db)):
-    return approve_or_reject_leave(db, leave_id, data)
\ No newline at end of file
+def approve_leave(
+    leave_id: int,
+    data: LeaveUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_optional_user)
+):
+    # Audit actor: the authenticated caller only, never the client-supplied approved_by
+    return approve_or_reject_leave(db, leave_id, data, current_user.eid if current_user else None)
\ No newline at end of file
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from config.database import get_db
-from schemas.payroll_schema import PayrollCreate, PayrollOut, PayrollUpdate
+from datetime import datetime
+from schemas.payroll_schema import PayrollCreate, PayrollOut, PayrollUpdate, PayrollSync
 from controllers.payroll_controller import (
     create_payroll,
     get_all_payrolls,
@@ -11,9 +12,14 @@ from controllers.payroll_controller import (
     get_payroll_warnings,
     get_recent_payruns,
     get_employer_cost,
-    get_employee_count
+    get_employee_count,
+    get_payroll_changes
 )
 from utils.permissions import payroll_access
+from utils.auth import get_optional_user
+from schemas.bulk_schema import BulkPayrollDecision, BulkResult
+from controllers.bulk_controller import bulk_decide_payrolls
+from utils.fast_json import FastJSONResponse, NDJSONResponse, parse_fields, wants_ndjson
 
 router = APIRouter(prefix="/payroll", tags=["Payroll"])
 
@@ -22,10 +28,34 @@ router = APIRouter(prefix="/payroll", tags=["Payroll"])
 def add_payroll(data: PayrollCreate, db: Session = Depends(get_db)):
     return create_payroll(db, data)
 
+# ✅ Bulk approve / mark paid (ids, or all Pending payrolls of a month/year)
+@router.post("/bulk-decision", response_model=BulkResult)
+def bulk_decision(
+    data: BulkPayrollDecision,
+    db: Session = Depends(get_db),
+    current_user = Depends(payroll_access)
+):
+    return bulk_decide_payrolls(db, data, current_user)
+
 # 👀 View all payrolls (Admin)
-@router.get("/{company_id}", response_model=list[PayrollOut])
-def view_company_payrolls(company_id: int, db: Session = Depends(get_db)):
-    return get_all_payrolls(db, company_id)
+@router.get("/{company_id}", response_model=list[PayrollOut], response_class=FastJSONResponse)
+def view_company_payrolls(
+    request: Request,
+    company_id: int,
+    manager_id: str | None = None,
+    fields: str | None = None,
+    db: Session = Depends(get_db),
+):
+    # ?fields=a,b,c returns (and selects) only those columns
+    fields = parse_fields(fields, PayrollOut)
+    if wants_ndjson(request):  # Accept: application/x-ndjson streams one row per line
+        return NDJSONResponse(get_all_payrolls(db, company_id, manager_id, fields, stream=True))
+    return FastJSONResponse(get_all_payrolls(db, company_id, manager_id, fields))
+
+# 🔄 Delta sync (only rows changed since updated_since, plus deleted ids)
+@router.get("/sync/{company_id}", response_model=PayrollSync)
+def sync_payrolls(company_id: int, updated_since: datetime | None = None, db: Session = Depends(get_db)):
+    return get_payroll_changes(db, company_id, updated_since)
 
 # 👁️ Get employee payrolls
 @router.get("/eid/{eid}", response_model=list[PayrollOut])
@@ -34,8 +64,14 @@ def get_employee_payrolls(eid: str, db: Session = Depends(get_db)):
 
 # ✏️ Update payroll
 @router.put("/{payroll_id}", response_model=PayrollOut)
-def update_payroll_details(payroll_id: int, data: PayrollUpdate, db: Session = Depends(get_db)):
-    return update_payroll(db, payroll_id, data)
+def update_payroll_details(
+    payroll_id: int,
+    data: PayrollUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_optional_user)
+):
+    # Audit actor: the authenticated caller only, never the client-supplied approved_by
+    return update_payroll(db, payroll_id, data, current_user.eid if current_user else None)
 
 # routes/payroll_routes.py
 
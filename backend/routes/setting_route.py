@@ -9,6 +9,7 @@ from controllers.setting_controller import (
 )
 from schemas.setting_schema import UpdateRoleRequest, UpdateEmailRequest
 from utils.permissions import role_required  # Use flexible role gating
+from utils.audit import set_audit_actor
 
 # Define which roles can access settings (admin only for now)
 SETTINGS_ALLOWED_ROLES = ["admin"]
@@ -27,12 +28,14 @@ def get_users(company_id: int, db: Session = Depends(get_db), current_user = Dep
 # 🔹 Update user role
 @router.put("/update-role/{eid}")
 def change_role(eid: str, data: UpdateRoleRequest, db: Session = Depends(get_db), current_user = Depends(role_required(SETTINGS_ALLOWED_ROLES))):
+    set_audit_actor(db, current_user.eid)
     return update_user_role(db, eid, data)
 
 
 # 🔹 Update user email
 @router.put("/update-email/{eid}")
 def change_email(eid: str, data: UpdateEmailRequest, db: Session = Depends(get_db), current_user = Depends(role_required(SETTINGS_ALLOWED_ROLES))):
+    set_audit_actor(db, current_user.eid)
     return update_user_email(db, eid, data)
 
 
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from config.database import get_db
+from schemas.shift_policy_schema import ShiftPolicyIn, ShiftPolicyOut, ShiftSummaryOut
+from controllers.shift_policy_controller import get_shift_policy, upsert_shift_policy, get_shift_summary
+from utils.permissions import role_required
+from utils.auth import get_current_user
+
+router = APIRouter(prefix="/shift-policy", tags=["Shift Policy"])
+
+# 🕘 Get shift policy
+@router.get("/{company_id}", response_model=ShiftPolicyOut)
+def read_shift_policy(company_id: int, db: Session = Depends(get_db)):
+    return get_shift_policy(db, company_id)
+
+# ✏️ Create / update shift policy (Admin)
+@router.put("/{company_id}", response_model=ShiftPolicyOut)
+def save_shift_policy(
+    company_id: int,
+    data: ShiftPolicyIn,
+    db: Session = Depends(get_db),
+    current_user = Depends(role_required(["admin"]))
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot change another company's policy")
+    return upsert_shift_policy(db, company_id, data)
+
+# 📊 Monthly overtime / lateness summary for all employees
+@router.get("/{company_id}/summary/{year}/{month}", response_model=ShiftSummaryOut)
+def shift_summary(
+    company_id: int,
+    year: int,
+    month: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot read another company's summary")
+    return get_shift_summary(db, company_id, year, month)
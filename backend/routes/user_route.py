@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 from config.database import get_db
-from schemas.user_schema import UserCreate, UserOut, UserLogin, AdminRegister
-from controllers.user_controller import create_user, get_all_users, login_user, admin_register, view_user_controller, update_user_controller, delete_user_controller, create_employee
+from schemas.user_schema import UserCreate, UserOut, UserLogin, AdminRegister, OrgMember, EmployeeSearchResult
+from controllers.user_controller import create_user, get_all_users, login_user, admin_register, view_user_controller, update_user_controller, delete_user_controller, create_employee, get_org_subtree, get_org_chain
 from utils.permissions import role_required
+from utils.rate_limit import get_limiter_metrics
+from utils.audit import set_audit_actor
+from utils.hierarchy import rebuild_hierarchy
+from utils.search_index import search_index
+from utils.auth import get_current_user
+from utils.fast_json import FastJSONResponse
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -14,14 +20,20 @@ def add_user(data: UserCreate, db: Session = Depends(get_db)):
     return create_user(db, data)
 
 # ✅ Get all users (with company & role names)
-@router.get("/", response_model=List[UserOut])
+@router.get("/", response_model=List[UserOut], response_class=FastJSONResponse)
 def fetch_users(db: Session = Depends(get_db)):
-    return get_all_users(db)
+    return FastJSONResponse(get_all_users(db))
 
 # ✅ Login
 @router.post("/login")
-def login(data: UserLogin, db: Session = Depends(get_db)):
-    return login_user(db, data.eid, data.password)
+def login(data: UserLogin, request: Request, db: Session = Depends(get_db)):
+    client_ip = request.client.host if request.client else None
+    return login_user(db, data.eid, data.password, client_ip)
+
+# 📊 Login throttling / hashing admission counters (Admin)
+@router.get("/login-metrics", dependencies=[Depends(role_required(["admin"]))])
+def login_metrics():
+    return get_limiter_metrics()
 
 @router.post("/register-admin")
 def register_admin(data: AdminRegister, db: Session = Depends(get_db)):
@@ -41,9 +53,36 @@ def update_user(
     db: Session = Depends(get_db),
     current_user = Depends(role_required(["admin", "hr_officer"]))
 ):
+    set_audit_actor(db, current_user.eid)
     return update_user_controller(db, eid, data)
 
 
+# 🔎 Typeahead search over name, EID, emails, department and position
+@router.get("/search/{company_id}", response_model=List[EmployeeSearchResult])
+def search_users(company_id: int, q: str, limit: int = 10, current_user = Depends(get_current_user)):
+    if current_user.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Cannot search another company's employees")
+    return search_index.search(company_id, q, limit)
+
+
+# 🌳 Whole org under a manager (optionally limited to max_depth levels)
+@router.get("/org/{eid}/subtree", response_model=List[OrgMember])
+def org_subtree(eid: str, max_depth: int | None = None, db: Session = Depends(get_db)):
+    return get_org_subtree(db, eid, max_depth)
+
+
+# 🧭 Reporting chain up to the top
+@router.get("/org/{eid}/chain", response_model=List[OrgMember])
+def org_chain(eid: str, db: Session = Depends(get_db)):
+    return get_org_chain(db, eid)
+
+
+# 🔧 Rebuild the hierarchy closure table from manager_id (Admin)
+@router.post("/org/rebuild/{company_id}", dependencies=[Depends(role_required(["admin"]))])
+def org_rebuild(company_id: int, db: Session = Depends(get_db)):
+    return rebuild_hierarchy(db, company_id)
+
+
 # ❌ Delete user
 @router.delete("/user/{eid}")
 def delete_user(eid: str, db: Session = Depends(get_db)):
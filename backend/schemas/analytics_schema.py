@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+# ✅ One point of a headcount trend (a day or a month)
+class HeadcountPoint(BaseModel):
+    period: str
+    active: int   # headcount at the end of the period
+    joined: int
+    left: int
+
+
+class HeadcountTrendOut(BaseModel):
+    company_id: int
+    start: date
+    end: date
+    interval: str
+    department: Optional[str] = None
+    points: list[HeadcountPoint]
+
+
+# ✅ Attrition of one department (department None = no department / company total)
+class AttritionEntry(BaseModel):
+    department: Optional[str] = None
+    left: int
+    joined: int
+    average_active: float
+    attrition_rate: float  # percent of the average headcount
+
+
+class AttritionOut(BaseModel):
+    company_id: int
+    start: date
+    end: date
+    snapshot_days: int
+    departments: list[AttritionEntry]
+    total: AttritionEntry
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date, time, datetime
 
@@ -30,8 +30,7 @@ class AttendanceOut(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ✅ Update Schema (optional, for admin approval)
@@ -40,5 +39,44 @@ class AttendanceUpdate(BaseModel):
     approved: Optional[bool] = None
     approved_by: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ✅ Delta sync response
+class AttendanceSync(BaseModel):
+    items: list[AttendanceOut]
+    deleted: list[int]       # ids removed since the token (tombstones)
+    full: bool               # True when items is the complete list (no/expired token)
+    sync_token: datetime     # pass back as updated_since on the next sync
+
+
+# ✅ Team availability (per-day bitmaps: day i = bit i % 8 of byte i // 8, hex)
+class EmployeeAvailability(BaseModel):
+    eid: str
+    name: str
+    department: Optional[str]
+    present: str
+    absent: str
+    leave: str
+    days_present: int
+    days_absent: int
+    days_on_leave: int
+
+
+class AvailabilityPerDay(BaseModel):
+    present: list[int]
+    absent: list[int]
+    on_leave: list[int]
+
+
+class AvailabilityOut(BaseModel):
+    company_id: int
+    start: date
+    end: date
+    days: int
+    department: Optional[str]
+    manager_id: Optional[str]
+    employees: list[EmployeeAvailability]
+    per_day: AvailabilityPerDay
+    cached: bool
+    compute_ms: float
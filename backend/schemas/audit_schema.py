@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Optional, Any
+from datetime import datetime
+
+# ✅ Output Schema
+class AuditOut(BaseModel):
+    audit_id: int
+    entity: str
+    entity_id: str
+    company_id: Optional[int]
+    action: str
+    actor: Optional[str]
+    changes: dict[str, Any]
+    created_at: datetime
+
+
+# ✅ One page of audit entries (newest first)
+class AuditPage(BaseModel):
+    items: list[AuditOut]
+    next_before_id: Optional[int] = None   # pass as before_id for the next page
@@ -0,0 +1,51 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+# NOTE: Either pass explicit ids, or leave them out and use the filter fields
+# (e.g. "all Pending payrolls for January 2025").
+
+# ✅ Approve / reject many leave requests
+class BulkLeaveDecision(BaseModel):
+    company_id: int
+    status: str                              # Approved / Rejected
+    approved_by: Optional[str] = None        # defaults to the current user
+    leave_ids: Optional[list[int]] = None
+    # Filter (when leave_ids is not given): Pending leaves starting in the period
+    start_from: Optional[date] = None
+    start_to: Optional[date] = None
+
+
+# ✅ Approve (or un-approve) many attendance rows
+class BulkAttendanceApproval(BaseModel):
+    company_id: int
+    approved: bool = True
+    approved_by: Optional[str] = None
+    attendance_ids: Optional[list[int]] = None
+    # Filter (when attendance_ids is not given): unapproved rows in the period
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+
+# ✅ Approve / mark paid many payrolls
+class BulkPayrollDecision(BaseModel):
+    company_id: int
+    status: str                              # Approved / Rejected / Paid
+    approved_by: Optional[str] = None
+    payroll_ids: Optional[list[int]] = None
+    # Filter (when payroll_ids is not given): Pending payrolls of the period
+    month: Optional[str] = None
+    year: Optional[int] = None
+
+
+# ✅ Per-id outcome
+class BulkItemResult(BaseModel):
+    id: int
+    outcome: str                             # updated / unchanged / not_found / insufficient_balance / invalid_transition
+    detail: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    requested: int
+    updated: int
+    results: list[BulkItemResult]
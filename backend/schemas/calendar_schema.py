@@ -0,0 +1,17 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import date
+
+# ✅ Holiday input
+class HolidayIn(BaseModel):
+    day: date
+    name: str
+
+
+# ✅ Calendar day output
+class CalendarDayOut(BaseModel):
+    day: date
+    is_working: bool
+    holiday_name: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 
@@ -22,5 +22,4 @@ class CompanyOut(BaseModel):
     established_year: Optional[int]
     created_at: datetime        # ✅ FIXED
     updated_at: Optional[datetime] 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
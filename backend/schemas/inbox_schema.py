@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Optional
+from schemas.attendance_schema import AttendanceOut
+from schemas.leave_schema import LeaveOut
+from schemas.payroll_schema import PayrollOut
+
+# ✅ Pending counts per category (payrolls only for payroll roles)
+class InboxCounts(BaseModel):
+    leaves: int
+    attendance: int
+    payrolls: Optional[int] = None
+
+
+class InboxCountsOut(BaseModel):
+    eid: str
+    counts: InboxCounts
+    total: int
+
+
+class InboxAttendance(AttendanceOut):
+    employee_name: Optional[str] = None
+
+
+class InboxPayroll(PayrollOut):
+    employee_name: Optional[str] = None
+
+
+# ✅ Inbox with the oldest pending items of each category
+class InboxOut(InboxCountsOut):
+    leaves: list[LeaveOut]
+    attendance: list[InboxAttendance]
+    payrolls: list[InboxPayroll]
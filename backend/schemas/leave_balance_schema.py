@@ -0,0 +1,31 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import datetime
+
+# ✅ Leave policy (entitlement per leave type)
+class LeavePolicyIn(BaseModel):
+    leave_type: str
+    annual_days: float
+    accrual: Optional[str] = "monthly"   # monthly / annual
+
+
+class LeavePolicyOut(LeavePolicyIn):
+    policy_id: int
+    company_id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ✅ Balance Output Schema
+class LeaveBalanceOut(BaseModel):
+    eid: str
+    company_id: int
+    leave_type: str
+    year: int
+    entitlement: float
+    accrued: float
+    used: float
+    balance: float
+    updated_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
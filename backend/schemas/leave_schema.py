@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date, datetime
 
@@ -9,7 +9,7 @@ class LeaveCreate(BaseModel):
     leave_type: str
     start_date: date
     end_date: date
-    total_days: Optional[int] = None
+    total_days: Optional[int] = None   # ignored; computed from the company calendar
     reason: Optional[str] = None
 
 
@@ -25,19 +25,27 @@ class LeaveOut(BaseModel):
     reason: Optional[str]
     status: Optional[str]
     approved_by: Optional[str]
+    version: int
     created_at: datetime
     employee_name: Optional[str] = None
     updated_at: Optional[datetime]
     approver_name: Optional[str] = None 
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ✅ Update Schema (for Admin approval/reject)
 class LeaveUpdate(BaseModel):
     status: Optional[str] = None   # Approved / Rejected
     approved_by: Optional[str] = None
+    version: Optional[int] = None  # version the client last read; 409 if it changed since
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ✅ Delta sync response
+class LeaveSync(BaseModel):
+    items: list[LeaveOut]
+    deleted: list[int]       # ids removed since the token (tombstones)
+    full: bool               # True when items is the complete list (no/expired token)
+    sync_token: datetime     # pass back as updated_since on the next sync
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date, datetime
 
@@ -27,11 +27,11 @@ class PayrollOut(BaseModel):
     net_pay: float
     status: str
     approved_by: Optional[str]
+    version: int
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ✅ Update Schema
@@ -40,6 +40,14 @@ class PayrollUpdate(BaseModel):
     net_pay: Optional[float] = None
     status: Optional[str] = None
     approved_by: Optional[str] = None
+    version: Optional[int] = None      # version the client last read; 409 if it changed since
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ✅ Delta sync response
+class PayrollSync(BaseModel):
+    items: list[PayrollOut]
+    deleted: list[int]       # ids removed since the token (tombstones)
+    full: bool               # True when items is the complete list (no/expired token)
+    sync_token: datetime     # pass back as updated_since on the next sync
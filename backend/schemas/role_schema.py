@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class RoleIn(BaseModel):
     name: str
@@ -7,5 +7,4 @@ class RoleOut(BaseModel):
     rid: int
     name: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ConfigDict
 from typing import Optional, List
 
 class UserSettingsOut(BaseModel):
@@ -8,8 +8,7 @@ class UserSettingsOut(BaseModel):
     personal_email: Optional[EmailStr] = None
     role: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UpdateRoleRequest(BaseModel):
@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from datetime import time
+
+# ✅ Create / Update Schema
+class ShiftPolicyIn(BaseModel):
+    shift_start: time = time(9, 0)
+    shift_end: time = time(18, 0)
+    grace_minutes: int = 10
+    break_minutes: int = 60
+    overtime_after_hours: float = 8.0
+    short_day_hours: float = 6.0
+    working_days: list[int] = [0, 1, 2, 3, 4]   # Monday = 0
+
+
+# ✅ Output Schema
+class ShiftPolicyOut(ShiftPolicyIn):
+    company_id: int
+    is_default: bool = False
+
+
+# ✅ Monthly overtime / lateness summary per employee
+class EmployeeShiftSummary(BaseModel):
+    eid: str
+    days_present: int
+    net_hours: float
+    overtime_hours: float
+    late_days: int
+    late_minutes: float
+    short_days: int
+    missing_checkouts: int
+    non_working_days_worked: int
+
+
+class ShiftSummaryOut(BaseModel):
+    company_id: int
+    year: int
+    month: int
+    policy: ShiftPolicyOut
+    employees: list[EmployeeShiftSummary]
+    totals: dict[str, float]
+    cached: bool
+    compute_ms: float
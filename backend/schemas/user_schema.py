@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ConfigDict
 from typing import Optional
 from datetime import datetime
 
@@ -42,8 +42,7 @@ class UserOut(BaseModel):
     company_name: Optional[str] = None
     role_name: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserLogin(BaseModel):
     eid: str
@@ -57,3 +56,20 @@ class AdminRegister(BaseModel):
     company_name: str
     company_logo: str
 
+
+class OrgMember(BaseModel):
+    eid: str
+    name: str
+    department: Optional[str] = None
+    position: Optional[str] = None
+    manager_id: Optional[str] = None
+    depth: int                      # 1 = direct report / direct manager
+
+class EmployeeSearchResult(BaseModel):
+    eid: str
+    name: str
+    department: Optional[str] = None
+    position: Optional[str] = None
+    company_email: Optional[str] = None
+    status: Optional[str] = None
+    score: int                      # higher = better match
@@ -0,0 +1,40 @@
+"""Monthly leave accrual (run from cron on the 1st of each month).
+
+Usage (from backend/):
+    python -m scripts.accrue_leave                          # current month, all companies
+    python -m scripts.accrue_leave --year 2025 --month 3 --company-id 1
+    python -m scripts.accrue_leave --rebuild --year 2025    # recompute balances from approved leaves
+"""
+import argparse
+import json
+from datetime import date
+from sqlalchemy import select
+from config.database import SessionLocal
+from models.company_model import Company
+from controllers.leave_balance_controller import accrue_leave, rebuild_leave_balances
+
+
+def main():
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Accrue leave entitlements or rebuild leave balances")
+    parser.add_argument("--year", type=int, default=today.year)
+    parser.add_argument("--month", type=int, default=today.month)
+    parser.add_argument("--company-id", type=int, action="append", dest="company_ids")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild balances from the ledger and approved leaves")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        company_ids = args.company_ids or db.execute(select(Company.company_id)).scalars().all()
+        for company_id in company_ids:
+            if args.rebuild:
+                result = rebuild_leave_balances(db, company_id, args.year)
+            else:
+                result = accrue_leave(db, company_id, args.year, args.month)
+            print(json.dumps(result))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Micro-benchmark for the per-request hot statements.
+
+Times the user lookup done by `get_current_user` and the check-in/check-out
+statements, each the way it used to be written (statement rebuilt as an ORM
+Query / Core construct on every call) against the prebuilt statements now in
+`utils/auth.py` and `controllers/attendance_controller.py`. Reports wall time
+and Python CPU time per call.
+
+Everything runs in one transaction that is rolled back: check-ins go to dates
+far in the future and nothing is kept.
+
+Usage (from backend/):
+    python -m scripts.bench_hot_queries [--eid ACJODO20250001] [--iterations 2000]
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, insert, update
+from config.database import SessionLocal
+from models.attendance_model import Attendance
+from models.user_model import User
+from utils.auth import current_user_query
+from controllers.attendance_controller import CHECK_IN_STATEMENT, OPEN_DAY_QUERY, CLOSE_DAY_STATEMENT
+
+BENCH_DAY = date(2900, 1, 1)  # check-ins are written from here on and rolled back
+
+
+# ---------------------------------------------------------------------------
+# Before: statements built per call
+# ---------------------------------------------------------------------------
+def user_before(db, user, i):
+    found = db.query(User).filter(User.eid == user.eid).first()
+    found.role and found.role.name  # role_required reads it (lazy load)
+    db.expunge_all()  # a request starts with an empty session
+
+
+def open_day_before(db, user, i):
+    db.execute(
+        select(Attendance.company_id, Attendance.check_in, Attendance.check_out, User.name)
+        .outerjoin(User, User.eid == Attendance.eid)
+        .where(Attendance.eid == user.eid, Attendance.date == BENCH_DAY)
+    ).first()
+
+
+def check_in_before(db, user, i):
+    db.execute(insert(Attendance).values(
+        eid=user.eid,
+        company_id=user.company_id,
+        date=BENCH_DAY + timedelta(days=2 * i),
+        check_in=datetime.now().time(),
+        status="Present",
+        approved=True,
+    ))
+
+
+def close_day_before(db, user, i):
+    db.execute(
+        update(Attendance)
+        .where(Attendance.eid == user.eid, Attendance.date == BENCH_DAY, Attendance.check_out.is_(None))
+        .values(check_out=datetime.now().time(), worked_hours=8.0, status="Completed")
+    )
+
+
+# ---------------------------------------------------------------------------
+# After: prebuilt statements, values bound per call
+# ---------------------------------------------------------------------------
+def user_after(db, user, i):
+    found = db.execute(current_user_query(), {"eid": user.eid}).scalars().first()
+    found.role and found.role.name  # already loaded by the same query
+    db.expunge_all()
+
+
+def open_day_after(db, user, i):
+    db.connection().execute(OPEN_DAY_QUERY, {"eid": user.eid, "day": BENCH_DAY}).first()
+
+
+def check_in_after(db, user, i):
+    db.connection().execute(CHECK_IN_STATEMENT, {
+        "eid": user.eid,
+        "company_id": user.company_id,
+        "date": BENCH_DAY + timedelta(days=2 * i + 1),
+        "check_in": datetime.now().time(),
+    })
+
+
+def close_day_after(db, user, i):
+    db.connection().execute(CLOSE_DAY_STATEMENT, {
+        "b_eid": user.eid,
+        "b_day": BENCH_DAY,
+        "b_check_out": datetime.now().time(),
+        "b_worked_hours": 8.0,
+    })
+
+
+CASES = {
+    "get_current_user": (user_before, user_after),
+    "check_out.lookup": (open_day_before, open_day_after),
+    "check_in.insert": (check_in_before, check_in_after),
+    "check_out.update": (close_day_before, close_day_after),
+}
+
+
+def measure(db, user, run, iterations: int, warmup: int, offset: int) -> dict:
+    for i in range(warmup):
+        run(db, user, offset + i)
+    wall, cpu = time.perf_counter(), time.process_time()
+    for i in range(warmup, warmup + iterations):
+        run(db, user, offset + i)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return {
+        "wall_us": round(wall / iterations * 1e6, 1),
+        "cpu_us": round(cpu / iterations * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call cost of the hot auth/attendance statements")
+    parser.add_argument("--eid", help="user to look up / check in (default: the first user)")
+    parser.add_argument("--iterations", type=int, default=2000, help="timed calls per variant")
+    parser.add_argument("--warmup", type=int, default=200, help="untimed calls first (fills the statement cache)")
+    parser.add_argument("--case", choices=sorted(CASES), action="append", help="only these cases (repeatable)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        query = select(User.eid, User.company_id)
+        if args.eid:
+            query = query.where(User.eid == args.eid)
+        user = db.execute(query.order_by(User.eid).limit(1)).first()
+        if user is None:
+            raise SystemExit("No such user" if args.eid else "No users in the database")
+
+        calls = args.warmup + args.iterations
+        for n, name in enumerate(args.case or CASES):
+            before, after = CASES[name]
+            # Disjoint check-in dates per case and variant (before: even days, after: odd)
+            result = {
+                "case": name,
+                "before": measure(db, user, before, args.iterations, args.warmup, n * calls),
+                "after": measure(db, user, after, args.iterations, args.warmup, n * calls),
+            }
+            result["cpu_saved_pct"] = round(
+                100 * (1 - result["after"]["cpu_us"] / result["before"]["cpu_us"]), 1
+            ) if result["before"]["cpu_us"] else 0.0
+            print(json.dumps(result))
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Query plan regression check for the company-scoped hot queries.
+
+Runs each hot controller query once, captures the SQL it sends, and runs
+`EXPLAIN FORMAT=JSON` on every statement. Exits with status 1 when any of them
+reads attendances, leave_requests, payrolls or user with a full table scan
+(access_type ALL).
+
+Plans depend on table statistics: on a nearly empty database MySQL may rightly
+prefer a scan. Run it against a copy with realistic data, or let it seed
+synthetic companies first (use a scratch database; seeded rows are removed
+again unless --keep-seed is given).
+
+Usage (from backend/):
+    python -m scripts.explain_check --company-id 1 [--manager-id ACJODO20250001]
+    python -m scripts.explain_check --seed-companies 20 --seed-employees 200
+"""
+import argparse
+import json
+import secrets
+import sys
+from calendar import month_name
+from datetime import date, datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import event, select, delete, insert, text
+from config.database import SessionLocal, engine
+from models.attendance_model import Attendance
+from models.company_model import Company
+from models.leave_model import LeaveRequest
+from models.payroll_model import Payroll
+from models.role_model import Role
+from models.user_model import User
+from controllers.attendance_controller import get_all_attendance
+from controllers.leave_controller import get_all_leaves
+from controllers.payroll_controller import (
+    get_all_payrolls,
+    get_payroll_warnings,
+    get_employee_count,
+    get_recent_payruns,
+    get_employer_cost,
+)
+
+CHECKED_TABLES = {"attendances", "leave_requests", "payrolls", "user"}
+SEED_ATTENDANCE_DAYS = 20
+SEED_BATCH_SIZE = 1000
+
+# name -> callable(db, company_id, manager_id); manager variants are skipped without a manager
+HOT_QUERIES = {
+    "get_all_attendance": lambda db, c, m: get_all_attendance(db, c),
+    "get_all_attendance[manager]": lambda db, c, m: get_all_attendance(db, c, m),
+    "get_all_leaves": lambda db, c, m: get_all_leaves(db, c),
+    "get_all_leaves[manager]": lambda db, c, m: get_all_leaves(db, c, m),
+    "get_all_payrolls": lambda db, c, m: get_all_payrolls(db, c),
+    "get_all_payrolls[manager]": lambda db, c, m: get_all_payrolls(db, c, m),
+    "get_payroll_warnings": lambda db, c, m: get_payroll_warnings(db, c),
+    "get_employee_count[monthly]": lambda db, c, m: get_employee_count(db, c, "monthly"),
+    "get_employee_count[yearly]": lambda db, c, m: get_employee_count(db, c, "yearly"),
+    "get_recent_payruns": lambda db, c, m: get_recent_payruns(db, c),
+    "get_employer_cost": lambda db, c, m: get_employer_cost(db, c),
+}
+
+
+def capture_statements(db, company_id: int, manager_id: str | None) -> dict[str, list[tuple[str, object]]]:
+    """Run every hot query and record the SELECTs each one sends."""
+    captured: dict[str, list[tuple[str, object]]] = {}
+    current: list[tuple[str, object]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            current.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for name, run in HOT_QUERIES.items():
+            if name.endswith("[manager]") and not manager_id:
+                continue
+            current.clear()
+            try:
+                run(db, company_id, manager_id)
+            except HTTPException:
+                pass  # 404 on an empty result still executed the query
+            # get_all_leaves looks up each employee by primary key; one sample per statement is enough
+            first: dict[str, object] = {}
+            for statement, parameters in current:
+                first.setdefault(statement, parameters)
+            captured[name] = list(first.items())
+            db.rollback()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return captured
+
+
+def _table_accesses(node):
+    """Yield every {"table_name", "access_type", "key", ...} block in an EXPLAIN JSON plan."""
+    if isinstance(node, dict):
+        if "table_name" in node and "access_type" in node:
+            yield node
+        for value in node.values():
+            yield from _table_accesses(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _table_accesses(value)
+
+
+def explain(conn, statement: str, parameters) -> list[dict]:
+    row = conn.exec_driver_sql("EXPLAIN FORMAT=JSON " + statement, parameters).first()
+    plan = json.loads(row[0])
+    return [
+        {
+            "table": access["table_name"],
+            "access_type": access["access_type"],
+            "key": access.get("key"),
+            "rows": access.get("rows_examined_per_scan"),
+        }
+        for access in _table_accesses(plan)
+    ]
+
+
+def check_plans(db, company_id: int, manager_id: str | None) -> tuple[list[dict], list[dict]]:
+    captured = capture_statements(db, company_id, manager_id)
+    report, failures = [], []
+    with engine.connect() as conn:
+        for name, statements in captured.items():
+            for statement, parameters in statements:
+                accesses = explain(conn, statement, parameters)
+                scans = [a for a in accesses if a["access_type"] == "ALL" and a["table"] in CHECKED_TABLES]
+                entry = {"query": name, "ok": not scans, "plan": accesses}
+                report.append(entry)
+                if scans:
+                    failures.append({**entry, "sql": " ".join(statement.split())})
+    return report, failures
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+def _insert_batched(conn, model, rows: list[dict]):
+    for i in range(0, len(rows), SEED_BATCH_SIZE):
+        conn.execute(insert(model), rows[i:i + SEED_BATCH_SIZE])
+
+
+def seed(companies: int, employees: int) -> tuple[list[int], str]:
+    """Insert `companies` companies of `employees` people each, with a month of
+    attendance, some leaves and a few payruns. Returns (company ids, a manager eid)."""
+    tag = secrets.token_hex(2)
+    today = date.today()
+    company_ids = []
+    with engine.begin() as conn:
+        role_id = conn.execute(select(Role.rid).order_by(Role.rid).limit(1)).scalar()
+        if role_id is None:
+            raise SystemExit("No roles in the database; create them before seeding")
+        for c in range(companies):
+            company_id = conn.execute(insert(Company).values(
+                name=f"explain-check {tag} {c}",
+                company_code=f"EX{tag}{c}",
+            )).inserted_primary_key[0]
+            company_ids.append(company_id)
+
+            eids = [f"EX{tag}{c:03d}{e:05d}" for e in range(employees)]
+            manager = eids[0]
+            _insert_batched(conn, User, [{
+                "eid": eid,
+                "company_id": company_id,
+                "role_id": role_id,
+                "name": f"Employee {e}",
+                "personal_email": f"{eid.lower()}@explain.invalid",
+                "password_hash": "",
+                "department": f"Dept {e % 10}",
+                "date_of_joining": datetime(2020 + e % 5, 1 + e % 12, 1),
+                "manager_id": manager if e else None,
+                "bank_account": None if e % 7 == 0 else f"ACCT{e}",
+            } for e, eid in enumerate(eids)])
+            _insert_batched(conn, Attendance, [{
+                "eid": eid,
+                "company_id": company_id,
+                "date": today - timedelta(days=d),
+                "status": "Completed",
+                "approved": d > 2,
+                "worked_hours": 8.0,
+            } for eid in eids for d in range(SEED_ATTENDANCE_DAYS)])
+            _insert_batched(conn, LeaveRequest, [{
+                "eid": eid,
+                "company_id": company_id,
+                "leave_type": "Casual Leave",
+                "start_date": today + timedelta(days=7 + e % 30),
+                "end_date": today + timedelta(days=8 + e % 30),
+                "total_days": 2,
+                "status": "Pending" if e % 2 else "Approved",
+            } for e, eid in enumerate(eids)])
+            _insert_batched(conn, Payroll, [{
+                "eid": eid,
+                "company_id": company_id,
+                "month": month_name[m],
+                "year": today.year,
+                "basic_salary": 5000.0,
+                "deductions": 500.0,
+                "net_pay": 4500.0,
+                "status": "Paid",
+            } for eid in eids for m in range(1, 4)])
+        for table in sorted(CHECKED_TABLES):
+            conn.execute(text(f"ANALYZE TABLE `{table}`"))
+    # The first employee of each company manages everyone else
+    return company_ids, f"EX{tag}{0:03d}{0:05d}"
+
+
+def remove_seed(company_ids: list[int]):
+    with engine.begin() as conn:
+        for model in (Attendance, LeaveRequest, Payroll):
+            conn.execute(delete(model).where(model.company_id.in_(company_ids)))
+        # Reports first so the self-referencing manager_id FK never blocks the delete
+        conn.execute(delete(User).where(User.company_id.in_(company_ids), User.manager_id.is_not(None)))
+        conn.execute(delete(User).where(User.company_id.in_(company_ids)))
+        conn.execute(delete(Company).where(Company.company_id.in_(company_ids)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when a hot query's plan falls back to a full table scan")
+    parser.add_argument("--company-id", type=int, help="company to run the queries for (required without seeding)")
+    parser.add_argument("--manager-id", help="also check the manager-scoped variants for this eid")
+    parser.add_argument("--seed-companies", type=int, default=0, help="seed this many synthetic companies first")
+    parser.add_argument("--seed-employees", type=int, default=200, help="employees per seeded company")
+    parser.add_argument("--keep-seed", action="store_true", help="leave the seeded rows in place")
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only the failures")
+    args = parser.parse_args()
+
+    seeded: list[int] = []
+    company_id, manager_id = args.company_id, args.manager_id
+    if args.seed_companies:
+        seeded, seeded_manager = seed(args.seed_companies, args.seed_employees)
+        company_id = company_id or seeded[0]
+        manager_id = manager_id or (seeded_manager if company_id == seeded[0] else None)
+    elif company_id is None:
+        parser.error("--company-id is required unless --seed-companies is given")
+
+    db = SessionLocal()
+    try:
+        report, failures = check_plans(db, company_id, manager_id)
+    finally:
+        db.close()
+        if seeded and not args.keep_seed:
+            remove_seed(seeded)
+
+    for entry in report if args.verbose else failures:
+        print(json.dumps(entry))
+    print(json.dumps({
+        "company_id": company_id,
+        "statements": len(report),
+        "full_scans": len(failures),
+        "queries": sorted({f["query"] for f in failures}),
+    }))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Nightly headcount snapshot (run from cron shortly after midnight).
+
+Usage (from backend/):
+    python -m scripts.headcount_snapshot                          # yesterday, all companies
+    python -m scripts.headcount_snapshot --date 2025-01-06 --company-id 1
+    python -m scripts.headcount_snapshot --start 2025-01-01 --end 2025-01-31
+
+A day's active headcount is read from the live `user` table, so re-running
+it for a past day gives today's view of that day (hires and departures are
+exact; people deleted since then are missing from `active`).
+"""
+import argparse
+import json
+from datetime import date, timedelta
+from config.database import SessionLocal
+from controllers.analytics_controller import run_headcount_snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write per-department active/joined/left counts for a day")
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="day to snapshot (default: yesterday)")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="first day of a backfill range")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="last day of a backfill range (default: yesterday)")
+    parser.add_argument("--company-id", type=int, action="append", dest="company_ids")
+    args = parser.parse_args()
+
+    if args.start:
+        end = args.end or date.today() - timedelta(days=1)
+        days = [args.start + timedelta(days=i) for i in range((end - args.start).days + 1)]
+    else:
+        days = [args.date]
+
+    db = SessionLocal()
+    try:
+        for day in days:
+            print(json.dumps(run_headcount_snapshots(db, day, args.company_ids)))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
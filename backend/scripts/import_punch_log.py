@@ -0,0 +1,45 @@
+"""Import door-terminal punch logs into attendances.
+
+Usage (from backend/):
+    python -m scripts.import_punch_log --company-id 1 punches-2025-01-06.log [more.log.gz ...]
+
+Prints one JSON report per file.
+"""
+import argparse
+import json
+from config.database import SessionLocal
+from utils.punch_ingest import (
+    import_punch_log,
+    open_punch_log,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_DEDUPE_SECONDS,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import biometric punch logs (eid,timestamp,device)")
+    parser.add_argument("files", nargs="+", help="punch log files (.log/.csv, optionally .gz)")
+    parser.add_argument("--company-id", type=int, required=True)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--dedupe-seconds", type=int, default=DEFAULT_DEDUPE_SECONDS)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        for path in args.files:
+            with open_punch_log(path) as lines:
+                report = import_punch_log(
+                    db,
+                    args.company_id,
+                    lines,
+                    source=path,
+                    batch_size=args.batch_size,
+                    dedupe_seconds=args.dedupe_seconds,
+                )
+            print(json.dumps(report))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Nightly attendance reconciliation (run from cron shortly after midnight).
+
+Usage (from backend/):
+    python -m scripts.nightly_reconcile                 # yesterday, all companies
+    python -m scripts.nightly_reconcile --date 2025-01-06 --company-id 1
+"""
+import argparse
+import json
+from datetime import date
+from config.database import SessionLocal
+from controllers.reconciliation_controller import run_nightly_reconciliation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mark absentees and close open check-ins")
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="day to reconcile (default: yesterday)")
+    parser.add_argument("--company-id", type=int, action="append", dest="company_ids")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(json.dumps(run_nightly_reconciliation(db, args.date, args.company_ids)))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
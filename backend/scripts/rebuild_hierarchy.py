@@ -0,0 +1,33 @@
+"""Rebuild the user_hierarchy closure table from user.manager_id.
+
+Run once after upgrading (existing users have no closure rows yet), or to
+repair the table after manual edits to manager_id.
+
+Usage (from backend/):
+    python -m scripts.rebuild_hierarchy                 # all companies
+    python -m scripts.rebuild_hierarchy --company-id 1
+"""
+import argparse
+import json
+from sqlalchemy import select
+from config.database import SessionLocal
+from models.company_model import Company
+from utils.hierarchy import rebuild_hierarchy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the reporting-line closure table")
+    parser.add_argument("--company-id", type=int, action="append", dest="company_ids")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        company_ids = args.company_ids or db.execute(select(Company.company_id)).scalars().all()
+        for company_id in company_ids:
+            print(json.dumps(rebuild_hierarchy(db, company_id)))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import json
+from datetime import datetime
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import Session
+from config.database import engine
+from models.audit_model import AuditLog
+from models.attendance_model import Attendance
+from models.leave_model import LeaveRequest
+from models.payroll_model import Payroll
+from models.user_model import User
+from utils.batch_writer import BatchWriter
+
+# model -> (entity name, primary key attribute)
+AUDITED_MODELS = {
+    Attendance: ("attendance", "attendance_id"),
+    LeaveRequest: ("leave", "leave_id"),
+    Payroll: ("payroll", "payroll_id"),
+    User: ("user", "eid"),
+}
+IGNORED_FIELDS = {"created_at", "updated_at"}
+MASKED_FIELDS = {"password_hash"}
+
+PENDING_KEY = "audit_pending"
+ACTOR_KEY = "audit_actor"
+
+
+class AuditWriter(BatchWriter):
+    """Insert audit rows in batches, outside the request's transaction."""
+
+    def write_batch(self, rows: list):
+        with engine.begin() as conn:
+            conn.execute(insert(AuditLog), rows)
+
+
+audit_writer = AuditWriter("audit-writer", flush_interval_ms=200, max_rows=500)
+
+
+def set_audit_actor(db: Session, eid: str | None):
+    """Attribute the changes committed by this session to `eid`."""
+    if eid:
+        db.info[ACTOR_KEY] = eid
+
+
+def record_change(db: Session, entity: str, entity_id, company_id: int | None, changes: dict, action: str = "update"):
+    """Queue an audit row for a change the session events can't see (e.g. bulk UPDATE)."""
+    db.info.setdefault(PENDING_KEY, []).append({
+        "entity": entity,
+        "entity_id": str(entity_id),
+        "company_id": company_id,
+        "action": action,
+        "actor": db.info.get(ACTOR_KEY),
+        "changes": json.dumps(changes, default=str),
+        "created_at": datetime.now(),
+    })
+
+
+def _diff(obj) -> dict:
+    state = inspect(obj)
+    changes = {}
+    for attr in state.mapper.column_attrs:
+        key = attr.key
+        if key in IGNORED_FIELDS:
+            continue
+        history = state.attrs[key].history
+        if not history.has_changes():
+            continue
+        before = history.deleted[0] if history.deleted else None
+        after = history.added[0] if history.added else None
+        if before == after:
+            continue
+        if key in MASKED_FIELDS:
+            before, after = "***", "***"
+        changes[key] = {"before": before, "after": after}
+    return changes
+
+
+def _snapshot(obj) -> dict:
+    state = inspect(obj)
+    return {
+        attr.key: ("***" if attr.key in MASKED_FIELDS else getattr(obj, attr.key))
+        for attr in state.mapper.column_attrs
+        if attr.key not in IGNORED_FIELDS
+    }
+
+
+@event.listens_for(Session, "before_flush")
+def _capture_changes(session, flush_context, instances):
+    for obj in session.dirty:
+        meta = AUDITED_MODELS.get(type(obj))
+        if meta is None or not session.is_modified(obj, include_collections=False):
+            continue
+        changes = _diff(obj)
+        if changes:
+            entity, pk = meta
+            record_change(session, entity, getattr(obj, pk), getattr(obj, "company_id", None), changes)
+    for obj in session.deleted:
+        meta = AUDITED_MODELS.get(type(obj))
+        if meta is None:
+            continue
+        entity, pk = meta
+        before = {key: {"before": value, "after": None} for key, value in _snapshot(obj).items()}
+        record_change(session, entity, getattr(obj, pk), getattr(obj, "company_id", None), before, action="delete")
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_off(session):
+    # Only committed changes are audited; the writer batches them off the request path
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        audit_writer.submit_many(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(PENDING_KEY, None)
@@ -1,11 +1,14 @@
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from config.database import get_db
+from config.database import get_db, SessionLocal
 from models.user_model import User
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from functools import cache
+from sqlalchemy import select, bindparam
+from sqlalchemy.orm import Session, joinedload
+from utils.rate_limit import hashing_gate
 
 SECRET_KEY = "abcd"  # change to any random string
 ALGORITHM = "HS256"
@@ -15,12 +18,33 @@ oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/users/login",
     scheme_name="Bearer"
 )
+# Same scheme, but a missing token is not an error (see get_optional_user)
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl="/users/login",
+    scheme_name="Bearer",
+    auto_error=False
+)
 
+# Runs on every authenticated request: built once, so each call only binds `eid`
+# and hits the compiled-statement cache. The role comes in the same query
+# (role_required reads it), instead of a lazy load per request. Built on first
+# use, once every model is imported and the mappers can be configured.
+@cache
+def current_user_query():
+    return (
+        select(User)
+        .options(joinedload(User.role))
+        .where(User.eid == bindparam("eid"))
+    )
+
+# Both go through hashing_gate so a login storm can't take every core (429 instead)
 def hash_password(password: str):
-    return password_context.hash(password)
+    with hashing_gate.slot():
+        return password_context.hash(password)
 
 def verify_password(plain_password, hashed_password):
-    return password_context.verify(plain_password, hashed_password)
+    with hashing_gate.slot():
+        return password_context.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_minutes: int = 60):
     to_encode = data.copy()
@@ -41,11 +65,47 @@ def get_current_user(
             raise HTTPException(status_code=401, detail="Invalid token")
 
         # Find user
-        user = db.query(User).filter(User.eid == eid).first()
+        user = db.execute(current_user_query(), {"eid": eid}).scalars().first()
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
 
         return user
 
     except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+
+def get_optional_user(
+    token: str | None = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """The authenticated user when a bearer token is sent, else None.
+
+    For routes that don't require a login yet but should attribute changes
+    (audit actor) to the caller; an invalid token is still rejected with 401.
+    """
+    if token is None:
+        return None
+    return get_current_user(token, db)
+
+
+def get_stream_user(
+    request: Request,
+    token: str | None = Depends(optional_oauth2_scheme),
+    access_token: str | None = Query(None, alias="token"),
+):
+    """Authenticated user for EventSource streams.
+
+    Browsers can't set headers on an EventSource, so besides the bearer header
+    the token may come as `?token=` or an `access_token` cookie. Uses its own
+    short session: the stream stays open for hours and must not hold a
+    pooled connection for that long.
+    """
+    token = token or access_token or request.cookies.get("access_token")
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    db = SessionLocal()
+    try:
+        return get_current_user(token, db)
+    finally:
+        db.close()
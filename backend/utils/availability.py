@@ -0,0 +1,190 @@
+import threading
+from datetime import date
+from time import monotonic, perf_counter
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import select, union_all, literal, null, case, func, String, Integer
+from sqlalchemy.orm import Session
+from models.attendance_model import Attendance
+from models.leave_model import LeaveRequest
+from models.user_model import User
+from utils.hierarchy import in_org
+
+AVAILABILITY_CACHE_TTL = 60   # seconds; leave decisions invalidate the company earlier
+AVAILABILITY_MAX_DAYS = 92    # one quarter
+MAX_CACHED_RANGES = 256
+
+# Row kinds returned by the single UNION ALL query
+EMPLOYEE, PRESENT, ABSENT, LEAVE = "E", "P", "A", "L"
+
+_cache: dict[tuple, tuple[float, dict]] = {}
+_lock = threading.Lock()
+
+
+def invalidate_availability(company_id: int):
+    with _lock:
+        for key in [k for k in _cache if k[0] == company_id]:
+            del _cache[key]
+
+
+def _team_filter(company_id: int, department: str | None, manager_id: str | None) -> list:
+    conditions = [User.company_id == company_id, User.status == "Active"]
+    if department:
+        conditions.append(User.department == department)
+    if manager_id:
+        conditions.append(in_org(User.eid, manager_id))  # whole org, not just direct reports
+    return conditions
+
+
+def _availability_query(company_id: int, start: date, end: date, department: str | None, manager_id: str | None):
+    """Team roster, attendance days and approved leave ranges in one round trip.
+
+    Days come back as offsets from `start` (DATEDIFF), so no date arithmetic
+    is done per row in Python.
+    """
+    team = _team_filter(company_id, department, manager_id)
+    last = (end - start).days
+
+    def offset(column):
+        return func.datediff(column, start)
+
+    roster = select(
+        User.eid,
+        User.name,
+        User.department,
+        null().cast(Integer).label("first_day"),
+        null().cast(Integer).label("last_day"),
+        literal(EMPLOYEE, String).label("kind"),
+    ).where(*team)
+    attendance = (
+        select(
+            Attendance.eid,
+            null().cast(String),
+            null().cast(String),
+            offset(Attendance.date),
+            offset(Attendance.date),
+            case(
+                (Attendance.status == "On Leave", LEAVE),
+                (Attendance.status == "Absent", ABSENT),
+                else_=PRESENT,
+            ),
+        )
+        .join(User, User.eid == Attendance.eid)
+        .where(*team, Attendance.date >= start, Attendance.date <= end)
+    )
+    leaves = (
+        select(
+            LeaveRequest.eid,
+            null().cast(String),
+            null().cast(String),
+            func.greatest(offset(LeaveRequest.start_date), 0),
+            func.least(offset(LeaveRequest.end_date), last),
+            literal(LEAVE, String),
+        )
+        .join(User, User.eid == LeaveRequest.eid)
+        .where(
+            *team,
+            LeaveRequest.status == "Approved",
+            LeaveRequest.start_date <= end,
+            LeaveRequest.end_date >= start,
+        )
+    )
+    return union_all(roster, attendance, leaves)
+
+
+def _bitmap(bits) -> str:
+    """Day i of the range is bit (i % 8) of byte (i // 8), hex encoded."""
+    return np.packbits(bits, bitorder="little").tobytes().hex()
+
+
+def build_availability(rows, days: int) -> tuple[list[dict], dict]:
+    """Turn the query rows into one boolean (employee x day) grid per kind."""
+    employees: dict[str, int] = {}
+    people = []
+    spans = []
+    for row in rows:
+        if row[5] == EMPLOYEE:
+            employees[row[0]] = len(people)
+            people.append(row[:3])
+        else:
+            spans.append(row)
+
+    grids = {kind: np.zeros((len(people), days), dtype=bool) for kind in (PRESENT, ABSENT, LEAVE)}
+    if spans:
+        eids, _, _, first, last, kinds = zip(*spans)
+        idx = np.fromiter((employees.get(e, -1) for e in eids), dtype=np.int64, count=len(eids))
+        first = np.array(first, dtype=np.int64)
+        last = np.array(last, dtype=np.int64)
+        kinds = np.array(kinds)
+        single = (first == last) & (idx >= 0)
+        for kind, grid in grids.items():
+            # Attendance rows are single days: one fancy-index assignment per kind
+            mask = single & (kinds == kind)
+            grid[idx[mask], first[mask]] = True
+        for i in np.nonzero((first != last) & (idx >= 0))[0]:
+            grids[kinds[i]][idx[i], first[i]:last[i] + 1] = True
+
+    team = [
+        {
+            "eid": eid,
+            "name": name,
+            "department": department,
+            "present": _bitmap(grids[PRESENT][i]),
+            "absent": _bitmap(grids[ABSENT][i]),
+            "leave": _bitmap(grids[LEAVE][i]),
+            "days_present": int(grids[PRESENT][i].sum()),
+            "days_absent": int(grids[ABSENT][i].sum()),
+            "days_on_leave": int(grids[LEAVE][i].sum()),
+        }
+        for i, (eid, name, department) in enumerate(people)
+    ]
+    per_day = {
+        "present": grids[PRESENT].sum(axis=0).tolist(),
+        "absent": grids[ABSENT].sum(axis=0).tolist(),
+        "on_leave": grids[LEAVE].sum(axis=0).tolist(),
+    }
+    return team, per_day
+
+
+def get_availability(
+    db: Session,
+    company_id: int,
+    start: date,
+    end: date,
+    department: str | None = None,
+    manager_id: str | None = None,
+) -> dict:
+    """Per-employee present/absent/leave day bitmaps for a team, cached per range."""
+    if end < start:
+        raise HTTPException(status_code=400, detail="end cannot be before start")
+    if (end - start).days + 1 > AVAILABILITY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {AVAILABILITY_MAX_DAYS} days")
+
+    key = (company_id, start, end, department, manager_id)
+    now = monotonic()
+    with _lock:
+        cached = _cache.get(key)
+    if cached and cached[0] > now:
+        return {**cached[1], "cached": True}
+
+    started = perf_counter()
+    rows = db.execute(_availability_query(company_id, start, end, department, manager_id)).all()
+    team, per_day = build_availability(rows, (end - start).days + 1)
+    result = {
+        "company_id": company_id,
+        "start": start,
+        "end": end,
+        "days": (end - start).days + 1,
+        "department": department,
+        "manager_id": manager_id,
+        "employees": team,
+        "per_day": per_day,
+        "cached": False,
+        "compute_ms": round((perf_counter() - started) * 1000, 2),
+    }
+    with _lock:
+        if len(_cache) >= MAX_CACHED_RANGES:
+            for stale in [k for k, (expires, _) in _cache.items() if expires <= now] or list(_cache)[:1]:
+                del _cache[stale]
+        _cache[key] = (now + AVAILABILITY_CACHE_TTL, result)
+    return result
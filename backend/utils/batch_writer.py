@@ -0,0 +1,133 @@
+import threading
+import time
+
+
+class BatchWriter:
+    """Collect rows in memory and write them from a background thread in batches.
+
+    A batch is written when `max_rows` rows are pending or `flush_interval_ms`
+    has elapsed since the last write, whichever comes first. Subclasses
+    implement `write_batch(rows)`; a failed batch is put back at the front of
+    the queue and retried on the next tick.
+    """
+
+    def __init__(self, name: str, flush_interval_ms: int = 25, max_rows: int = 500):
+        self.name = name
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_rows = max_rows
+        self._cond = threading.Condition()
+        self._pending: list = []
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._flush_lock = threading.Lock()
+        self._metrics = {
+            "submitted": 0,
+            "flushes": 0,
+            "rows_flushed": 0,
+            "flush_errors": 0,
+            "largest_batch": 0,
+            "last_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Hooks for subclasses
+    # ------------------------------------------------------------------
+    def write_batch(self, rows: list):
+        raise NotImplementedError
+
+    def on_submit(self, rows: list):
+        """Called with the lock held, before rows become visible to the flusher."""
+
+    def on_flushed(self):
+        """Called with the lock held after a batch was written successfully."""
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def start(self):
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+            self._thread.start()
+
+    def submit(self, row):
+        self.submit_many([row])
+
+    def submit_many(self, rows: list):
+        if not rows:
+            return
+        with self._cond:
+            self.on_submit(rows)
+            self._pending.extend(rows)
+            self._metrics["submitted"] += len(rows)
+            if len(self._pending) >= self.max_rows:
+                self._cond.notify()
+        if self._thread is None:
+            self.start()
+
+    def flush(self):
+        """Write everything pending right now (used on shutdown and by jobs)."""
+        while self._flush_once():
+            pass
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def metrics(self) -> dict:
+        with self._cond:
+            data = dict(self._metrics)
+            data["pending"] = len(self._pending)
+        flushes = data["flushes"]
+        data["total_flush_ms"] = round(data["total_flush_ms"], 3)
+        data["avg_flush_ms"] = round(self._metrics["total_flush_ms"] / flushes, 3) if flushes else 0.0
+        data["avg_batch_rows"] = round(data["rows_flushed"] / flushes, 1) if flushes else 0.0
+        return data
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._pending) < self.max_rows and not self._stopping:
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            self._flush_once()
+
+    def _flush_once(self) -> bool:
+        with self._flush_lock:
+            with self._cond:
+                if not self._pending:
+                    return False
+                batch = self._pending[:self.max_rows]
+                del self._pending[:self.max_rows]
+
+            started = time.perf_counter()
+            try:
+                self.write_batch(batch)
+            except Exception as e:
+                with self._cond:
+                    self._pending[:0] = batch
+                    self._metrics["flush_errors"] += 1
+                print(f"[{self.name}] Flush of {len(batch)} rows failed:", e)
+                time.sleep(self.flush_interval)
+                return False
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            with self._cond:
+                self._metrics["flushes"] += 1
+                self._metrics["rows_flushed"] += len(batch)
+                self._metrics["largest_batch"] = max(self._metrics["largest_batch"], len(batch))
+                self._metrics["last_flush_ms"] = round(elapsed_ms, 3)
+                self._metrics["total_flush_ms"] += elapsed_ms
+                self.on_flushed()
+            return True
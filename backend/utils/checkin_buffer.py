@@ -0,0 +1,262 @@
+import glob
+import json
+import os
+import threading
+from time import monotonic
+from datetime import date, datetime, time
+from fastapi import HTTPException
+from sqlalchemy import insert, select, bindparam
+from config.database import engine
+from models.attendance_model import Attendance
+from models.user_model import User
+from utils.batch_writer import BatchWriter
+from utils.shift_engine import invalidate_month
+
+# Opt-in: the default check-in path writes one row per request.
+CHECKIN_BUFFER_ENABLED = os.getenv("CHECKIN_BUFFER_ENABLED", "0") == "1"
+CHECKIN_BUFFER_FLUSH_MS = int(os.getenv("CHECKIN_BUFFER_FLUSH_MS", "25"))
+CHECKIN_BUFFER_MAX_ROWS = int(os.getenv("CHECKIN_BUFFER_MAX_ROWS", "500"))
+# Durability: "none" keeps punches in memory only, "wal" appends each punch to a
+# local file before acknowledging it, "wal_fsync" also fsyncs every append.
+CHECKIN_BUFFER_DURABILITY = os.getenv("CHECKIN_BUFFER_DURABILITY", "wal")
+# Base name of the write-ahead files; each worker process appends to its own
+# `<path>.<pid>` segment and never touches another live worker's file.
+CHECKIN_BUFFER_WAL_PATH = os.getenv("CHECKIN_BUFFER_WAL_PATH", "checkin_buffer.wal")
+
+EMPLOYEE_CACHE_TTL = 300  # seconds a company's employee list is trusted
+EMPLOYEE_CACHE_MISS_RELOAD = 10  # an unknown eid triggers a reload if the list is older than this
+
+# Point lookup on uq_attendance_eid_date: rows flushed by other workers or before a restart
+CHECKED_IN_QUERY = (
+    select(Attendance.attendance_id)
+    .where(Attendance.eid == bindparam("eid"), Attendance.date == bindparam("day"))
+    .limit(1)
+)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    return True
+
+
+class CheckInBuffer(BatchWriter):
+    """Acknowledge check-ins from memory and insert them as multi-row INSERTs.
+
+    Punches are validated against a cached list of the company's employees,
+    the check-ins this process accepted today and the rows already in
+    `attendances`, then appended to this process's write-ahead segment (if
+    enabled) and acknowledged as accepted. The flusher writes them with INSERT
+    IGNORE: the only duplicates left are two workers accepting the same
+    employee within one flush interval, and uq_attendance_eid_date keeps the
+    first (counted in `ignored_on_insert`).
+    """
+
+    def __init__(self, durability: str = CHECKIN_BUFFER_DURABILITY, wal_path: str = CHECKIN_BUFFER_WAL_PATH, **kwargs):
+        super().__init__("checkin-buffer", **kwargs)
+        self.durability = durability
+        self.wal_base = wal_path if durability != "none" else None
+        self.wal_path = f"{wal_path}.{os.getpid()}" if self.wal_base else None
+        self._wal = None
+        self._accepted_day = date.today()
+        self._accepted: set[str] = set()
+        self._employees: dict[int, tuple[float, set[str]]] = {}
+        self._employees_lock = threading.Lock()
+        self._metrics.update({"rejected": 0, "ignored_on_insert": 0, "replayed": 0})
+
+    # ------------------------------------------------------------------
+    # Validation
+    # ------------------------------------------------------------------
+    def _load_employees(self, company_id: int) -> set[str]:
+        with engine.connect() as conn:
+            rows = conn.execute(select(User.eid).where(User.company_id == company_id)).scalars().all()
+        eids = set(rows)
+        with self._employees_lock:
+            self._employees[company_id] = (monotonic(), eids)
+        return eids
+
+    def _is_employee(self, eid: str, company_id: int) -> bool:
+        with self._employees_lock:
+            loaded_at, eids = self._employees.get(company_id, (0.0, set()))
+        age = monotonic() - loaded_at
+        if age > EMPLOYEE_CACHE_TTL or (eid not in eids and age > EMPLOYEE_CACHE_MISS_RELOAD):
+            eids = self._load_employees(company_id)
+        return eid in eids
+
+    # ------------------------------------------------------------------
+    # Write-ahead file
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _wal_line(row: dict) -> str:
+        return json.dumps({
+            "eid": row["eid"],
+            "company_id": row["company_id"],
+            "date": row["date"].isoformat(),
+            "check_in": row["check_in"].isoformat(),
+        }) + "\n"
+
+    def _append_wal(self, rows: list):
+        if not self.wal_path:
+            return
+        if self._wal is None:
+            self._wal = open(self.wal_path, "a", encoding="utf-8")
+        for row in rows:
+            self._wal.write(self._wal_line(row))
+        self._wal.flush()
+        if self.durability == "wal_fsync":
+            os.fsync(self._wal.fileno())
+
+    def _rewrite_wal(self):
+        """Keep only the punches that are still pending after a flush."""
+        if not self.wal_path:
+            return
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+        tmp_path = self.wal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for row in self._pending:
+                f.write(self._wal_line(row))
+            f.flush()
+            if self.durability == "wal_fsync":
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.wal_path)
+
+    @staticmethod
+    def _read_wal(path: str) -> list:
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash
+                rows.append({
+                    "eid": item["eid"],
+                    "company_id": item["company_id"],
+                    "date": date.fromisoformat(item["date"]),
+                    "check_in": time.fromisoformat(item["check_in"]),
+                    "status": "Present",
+                    "approved": True,
+                })
+        return rows
+
+    def _orphan_segments(self) -> list[str]:
+        """Segments nobody is appending to: this process's own (pid reused after
+        a restart), those of workers no longer running, leftovers of a replay
+        that died half-way, and the old single shared file."""
+        paths = [self.wal_base] if os.path.exists(self.wal_base) else []
+        for path in glob.glob(glob.escape(self.wal_base) + ".*"):
+            # "<base>.<pid>" or "<base>.<pid>.replay-<claimer pid>": the last pid owns it
+            owner = path.rsplit("-", 1)[-1] if ".replay-" in path else path.rsplit(".", 1)[-1]
+            if owner.isdigit() and (int(owner) == os.getpid() or not _process_alive(int(owner))):
+                paths.append(path)
+        return paths
+
+    def replay_wal(self):
+        """Re-queue punches acknowledged before a crash or restart.
+
+        Each orphaned segment is claimed with an atomic rename, so when several
+        workers start together exactly one of them replays it. Its punches are
+        copied into this worker's own segment before the claimed file is removed.
+        """
+        if not self.wal_base:
+            return
+        rows = []
+        for path in self._orphan_segments():
+            claimed = f"{path.split('.replay-')[0]}.replay-{os.getpid()}"
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue  # another worker claimed it first
+            claimed_rows = self._read_wal(claimed)
+            with self._cond:
+                self._append_wal(claimed_rows)
+            os.remove(claimed)
+            rows.extend(claimed_rows)
+        with self._cond:
+            for row in rows:
+                if row["date"] == self._accepted_day:
+                    self._accepted.add(row["eid"])
+            self._pending.extend(rows)
+            self._metrics["replayed"] += len(rows)
+
+    # ------------------------------------------------------------------
+    # BatchWriter hooks
+    # ------------------------------------------------------------------
+    def on_submit(self, rows: list):
+        self._append_wal(rows)
+
+    def on_flushed(self):
+        self._rewrite_wal()
+
+    def write_batch(self, rows: list):
+        stmt = (
+            insert(Attendance)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite")
+            .values(rows)
+        )
+        with engine.begin() as conn:
+            result = conn.execute(stmt)
+        for company_id, day in {(row["company_id"], row["date"]) for row in rows}:
+            invalidate_month(company_id, day)
+        ignored = len(rows) - max(result.rowcount, 0)
+        if ignored:
+            with self._cond:
+                self._metrics["ignored_on_insert"] += ignored
+
+    # ------------------------------------------------------------------
+    # Entry point used by check_in
+    # ------------------------------------------------------------------
+    def check_in(self, eid: str, company_id: int) -> dict:
+        if not self._is_employee(eid, company_id):
+            with self._cond:
+                self._metrics["rejected"] += 1
+            raise HTTPException(status_code=400, detail="Invalid employee or company")
+
+        today = date.today()
+        now = datetime.now().time()
+        row = {
+            "eid": eid,
+            "company_id": company_id,
+            "date": today,
+            "check_in": now,
+            "status": "Present",
+            "approved": True,
+        }
+
+        with self._cond:
+            if today != self._accepted_day:
+                self._accepted_day = today
+                self._accepted = set()
+            duplicate = eid in self._accepted
+        # Not accepted here: it may still be stored already (another worker's
+        # flush, or before a restart). One indexed read, no write.
+        if not duplicate:
+            with engine.connect() as conn:
+                duplicate = conn.execute(CHECKED_IN_QUERY, {"eid": eid, "day": today}).first() is not None
+        with self._cond:
+            duplicate = duplicate or eid in self._accepted  # a concurrent request of this process
+            if duplicate:
+                self._metrics["rejected"] += 1
+                raise HTTPException(status_code=400, detail="Already checked in today")
+            self._accepted.add(eid)
+        self.submit(row)
+
+        return {
+            "message": "Check-in accepted",
+            "check_in_time": str(now),
+            "date": str(today),
+            "buffered": True
+        }
+
+
+checkin_buffer = CheckInBuffer(
+    flush_interval_ms=CHECKIN_BUFFER_FLUSH_MS,
+    max_rows=CHECKIN_BUFFER_MAX_ROWS,
+)
@@ -0,0 +1,31 @@
+import os
+from starlette.middleware.gzip import GZipMiddleware
+
+# "gzip" (default), "brotli" (needs the optional `brotli-asgi` package; falls
+# back to gzip for clients that don't accept br) or "none"
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "gzip")
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))  # smaller bodies aren't worth the CPU
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+# Never buffer/compress the live feed; each SSE event must reach the client as sent
+UNCOMPRESSED_PATHS = [r"^/events/"]
+
+
+def add_compression(app):
+    """Compress responses above COMPRESSION_MIN_BYTES for clients that accept it."""
+    if RESPONSE_COMPRESSION == "none":
+        return
+    if RESPONSE_COMPRESSION == "brotli":
+        try:
+            from brotli_asgi import BrotliMiddleware
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_COMPRESSION=brotli but the 'brotli-asgi' package is not installed") from e
+        app.add_middleware(
+            BrotliMiddleware,
+            quality=min(COMPRESSION_LEVEL, 11),
+            minimum_size=COMPRESSION_MIN_BYTES,
+            gzip_fallback=True,
+            excluded_handlers=UNCOMPRESSED_PATHS,
+        )
+        return
+    # Starlette's GZip passes text/event-stream through untouched
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES, compresslevel=COMPRESSION_LEVEL)
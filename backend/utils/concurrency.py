@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from fastapi import HTTPException
+from sqlalchemy import inspect, update, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+# Allowed status changes (current -> new). Re-deciding to the same status is
+# not a transition: two approvers approving the same record is a conflict.
+LEAVE_TRANSITIONS = {
+    "Pending": ("Approved", "Rejected"),
+    "Approved": ("Rejected",),   # revoke; the balance is credited back
+    "Rejected": ("Approved",),
+}
+PAYROLL_TRANSITIONS = {
+    "Pending": ("Approved", "Rejected"),
+    "Approved": ("Paid", "Rejected"),
+    "Rejected": ("Approved",),
+    "Paid": (),
+}
+
+CONFLICT_DETAIL = "Record was changed by someone else. Reload it and try again."
+
+
+def conflict(detail: str = CONFLICT_DETAIL) -> HTTPException:
+    return HTTPException(status_code=409, detail=detail)
+
+
+def sources(transitions: dict, status: str) -> list[str]:
+    """Statuses a record may move to `status` from."""
+    return [current for current, targets in transitions.items() if status in targets]
+
+
+def can_transition(transitions: dict, current: str | None, status: str) -> bool:
+    return status in transitions.get(current or "Pending", ())
+
+
+def check_transition(transitions: dict, current: str | None, status: str | None, entity: str):
+    """400 for an unknown status, 409 when the record's current status can't move to it."""
+    if status not in transitions:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(transitions)}")
+    if not can_transition(transitions, current, status):
+        raise conflict(f"{entity} is {current or 'Pending'}; it cannot be changed to {status}")
+
+
+def check_version(record, expected: int | None):
+    """409 when the client's copy (the version it read) is out of date."""
+    if expected is not None and record.version != expected:
+        raise conflict()
+
+
+@contextmanager
+def detect_conflicts():
+    """Turn a lost compare-and-set on flush (mapper `version_id_col`) into a 409.
+
+        with detect_conflicts(), unit_of_work(db):
+            record.status = "Approved"
+    """
+    try:
+        yield
+    except StaleDataError:
+        raise conflict()
+
+
+def compare_and_set(db: Session, model, expected: dict, transitions: dict, **values) -> int:
+    """One UPDATE for many rows read earlier in this transaction.
+
+    `expected` maps primary key -> version as read. The statement only matches
+    rows whose (id, version) pair is unchanged and whose status may still move
+    to `values["status"]`, and bumps their version. No row locks are taken
+    before the write; if any row changed in between, the whole transaction
+    (including the caller's earlier writes) is rolled back and 409 raised.
+    """
+    if not expected:
+        return 0
+    key = inspect(model).primary_key[0]
+    result = db.execute(
+        update(model)
+        .where(
+            tuple_(key, model.version).in_(list(expected.items())),
+            model.status.in_(sources(transitions, values["status"])),
+        )
+        .values(**values, version=model.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(expected):
+        db.rollback()
+        raise conflict("Some records were changed by someone else. Nothing was updated; reload and try again.")
+    return result.rowcount
@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from models.user_model import User
 from models.company_model import Company
@@ -21,11 +22,10 @@ def generate_eid(db: Session, company_id: int, full_name: str, date_of_joining:
 
     # 5) Count how many users joined in this year
     existing_count = (
-        db.query(User)
-        .filter(User.date_of_joining != None)
-        .filter(User.date_of_joining >= datetime(year, 1, 1))
-        .filter(User.date_of_joining <= datetime(year, 12, 31))
-        .count()
+        db.query(func.count())
+        .select_from(User)
+        .filter(User.join_year == year)  # indexed generated column
+        .scalar()
     )
 
     # 6) Serial number (4 digits)
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime
+
+# Set to e.g. redis://localhost:6379/0 to share events between uvicorn workers
+EVENT_BUS_REDIS_URL = os.getenv("EVENT_BUS_REDIS_URL")
+SUBSCRIBER_QUEUE_SIZE = 1000  # per open stream; a slow client drops events beyond this
+
+
+class LocalBackend:
+    """Deliver events to subscribers in this process only."""
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, channel: str, message: str):
+        self._deliver(channel, message)
+
+    def stop(self):
+        pass
+
+
+class RedisBackend:
+    """Relay events through Redis pub/sub so every worker sees every event.
+
+    Needs the optional `redis` package.
+    """
+
+    CHANNEL_PREFIX = "workzen:events:"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("EVENT_BUS_REDIS_URL is set but the 'redis' package is not installed") from e
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._thread = None
+
+    def start(self, deliver):
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(self.CHANNEL_PREFIX + "*")
+
+        def listen():
+            for item in self._pubsub.listen():
+                channel = item["channel"].decode()[len(self.CHANNEL_PREFIX):]
+                deliver(channel, item["data"].decode())
+
+        self._thread = threading.Thread(target=listen, name="event-bus-redis", daemon=True)
+        self._thread.start()
+
+    def publish(self, channel: str, message: str):
+        self._client.publish(self.CHANNEL_PREFIX + channel, message)
+
+    def stop(self):
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+
+class EventBus:
+    """Per-company pub/sub used by the SSE feed.
+
+    Controllers run in FastAPI's threadpool and call `publish` after their
+    commit; each open stream owns an asyncio.Queue on the event loop, filled
+    through `call_soon_threadsafe`.
+    """
+
+    def __init__(self, backend=None):
+        self._subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.set_backend(backend or LocalBackend())
+
+    def set_backend(self, backend):
+        self.backend = backend
+        self.backend.start(self._deliver)
+
+    def stop(self):
+        self.backend.stop()
+
+    def subscribe(self, company_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(str(company_id), set()).add(entry)
+        return queue
+
+    def unsubscribe(self, company_id: int, queue: asyncio.Queue):
+        with self._lock:
+            entries = self._subscribers.get(str(company_id), set())
+            for entry in [e for e in entries if e[1] is queue]:
+                entries.discard(entry)
+            if not entries:
+                self._subscribers.pop(str(company_id), None)
+
+    def subscriber_count(self, company_id: int) -> int:
+        with self._lock:
+            return len(self._subscribers.get(str(company_id), ()))
+
+    def publish(self, company_id: int, event_type: str, data: dict):
+        message = json.dumps(
+            {"type": event_type, "company_id": company_id, "data": data, "ts": datetime.now().isoformat()},
+            default=str,
+        )
+        try:
+            self.backend.publish(str(company_id), message)
+        except Exception as e:
+            # The live feed is best-effort; never fail the write that triggered it
+            print("[event_bus] Publish failed:", e)
+
+    def _deliver(self, channel: str, message: str):
+        with self._lock:
+            entries = list(self._subscribers.get(channel, ()))
+        for loop, queue in entries:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, message)
+            except RuntimeError:
+                pass  # loop already closed
+
+    def _put(self, queue: asyncio.Queue, message: str):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+
+event_bus = EventBus(RedisBackend(EVENT_BUS_REDIS_URL) if EVENT_BUS_REDIS_URL else None)
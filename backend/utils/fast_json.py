@@ -0,0 +1,72 @@
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import inspect
+from config.database import engine
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_ROWS = 1000  # rows fetched from the server-side cursor (and written) per chunk
+
+# Fast path for large lists: select only the columns a response schema needs,
+# get plain dicts back from the driver and encode them with orjson. Returning a
+# Response from a route skips the per-row pydantic validation of response_model
+# (the model still documents the shape in OpenAPI).
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson (dates, times and datetimes natively)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class NDJSONResponse(StreamingResponse):
+    media_type = NDJSON_MEDIA_TYPE
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def stream_rows(query, batch_rows: int = STREAM_BATCH_ROWS):
+    """Yield one JSON line per row of `query`, fetched through a server-side cursor.
+
+    Runs on its own connection: the request's session is closed before a
+    streaming body is sent. Memory stays at one batch however large the result.
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_rows).execute(query)
+        for rows in result.mappings().partitions():
+            yield b"".join(orjson.dumps(dict(row), option=orjson.OPT_NON_STR_KEYS) + b"\n" for row in rows)
+
+
+def parse_fields(raw: str | None, schema) -> tuple[str, ...] | None:
+    """`?fields=date,status` -> ("date", "status"); None (all fields) when not given."""
+    if not raw:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    return names or None
+
+
+def wants(fields: tuple[str, ...] | None, name: str) -> bool:
+    return fields is None or name in fields
+
+
+def projection(model, schema, exclude: tuple[str, ...] = (), fields: tuple[str, ...] | None = None) -> list:
+    """Columns of `model` named like fields of `schema`, in the schema's field order.
+
+    `fields` narrows the SELECT itself to a sparse fieldset (see parse_fields).
+    """
+    columns = inspect(model).columns
+    return [
+        getattr(model, name)
+        for name in schema.model_fields
+        if name in columns and name not in exclude and wants(fields, name)
+    ]
+
+
+def as_dicts(result) -> list[dict]:
+    return [dict(row) for row in result.mappings()]
@@ -0,0 +1,126 @@
+from fastapi import HTTPException
+from sqlalchemy import select, insert, delete, literal, Integer
+from sqlalchemy.orm import Session, aliased
+from models.hierarchy_model import UserHierarchy
+from models.user_model import User
+
+# NOTE: user_hierarchy is kept in the same transaction as the manager_id
+# change that caused it, so "whole org under X" is always a single join.
+
+
+def org_members(manager_eid: str, include_self: bool = False, max_depth: int | None = None):
+    """SELECT of the eids under `manager_eid` (all levels), for IN / JOIN."""
+    stmt = select(UserHierarchy.descendant).where(
+        UserHierarchy.ancestor == manager_eid,
+        UserHierarchy.depth >= (0 if include_self else 1),
+    )
+    if max_depth is not None:
+        stmt = stmt.where(UserHierarchy.depth <= max_depth)
+    return stmt
+
+
+def in_org(eid_column, manager_eid: str, include_self: bool = False):
+    """Filter condition scoping any query with an eid column to a manager's org.
+
+        db.query(Attendance).filter(in_org(Attendance.eid, "E1"))
+    """
+    return eid_column.in_(org_members(manager_eid, include_self))
+
+
+def add_to_hierarchy(db: Session, eid: str, company_id: int, manager_id: str | None):
+    """Link a new user: a self row plus one row per ancestor of the manager."""
+    db.execute(insert(UserHierarchy).values(ancestor=eid, descendant=eid, depth=0, company_id=company_id))
+    if manager_id:
+        db.execute(
+            insert(UserHierarchy).from_select(
+                ["ancestor", "descendant", "depth", "company_id"],
+                select(
+                    UserHierarchy.ancestor,
+                    literal(eid),
+                    UserHierarchy.depth + 1,
+                    literal(company_id, Integer),
+                ).where(UserHierarchy.descendant == manager_id),
+            )
+        )
+
+
+def validate_manager(db: Session, eid: str | None, company_id: int, manager_id: str):
+    """The manager must exist in the same company and must not report to `eid`."""
+    manager = db.query(User).filter(User.eid == manager_id).first()
+    if not manager or manager.company_id != company_id:
+        raise HTTPException(status_code=400, detail="Manager not found in this company")
+    if eid and (manager_id == eid or db.execute(
+        select(UserHierarchy.depth).where(UserHierarchy.ancestor == eid, UserHierarchy.descendant == manager_id)
+    ).first()):
+        raise HTTPException(status_code=400, detail="Manager cannot be the employee or one of their reports")
+
+
+def move_subtree(db: Session, eid: str, company_id: int, new_manager_id: str | None):
+    """Re-attach `eid` and everyone under it below `new_manager_id` (None = top level).
+
+    Links from the old ancestors into the subtree are dropped and links from the
+    new manager's ancestors are added; links inside the subtree stay as they are.
+    """
+    subtree = db.execute(select(UserHierarchy.descendant).where(UserHierarchy.ancestor == eid)).scalars().all()
+    if not subtree:
+        # Not in the closure table yet (e.g. created before it existed)
+        add_to_hierarchy(db, eid, company_id, new_manager_id)
+        return
+    old_ancestors = db.execute(
+        select(UserHierarchy.ancestor).where(UserHierarchy.descendant == eid, UserHierarchy.depth > 0)
+    ).scalars().all()
+    if old_ancestors:
+        db.execute(
+            delete(UserHierarchy).where(
+                UserHierarchy.ancestor.in_(old_ancestors),
+                UserHierarchy.descendant.in_(subtree),
+            )
+        )
+    if new_manager_id:
+        above = aliased(UserHierarchy)
+        below = aliased(UserHierarchy)
+        db.execute(
+            insert(UserHierarchy).from_select(
+                ["ancestor", "descendant", "depth", "company_id"],
+                select(
+                    above.ancestor,
+                    below.descendant,
+                    above.depth + below.depth + 1,
+                    literal(company_id, Integer),
+                )
+                .select_from(above)
+                .join(below, below.ancestor == eid)
+                .where(above.descendant == new_manager_id),
+            )
+        )
+
+
+def rebuild_hierarchy(db: Session, company_id: int) -> dict:
+    """Recompute a company's closure rows from user.manager_id (repair/backfill tool).
+
+    Employees whose chain of managers loops are left at the top level and reported.
+    """
+    managers = dict(db.execute(select(User.eid, User.manager_id).where(User.company_id == company_id)).all())
+    rows = []
+    cycles = []
+    for eid in managers:
+        rows.append({"ancestor": eid, "descendant": eid, "depth": 0, "company_id": company_id})
+        chain = []
+        ancestor = managers.get(eid)
+        while ancestor and ancestor in managers:
+            if ancestor == eid or ancestor in chain:
+                cycles.append(eid)
+                chain = []
+                break
+            chain.append(ancestor)
+            ancestor = managers.get(ancestor)
+        rows.extend(
+            {"ancestor": a, "descendant": eid, "depth": depth, "company_id": company_id}
+            for depth, a in enumerate(chain, start=1)
+        )
+
+    db.execute(delete(UserHierarchy).where(UserHierarchy.company_id == company_id))
+    if rows:
+        db.execute(insert(UserHierarchy), rows)
+    db.commit()
+    return {"company_id": company_id, "employees": len(managers), "links": len(rows), "cycles": sorted(cycles)}
@@ -32,6 +32,10 @@ def _matches(current: str, allowed: list[str]) -> bool:
     allowed_norm = {_normalize(r) for r in allowed}
     return current_norm in allowed_norm
 
+def has_role(user, roles: list[str]) -> bool:
+    """True if the user's role is one of `roles` (same normalization as role_required)."""
+    return _matches(getattr(getattr(user, "role", None), "name", None), roles)
+
 # ---------------------------------------------------------------------------
 # Generic decorator for role requirements
 # ---------------------------------------------------------------------------
@@ -0,0 +1,183 @@
+import csv
+import gzip
+from datetime import date, datetime, timedelta
+from time import perf_counter
+from typing import Iterable, Iterator
+from sqlalchemy import select, func, case
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from models.attendance_model import Attendance
+from models.user_model import User
+from controllers.attendance_controller import calculate_worked_hours, worked_hours_sql
+from utils.shift_engine import invalidate_month
+
+# Punch logs from the door terminals: one "eid,timestamp,device" line per punch,
+# timestamp in ISO format ("2025-01-06 09:01:22" or "2025-01-06T09:01:22").
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_DEDUPE_SECONDS = 60      # repeated taps within this window count once
+DEFAULT_MAX_OPEN_GROUPS = 50000  # (eid, day) pairs held in memory before an early flush
+UNKNOWN_EID_SAMPLE = 20
+
+
+def open_punch_log(path: str):
+    """Open a punch log for lazy line-by-line reading (plain text or .gz)."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def parse_punches(lines: Iterable[str], report: dict) -> Iterator[tuple[str, datetime, str]]:
+    """Yield (eid, timestamp, device) per punch; malformed lines are counted, not raised."""
+    for row in csv.reader(lines):
+        report["lines"] += 1
+        if not row or not row[0].strip():
+            continue
+        if report["lines"] == 1 and row[0].strip().lower() == "eid":
+            continue  # header
+        try:
+            eid = row[0].strip()
+            ts = datetime.fromisoformat(row[1].strip())
+        except (IndexError, ValueError):
+            report["malformed"] += 1
+            continue
+        device = row[2].strip() if len(row) > 2 else ""
+        report["punches"] += 1
+        yield eid, ts, device
+
+
+def _attendance_row(company_id: int, eid: str, day, first: datetime, last: datetime) -> dict:
+    """First punch is the check-in, last punch the check-out (if different)."""
+    check_in = first.time()
+    check_out = last.time() if last > first else None
+    worked_hours = calculate_worked_hours(day, check_in, check_out) if check_out else 0.0
+    return {
+        "eid": eid,
+        "company_id": company_id,
+        "date": day,
+        "check_in": check_in,
+        "check_out": check_out,
+        "worked_hours": worked_hours,
+        "status": "Completed" if check_out else "Present",
+        "approved": True,
+    }
+
+
+def _upsert_statement(rows: list[dict]):
+    """Multi-row INSERT that merges with an existing (eid, date) row.
+
+    Every punch on either side is a candidate: the earliest becomes the
+    check-in and the latest the check-out (unless it is the check-in itself).
+    A single punch, stored or incoming, thus still closes an open day, so app
+    check-ins, earlier imports, groups flushed early and re-imports of the same
+    file all converge.
+
+    MySQL evaluates the assignments left to right: check_out is assigned first,
+    while `check_in` still holds the stored value, and worked_hours/status then
+    see the merged times.
+    """
+    stmt = mysql_insert(Attendance).values(rows)
+    new = stmt.inserted
+    earliest = func.least(func.coalesce(Attendance.check_in, new.check_in), new.check_in)
+    latest = func.greatest(
+        func.coalesce(Attendance.check_out, Attendance.check_in, new.check_in),
+        func.coalesce(new.check_out, new.check_in),
+    )
+    return stmt.on_duplicate_key_update([
+        ("check_out", case((latest > earliest, latest), else_=None)),
+        ("check_in", earliest),
+        ("worked_hours", case(
+            (Attendance.check_out.is_(None), 0.0),
+            else_=worked_hours_sql(Attendance.check_in, Attendance.check_out),
+        )),
+        ("status", case(
+            (Attendance.check_out.is_(None), "Present"),
+            else_="Completed",
+        )),
+        # ON DUPLICATE KEY UPDATE skips Column.onupdate, so bump it explicitly
+        ("updated_at", func.now()),
+    ])
+
+
+def import_punch_log(
+    db: Session,
+    company_id: int,
+    lines: Iterable[str],
+    source: str = "<stream>",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dedupe_seconds: int = DEFAULT_DEDUPE_SECONDS,
+    max_open_groups: int = DEFAULT_MAX_OPEN_GROUPS,
+) -> dict:
+    """Stream a punch log into `attendances` and return a per-file report.
+
+    Memory is bounded by the number of open (eid, day) groups, not by the
+    number of punches: groups are upserted in batches whenever
+    `max_open_groups` is reached and once more at the end. Because the upsert
+    merges first-in/last-out with whatever is already stored, a group that is
+    flushed early and reappears later still ends up correct.
+    """
+    started = perf_counter()
+    report = {
+        "source": source,
+        "company_id": company_id,
+        "lines": 0,
+        "punches": 0,
+        "malformed": 0,
+        "duplicates": 0,
+        "unknown_employees": 0,
+        "unknown_eid_sample": [],
+        "days": 0,
+        "attendance_rows": 0,
+        "batches": 0,
+    }
+
+    employees = set(db.execute(select(User.eid).where(User.company_id == company_id)).scalars())
+    window = timedelta(seconds=dedupe_seconds)
+    unknown: set[str] = set()
+    days: set = set()
+    # (eid, day) -> [first punch, last punch]
+    groups: dict[tuple[str, object], list[datetime]] = {}
+
+    def flush():
+        if not groups:
+            return
+        rows = [_attendance_row(company_id, eid, day, first, last) for (eid, day), (first, last) in groups.items()]
+        groups.clear()
+        for i in range(0, len(rows), batch_size):
+            db.execute(_upsert_statement(rows[i:i + batch_size]))
+            report["batches"] += 1
+        db.commit()
+        report["attendance_rows"] += len(rows)
+
+    for eid, ts, _device in parse_punches(lines, report):
+        if eid not in employees:
+            report["unknown_employees"] += 1
+            if eid not in unknown and len(unknown) < UNKNOWN_EID_SAMPLE:
+                unknown.add(eid)
+            continue
+
+        key = (eid, ts.date())
+        group = groups.get(key)
+        if group is None:
+            if len(groups) >= max_open_groups:
+                flush()
+            groups[key] = [ts, ts]
+            days.add(key[1])
+            continue
+
+        first, last = group
+        if abs(ts - last) < window or abs(ts - first) < window:
+            report["duplicates"] += 1
+            continue
+        if ts < first:
+            group[0] = ts
+        elif ts > last:
+            group[1] = ts
+
+    flush()
+    for month in {(day.year, day.month) for day in days}:
+        invalidate_month(company_id, date(*month, 1))
+
+    report["unknown_eid_sample"] = sorted(unknown)
+    report["days"] = len(days)
+    report["elapsed_seconds"] = round(perf_counter() - started, 3)
+    return report
@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from fastapi import HTTPException
+
+# Login attempts: a burst of `capacity`, then `refill_per_second` sustained
+LOGIN_IP_CAPACITY = int(os.getenv("LOGIN_IP_CAPACITY", "20"))
+LOGIN_IP_REFILL_PER_SECOND = float(os.getenv("LOGIN_IP_REFILL_PER_SECOND", "1"))
+LOGIN_EID_CAPACITY = int(os.getenv("LOGIN_EID_CAPACITY", "5"))
+LOGIN_EID_REFILL_PER_SECOND = float(os.getenv("LOGIN_EID_REFILL_PER_SECOND", str(1 / 30)))
+# bcrypt is CPU-bound; never run more hashes at once than there are cores
+HASHING_CONCURRENCY = int(os.getenv("HASHING_CONCURRENCY", str(os.cpu_count() or 1)))
+HASHING_WAIT_SECONDS = float(os.getenv("HASHING_WAIT_SECONDS", "0.05"))
+# Share buckets between workers, e.g. redis://localhost:6379/0 (requires `redis`)
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+
+MAX_TRACKED_KEYS = 100000
+
+
+class InMemoryBucketBackend:
+    """Token buckets kept in this process (per worker)."""
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float, float]] = {}  # key -> (tokens, updated_at, full_at)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, refill_per_second: float, cost: float = 1.0) -> float:
+        """Spend `cost` tokens; return 0 when allowed, else seconds until it would be.
+
+        `cost=0` spends nothing and only checks that a whole token is left.
+        """
+        now = time.monotonic()
+        need = max(cost, 1.0)
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            retry_after = 0.0
+            if tokens >= need:
+                tokens -= cost
+            else:
+                retry_after = (need - tokens) / refill_per_second
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_second)
+            if len(self._buckets) > MAX_TRACKED_KEYS:
+                self._prune(now)
+            return retry_after
+
+    def _prune(self, now: float):
+        # A bucket that has refilled completely carries no state worth keeping
+        for key in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+
+class RedisBucketBackend:
+    """Token buckets shared by all workers through Redis (atomic Lua script)."""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[4])
+    local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local need = math.max(cost, 1)
+    local retry_after = 0
+    if tokens >= need then
+        tokens = tokens - cost
+    else
+        retry_after = (need - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(retry_after)
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the 'redis' package is not installed") from e
+        self._script = redis.Redis.from_url(url).register_script(self.SCRIPT)
+
+    def take(self, key: str, capacity: int, refill_per_second: float, cost: float = 1.0) -> float:
+        result = self._script(keys=["workzen:ratelimit:" + key], args=[capacity, refill_per_second, time.time(), cost])
+        return float(result)
+
+
+class LimiterStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {}
+
+    def incr(self, name: str):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+
+limiter_stats = LimiterStats()
+bucket_backend = RedisBucketBackend(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else InMemoryBucketBackend()
+
+
+def set_bucket_backend(backend):
+    global bucket_backend
+    bucket_backend = backend
+
+
+def _too_many(retry_after: float, detail: str):
+    return HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+    )
+
+
+class TokenBucketLimiter:
+    def __init__(self, name: str, capacity: int, refill_per_second: float):
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+
+    def check(self, key: str):
+        """Raise 429 with Retry-After when `key` has no tokens left."""
+        retry_after = bucket_backend.take(f"{self.name}:{key}", self.capacity, self.refill_per_second)
+        if retry_after > 0:
+            limiter_stats.incr(f"{self.name}.throttled")
+            raise _too_many(retry_after, "Too many login attempts. Try again later.")
+        limiter_stats.incr(f"{self.name}.allowed")
+
+    def peek(self, key: str):
+        """Like check, but spends nothing (pair with `charge` to count only failures)."""
+        retry_after = bucket_backend.take(f"{self.name}:{key}", self.capacity, self.refill_per_second, cost=0)
+        if retry_after > 0:
+            limiter_stats.incr(f"{self.name}.throttled")
+            raise _too_many(retry_after, "Too many login attempts. Try again later.")
+
+    def charge(self, key: str):
+        """Spend a token without raising; the next peek/check sees the empty bucket."""
+        bucket_backend.take(f"{self.name}:{key}", self.capacity, self.refill_per_second)
+        limiter_stats.incr(f"{self.name}.charged")
+
+
+class HashingGate:
+    """Global cap on concurrent password hashing; excess work fails fast with 429."""
+
+    def __init__(self, concurrency: int, wait_seconds: float):
+        self.concurrency = concurrency
+        self.wait_seconds = wait_seconds
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        if not self._semaphore.acquire(timeout=self.wait_seconds):
+            limiter_stats.incr("hashing.rejected")
+            raise _too_many(1, "Server busy. Try again shortly.")
+        with self._lock:
+            self._in_flight += 1
+        limiter_stats.incr("hashing.admitted")
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._semaphore.release()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+
+login_ip_limiter = TokenBucketLimiter("login_ip", LOGIN_IP_CAPACITY, LOGIN_IP_REFILL_PER_SECOND)
+login_eid_limiter = TokenBucketLimiter("login_eid", LOGIN_EID_CAPACITY, LOGIN_EID_REFILL_PER_SECOND)
+hashing_gate = HashingGate(HASHING_CONCURRENCY, HASHING_WAIT_SECONDS)
+
+
+def get_limiter_metrics() -> dict:
+    return {
+        "counters": limiter_stats.snapshot(),
+        "hashing_in_flight": hashing_gate.in_flight,
+        "hashing_concurrency": hashing_gate.concurrency,
+        "backend": type(bucket_backend).__name__,
+    }
@@ -0,0 +1,309 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from heapq import merge
+from time import monotonic
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from config.database import engine
+from models.user_model import User
+
+# In-process prefix index over employees, one per company, built on first use.
+# ORM writes to User update it after commit; a periodic rebuild picks up
+# anything written around the ORM (raw SQL, other workers).
+SEARCH_INDEX_TTL = 600     # seconds before a company's index is rebuilt from the DB
+SEARCH_MAX_LIMIT = 50
+SEARCH_MIN_PREFIX = 2      # a one-letter prefix matches most of the company
+SEARCH_MAX_SCAN = 2000     # candidates examined per query; bounds latency of very broad prefixes
+BROAD_PREFIX_TOKENS = 256  # above this many tokens a prefix's ranking is computed once and cached
+
+# Field -> weight; a whole-token match counts double
+FIELD_WEIGHTS = {
+    "eid": 5,
+    "name": 4,
+    "personal_email": 2,
+    "company_email": 2,
+    "department": 1,
+    "position": 1,
+}
+RESULT_FIELDS = ("eid", "name", "department", "position", "company_email", "status")
+TOUCHED_KEY = "search_index_touched"
+
+_SPLIT = re.compile(r"[^\w]+|_")
+EMAIL_FIELDS = {"personal_email", "company_email"}
+MAX_EXACT_SCORE = 2 * max(FIELD_WEIGHTS.values())
+
+
+def tokenize(text: str | None) -> set[str]:
+    """Words of a field plus the whole value (so "human res" and "ann@ex" match)."""
+    if not text:
+        return set()
+    text = text.lower()
+    return {t for t in _SPLIT.split(text) if t} | {text}
+
+
+def _field_tokens(field: str, value: str | None) -> set[str]:
+    if value and field in EMAIL_FIELDS:
+        # Domain parts ("gmail", "com") would match everyone; keep the local part and the address
+        return tokenize(value.split("@")[0]) | {value.lower()}
+    return tokenize(value)
+
+
+class CompanyIndex:
+    """Sorted token list + ranked postings for one company.
+
+    postings[token] is a list of (-weight, name, eid) kept sorted, so the best
+    matches of a prefix come out first when the tokens in its range are merged.
+    """
+
+    def __init__(self, users: list[dict]):
+        self.built_at = monotonic()
+        self.lock = threading.Lock()
+        self.postings: dict[str, list[tuple[int, str, str]]] = {}
+        self.docs: dict[str, tuple[dict[str, int], dict]] = {}
+        self.broad: dict[str, list[tuple[int, str, str]]] = {}  # e.g. "ac" = every eid of company AC
+        for user in users:
+            self._add(user, sort=False)
+        for posting in self.postings.values():
+            posting.sort()
+        self.tokens: list[str] = sorted(self.postings)
+
+    @staticmethod
+    def _doc_tokens(user: dict) -> dict[str, int]:
+        weights: dict[str, int] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in _field_tokens(field, user.get(field)):
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+        return weights
+
+    def _add(self, user: dict, sort: bool = True):
+        weights = self._doc_tokens(user)
+        name = (user.get("name") or "").lower()
+        self.docs[user["eid"]] = (weights, {f: user.get(f) for f in RESULT_FIELDS})
+        for token, weight in weights.items():
+            entry = (-weight, name, user["eid"])
+            posting = self.postings.get(token)
+            if posting is None:
+                self.postings[token] = [entry]
+                if sort:
+                    insort(self.tokens, token)
+            elif sort:
+                insort(posting, entry)
+            else:
+                posting.append(entry)
+
+    def _remove(self, eid: str):
+        doc = self.docs.pop(eid, None)
+        if doc is None:
+            return
+        weights, display = doc
+        name = (display.get("name") or "").lower()
+        for token, weight in weights.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            entry = (-weight, name, eid)
+            i = bisect_left(posting, entry)
+            if i < len(posting) and posting[i] == entry:
+                del posting[i]
+            if not posting:
+                del self.postings[token]
+                i = bisect_left(self.tokens, token)
+                if i < len(self.tokens) and self.tokens[i] == token:
+                    del self.tokens[i]
+
+    def upsert(self, user: dict):
+        with self.lock:
+            self._remove(user["eid"])
+            self._add(user)
+            self.broad.clear()
+
+    def delete(self, eid: str):
+        with self.lock:
+            self._remove(eid)
+            self.broad.clear()
+
+    def _range(self, term: str) -> tuple[int, int]:
+        return bisect_left(self.tokens, term), bisect_left(self.tokens, term + "\uffff")
+
+    def _width(self, term: str) -> int:
+        lo, hi = self._range(term)
+        return hi - lo
+
+    def _term_scores(self, term: str) -> dict[str, int]:
+        """eid -> best score of any token starting with `term`."""
+        scores: dict[str, int] = {}
+        lo, hi = self._range(term)
+        for token in self.tokens[lo:hi]:
+            exact = 2 if token == term else 1
+            for weight, _, eid in self.postings[token]:
+                score = -weight * exact
+                if scores.get(eid, 0) < score:
+                    scores[eid] = score
+        return scores
+
+    def _ranked(self, term: str):
+        """(score, name, eid) for every doc matching `term`, best first, each eid once."""
+        lo, hi = self._range(term)
+        if hi - lo > BROAD_PREFIX_TOKENS:
+            ranked = self.broad.get(term)
+            if ranked is None:
+                ranked = self.broad[term] = self._rank_broad(term, lo, hi)
+            yield from ranked
+            return
+        streams = []
+        for token in self.tokens[lo:hi]:
+            exact = 2 if token == term else 1
+            streams.append(((weight * exact, name, eid) for weight, name, eid in self.postings[token]))
+        seen = set()
+        for neg_score, name, eid in merge(*streams):
+            if eid not in seen:
+                seen.add(eid)
+                yield -neg_score, name, eid
+
+    def _rank_broad(self, term: str, lo: int, hi: int) -> list[tuple[int, str, str]]:
+        """One flat sort instead of merging thousands of postings; kept until the next write."""
+        entries = [
+            (weight * (2 if token == term else 1), name, eid)
+            for token in self.tokens[lo:hi]
+            for weight, name, eid in self.postings[token]
+        ]
+        entries.sort()
+        ranked, seen = [], set()
+        for neg_score, name, eid in entries:
+            if eid not in seen:
+                seen.add(eid)
+                ranked.append((-neg_score, name, eid))
+                if len(ranked) >= SEARCH_MAX_SCAN:
+                    break
+        return ranked
+
+    @staticmethod
+    def _doc_score(weights: dict[str, int], term: str) -> int:
+        best = 0
+        for token, weight in weights.items():
+            if token.startswith(term):
+                best = max(best, weight * (2 if token == term else 1))
+        return best
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        # Whitespace-separated prefixes; "ann@ex" still matches the whole e-mail token
+        terms = list(set(query.lower().split()))
+        if not terms:
+            return []
+        with self.lock:
+            # Drive from the term with the fewest matching tokens; check the rest per candidate
+            terms.sort(key=self._width)
+            terms.sort(key=lambda t: len(t) < SEARCH_MIN_PREFIX)
+            first, rest = terms[0], terms[1:]
+            if len(first) < SEARCH_MIN_PREFIX:
+                return []
+            # Narrow ranges: score every match once; broad ones: check each candidate's own tokens
+            rest_scores = [
+                (term, self._term_scores(term) if self._width(term) <= BROAD_PREFIX_TOKENS else None)
+                for term in rest
+            ]
+            results: list[tuple[int, str, str]] = []  # (-total, name, eid), best first
+            for scanned, (score, name, eid) in enumerate(self._ranked(first)):
+                if scanned >= SEARCH_MAX_SCAN:
+                    break
+                # Threshold stop: later candidates can't beat the current k-th result
+                if len(results) >= limit and score + MAX_EXACT_SCORE * len(rest) <= -results[-1][0]:
+                    break
+                total = score
+                for term, term_scores in rest_scores:
+                    if term_scores is not None:
+                        extra = term_scores.get(eid, 0)
+                    else:
+                        extra = self._doc_score(self.docs[eid][0], term)
+                    if not extra:
+                        break
+                    total += extra
+                else:
+                    if len(results) < limit or (-total, name) < results[-1][:2]:
+                        insort(results, (-total, name, eid))
+                        del results[limit:]
+            return [{**self.docs[eid][1], "score": -neg_total} for neg_total, _, eid in results]
+
+
+class SearchIndex:
+    def __init__(self):
+        self._companies: dict[int, CompanyIndex] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, company_id: int) -> CompanyIndex:
+        columns = [getattr(User, f) for f in dict.fromkeys((*FIELD_WEIGHTS, *RESULT_FIELDS))]
+        with engine.connect() as conn:
+            rows = conn.execute(select(*columns).where(User.company_id == company_id)).mappings().all()
+        index = CompanyIndex([dict(row) for row in rows])
+        with self._lock:
+            self._companies[company_id] = index
+        return index
+
+    def company(self, company_id: int) -> CompanyIndex:
+        with self._lock:
+            index = self._companies.get(company_id)
+        if index is None or monotonic() - index.built_at > SEARCH_INDEX_TTL:
+            index = self._load(company_id)
+        return index
+
+    def search(self, company_id: int, query: str, limit: int = 10) -> list[dict]:
+        return self.company(company_id).search(query, max(1, min(limit, SEARCH_MAX_LIMIT)))
+
+    def apply(self, changes: list[tuple[str, int, dict]]):
+        """Apply committed User writes to the indexes that are loaded."""
+        with self._lock:
+            loaded = dict(self._companies)
+        for op, company_id, user in changes:
+            index = loaded.get(company_id)
+            if index is None:
+                continue  # built fresh on first search
+            if op == "delete":
+                index.delete(user["eid"])
+            else:
+                index.upsert(user)
+
+    def invalidate(self, company_id: int | None = None):
+        with self._lock:
+            if company_id is None:
+                self._companies.clear()
+            else:
+                self._companies.pop(company_id, None)
+
+
+search_index = SearchIndex()
+
+
+def _snapshot(user: User) -> dict:
+    return {f: getattr(user, f) for f in dict.fromkeys((*FIELD_WEIGHTS, *RESULT_FIELDS))}
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_user_writes(session, flush_context):
+    # new/dirty/deleted still describe the flush here, and column defaults are filled in
+    touched = session.info.setdefault(TOUCHED_KEY, [])
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, User):
+            # Moved to another company: drop it from the old company's index too
+            for previous in inspect(obj).attrs.company_id.history.deleted:
+                if previous is not None and previous != obj.company_id:
+                    touched.append(("delete", previous, {"eid": obj.eid}))
+            touched.append(("upsert", obj.company_id, _snapshot(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            touched.append(("delete", obj.company_id, {"eid": obj.eid}))
+    if not touched:
+        session.info.pop(TOUCHED_KEY, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_user_writes(session):
+    touched = session.info.pop(TOUCHED_KEY, None)
+    if touched:
+        search_index.apply(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_writes(session):
+    session.info.pop(TOUCHED_KEY, None)
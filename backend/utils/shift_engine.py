@@ -0,0 +1,192 @@
+import threading
+from calendar import monthrange
+from datetime import date, time
+from time import monotonic, perf_counter
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from models.attendance_model import Attendance
+from models.shift_policy_model import ShiftPolicy
+
+POLICY_CACHE_TTL = 60     # seconds
+SUMMARY_CACHE_TTL = 300   # seconds; writes in this process invalidate the month earlier
+
+DEFAULT_POLICY = {
+    "shift_start": time(9, 0),
+    "shift_end": time(18, 0),
+    "grace_minutes": 10,
+    "break_minutes": 60,
+    "overtime_after_hours": 8.0,
+    "short_day_hours": 6.0,
+    "working_days": [0, 1, 2, 3, 4],
+}
+
+_policy_cache: dict[int, tuple[float, dict]] = {}
+_summary_cache: dict[tuple[int, int, int], tuple[float, dict]] = {}
+_lock = threading.Lock()
+
+
+def _policy_dict(policy: ShiftPolicy | None) -> dict:
+    if policy is None:
+        return {**DEFAULT_POLICY, "is_default": True}
+    return {
+        "shift_start": policy.shift_start,
+        "shift_end": policy.shift_end,
+        "grace_minutes": policy.grace_minutes,
+        "break_minutes": policy.break_minutes,
+        "overtime_after_hours": policy.overtime_after_hours,
+        "short_day_hours": policy.short_day_hours,
+        "working_days": [int(d) for d in policy.working_days.split(",") if d.strip()],
+        "is_default": False,
+    }
+
+
+def get_policy(db: Session, company_id: int) -> dict:
+    """The company's shift policy as a plain dict (defaults when none is configured)."""
+    now = monotonic()
+    with _lock:
+        cached = _policy_cache.get(company_id)
+    if cached and cached[0] > now:
+        return cached[1]
+    policy = _policy_dict(db.query(ShiftPolicy).filter(ShiftPolicy.company_id == company_id).first())
+    with _lock:
+        _policy_cache[company_id] = (now + POLICY_CACHE_TTL, policy)
+    return policy
+
+
+def invalidate_policy(company_id: int):
+    with _lock:
+        _policy_cache.pop(company_id, None)
+        for key in [k for k in _summary_cache if k[0] == company_id]:
+            del _summary_cache[key]
+
+
+def invalidate_month(company_id: int, day: date):
+    with _lock:
+        _summary_cache.pop((company_id, day.year, day.month), None)
+
+
+def day_overtime(policy: dict, day: date, worked_hours: float) -> float:
+    """One day's overtime by the same rule as evaluate_month (after the break)."""
+    net = max(worked_hours - policy["break_minutes"] / 60, 0.0)
+    if day.weekday() not in policy["working_days"]:
+        return round(net, 2)  # every hour on a non-working day
+    return round(max(net - policy["overtime_after_hours"], 0.0), 2)
+
+
+def _seconds(t: time) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def _load_month(db: Session, company_id: int, year: int, month: int):
+    """One query for the month; times come back as seconds so no per-row Python parsing."""
+    first = date(year, month, 1)
+    last = date(year, month, monthrange(year, month)[1])
+    rows = db.execute(
+        select(
+            Attendance.eid,
+            func.weekday(Attendance.date),  # MySQL: Monday = 0
+            func.time_to_sec(Attendance.check_in),
+            func.time_to_sec(Attendance.check_out),
+        )
+        .where(
+            Attendance.company_id == company_id,
+            Attendance.date >= first,
+            Attendance.date <= last,
+            Attendance.check_in.is_not(None),
+        )
+    ).all()
+    if not rows:
+        return None
+    eids, weekdays, check_ins, check_outs = zip(*rows)
+    # Factorise eids with a dict; much cheaper than np.unique on strings
+    positions: dict[str, int] = {}
+    idx = np.fromiter((positions.setdefault(e, len(positions)) for e in eids), dtype=np.int64, count=len(eids))
+    return (
+        list(positions),
+        idx,
+        np.array(weekdays, dtype=np.int8),
+        np.array(check_ins, dtype=np.float64),
+        np.array(check_outs, dtype=np.float64),  # NULL -> NaN (still checked in)
+    )
+
+
+def evaluate_month(policy: dict, employees: list[str], idx, weekdays, check_ins, check_outs) -> list[dict]:
+    """Vectorised policy evaluation over every attendance row of a month.
+
+    `idx[i]` is the position in `employees` of row i's employee.
+    """
+    n = len(employees)
+
+    has_out = ~np.isnan(check_outs)
+    working_day = np.isin(weekdays, policy["working_days"])
+
+    worked = np.where(has_out, (np.nan_to_num(check_outs) - check_ins) / 3600, 0.0)
+    net = np.where(has_out, np.maximum(worked - policy["break_minutes"] / 60, 0.0), 0.0)
+
+    start = _seconds(policy["shift_start"])
+    late = working_day & (check_ins > start + policy["grace_minutes"] * 60)
+    late_minutes = np.where(late, (check_ins - start) / 60, 0.0)
+
+    # Every hour worked on a non-working day is overtime
+    overtime = np.where(working_day, np.maximum(net - policy["overtime_after_hours"], 0.0), net)
+    short = working_day & has_out & (net < policy["short_day_hours"])
+
+    def total(values):
+        return np.bincount(idx, weights=values, minlength=n)
+
+    days_present = np.bincount(idx, minlength=n)
+    net_hours = total(net)
+    overtime_hours = total(overtime)
+    late_days = total(late.astype(np.float64))
+    late_mins = total(late_minutes)
+    short_days = total(short.astype(np.float64))
+    missing = total((~has_out).astype(np.float64))
+    off_days = total((~working_day).astype(np.float64))
+
+    return [
+        {
+            "eid": employees[i],
+            "days_present": int(days_present[i]),
+            "net_hours": round(float(net_hours[i]), 2),
+            "overtime_hours": round(float(overtime_hours[i]), 2),
+            "late_days": int(late_days[i]),
+            "late_minutes": round(float(late_mins[i]), 1),
+            "short_days": int(short_days[i]),
+            "missing_checkouts": int(missing[i]),
+            "non_working_days_worked": int(off_days[i]),
+        }
+        for i in range(n)
+    ]
+
+
+def get_month_summary(db: Session, company_id: int, year: int, month: int) -> dict:
+    """Overtime, lateness and short days for all employees, cached per (company, month)."""
+    key = (company_id, year, month)
+    now = monotonic()
+    with _lock:
+        cached = _summary_cache.get(key)
+    if cached and cached[0] > now:
+        return {**cached[1], "cached": True}
+
+    started = perf_counter()
+    policy = get_policy(db, company_id)
+    data = _load_month(db, company_id, year, month)
+    employees = evaluate_month(policy, *data) if data else []
+    totals = {
+        field: round(sum(e[field] for e in employees), 2)
+        for field in ("net_hours", "overtime_hours", "late_minutes", "short_days", "missing_checkouts")
+    }
+    summary = {
+        "company_id": company_id,
+        "year": year,
+        "month": month,
+        "policy": {**policy, "company_id": company_id},
+        "employees": employees,
+        "totals": totals,
+        "cached": False,
+        "compute_ms": round((perf_counter() - started) * 1000, 2),
+    }
+    with _lock:
+        _summary_cache[key] = (now + SUMMARY_CACHE_TTL, summary)
+    return summary
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from models.sync_model import SyncTombstone
+
+# Tokens are taken slightly in the past so rows committed in the same second as
+# the previous sync are sent again rather than missed (clients upsert by id).
+SYNC_OVERLAP = timedelta(seconds=2)
+# Tombstones older than this may be purged; older tokens get a full resync.
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+
+def start_sync(db: Session, updated_since: datetime | None) -> tuple[datetime, datetime | None]:
+    """Return (sync_token, since); since is None when the client needs a full resync.
+
+    The DB clock is used because updated_at is stamped by the DB (NOW()).
+    The token must be read before the changed rows are queried.
+    """
+    db_now = db.execute(select(func.now())).scalar()
+    since = None
+    if updated_since is not None:
+        # Stored timestamps are naive DB-local; tokens we hand out are naive too
+        since = updated_since.replace(tzinfo=None)
+        if since < db_now - TOMBSTONE_RETENTION:
+            since = None  # tombstones may be gone; resend everything
+    return db_now - SYNC_OVERLAP, since
+
+
+def deleted_since(db: Session, entity: str, company_id: int, since: datetime) -> list[int]:
+    return db.execute(
+        select(SyncTombstone.entity_id)
+        .where(
+            SyncTombstone.company_id == company_id,
+            SyncTombstone.entity == entity,
+            SyncTombstone.deleted_at >= since,
+        )
+    ).scalars().all()
+
+
+def purge_tombstones(db: Session) -> int:
+    cutoff = db.execute(select(func.now())).scalar() - TOMBSTONE_RETENTION
+    result = db.execute(SyncTombstone.__table__.delete().where(SyncTombstone.deleted_at < cutoff))
+    db.commit()
+    return result.rowcount
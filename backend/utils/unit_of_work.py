@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+from sqlalchemy.orm import Session
+
+UOW_KEY = "unit_of_work"
+
+
+@contextmanager
+def unit_of_work(db: Session):
+    """One transaction for a whole write: commit once on success, roll back on any error.
+
+        with unit_of_work(db):
+            db.add(obj)
+        return obj   # still loaded: no refresh / re-SELECT after the commit
+
+    Objects are not expired by the commit, so values the request already knows
+    are returned as-is. Server-generated columns (autoincrement ids, NOW()
+    timestamps) are filled at flush: via RETURNING where the backend supports
+    it, otherwise loaded in one SELECT only if the caller reads them.
+
+    Nested units (a controller calling another) join the outermost one, which
+    does the single commit. Helpers used inside a unit must flush, never commit.
+    """
+    if db.info.get(UOW_KEY):
+        yield db
+        return
+    db.info[UOW_KEY] = True
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.expire_on_commit = expire_on_commit
+        db.info.pop(UOW_KEY, None)
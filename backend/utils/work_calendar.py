@@ -0,0 +1,103 @@
+from datetime import date, timedelta
+from sqlalchemy import select, insert, delete, func, case
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from models.calendar_model import CompanyCalendar
+from utils.shift_engine import get_policy
+
+# NOTE: Working-day questions are answered from company_calendar with one
+# primary-key range scan; a year is (re)built lazily the first time it is
+# needed and whenever the shift policy's working days change.
+
+CALENDAR_YEAR_WINDOW = 5  # years are only generated within the current year ± this
+
+
+def calendar_years() -> range:
+    this_year = date.today().year
+    return range(this_year - CALENDAR_YEAR_WINDOW, this_year + CALENDAR_YEAR_WINDOW + 1)
+
+
+def check_calendar_years(start_year: int, end_year: int):
+    """400 unless both years are inside the window (nothing is generated outside it)."""
+    years = calendar_years()
+    if start_year not in years or end_year not in years:
+        raise HTTPException(status_code=400, detail=f"Dates must fall between {years[0]} and {years[-1]}")
+
+
+def build_calendar(db: Session, company_id: int, year: int) -> int:
+    """(Re)generate a company's year from its working days, keeping holidays.
+
+    Runs in the caller's transaction; returns the number of rows written.
+    """
+    working_days = get_policy(db, company_id)["working_days"]
+    first, last = date(year, 1, 1), date(year, 12, 31)
+    in_year = (
+        CompanyCalendar.company_id == company_id,
+        CompanyCalendar.day >= first,
+        CompanyCalendar.day <= last,
+    )
+    holidays = set(db.execute(
+        select(CompanyCalendar.day).where(*in_year, CompanyCalendar.holiday_name.is_not(None))
+    ).scalars())
+    db.execute(delete(CompanyCalendar).where(*in_year, CompanyCalendar.holiday_name.is_(None)))
+
+    rows = []
+    day = first
+    while day <= last:
+        if day not in holidays:
+            rows.append({"company_id": company_id, "day": day, "is_working": day.weekday() in working_days})
+        day += timedelta(days=1)
+    # A concurrent build of the same year inserts identical rows
+    db.execute(insert(CompanyCalendar).prefix_with("IGNORE", dialect="mysql"), rows)
+    return len(rows)
+
+
+def rebuild_calendars(db: Session, company_id: int) -> list[int]:
+    """Rebuild every year already generated for the company (after a policy change)."""
+    years = db.execute(
+        select(func.distinct(func.year(CompanyCalendar.day))).where(CompanyCalendar.company_id == company_id)
+    ).scalars().all()
+    for year in years:
+        build_calendar(db, company_id, int(year))
+    return sorted(int(y) for y in years)
+
+
+def _ensure_years(db: Session, company_id: int, start: date, end: date):
+    check_calendar_years(start.year, end.year)
+    for year in range(start.year, end.year + 1):
+        build_calendar(db, company_id, year)
+
+
+def count_working_days(db: Session, company_id: int, start: date, end: date) -> int:
+    """Working days in [start, end]; one indexed range query once the years exist."""
+    query = select(
+        func.count(),
+        func.coalesce(func.sum(case((CompanyCalendar.is_working, 1), else_=0)), 0),
+    ).where(
+        CompanyCalendar.company_id == company_id,
+        CompanyCalendar.day >= start,
+        CompanyCalendar.day <= end,
+    )
+    days, working = db.execute(query).one()
+    if days < (end - start).days + 1:
+        _ensure_years(db, company_id, start, end)
+        days, working = db.execute(query).one()
+    return int(working)
+
+
+def load_calendar(db: Session, company_id: int, start: date, end: date) -> dict[date, bool]:
+    """day -> is_working for a whole range (used to validate imports in batches)."""
+    query = select(CompanyCalendar.day, CompanyCalendar.is_working).where(
+        CompanyCalendar.company_id == company_id,
+        CompanyCalendar.day >= start,
+        CompanyCalendar.day <= end,
+    )
+    calendar = dict(db.execute(query).all())
+    if len(calendar) < (end - start).days + 1:
+        _ensure_years(db, company_id, start, end)
+        calendar = dict(db.execute(query).all())
+    return calendar
+
+
+def is_working_day(db: Session, company_id: int, day: date) -> bool:
+    return count_working_days(db, company_id, day, day) == 1